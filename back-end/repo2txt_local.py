@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-repo2txt_local.py  (v3 – full recursive tree)
+repo2txt_local.py  (v4 – fast mode)
 ------------------------------------------------
 Walk **recursively** through an entire repository, dump every *textual* file
 smaller than a given size into a single **Markdown** file, and show the **full
@@ -9,6 +9,18 @@ folder tree** (including directories that contain only excluded files).
 Usage
 ~~~~~
     python repo2txt_local.py --max-mb 2 --output repo_dump.md --respect-gitignore
+    python repo2txt_local.py --fast --respect-gitignore --workers 16
+
+Key changes in *v4*
+-------------------
+1. **--fast** – ignored paths come from a single `git ls-files --ignored
+   --directory` call (plus one batched `git check-ignore --stdin` for the
+   collapsed directories) instead of one `git check-ignore` per path, and
+   `os.walk()` prunes ignored directories and `.git/` so they are never walked.
+2. Size/binary filtering and file reads run on a thread pool; file contents
+   are streamed to the output in order through a bounded window.
+3. `is_binary()` now reads only the first *sniff_bytes* instead of the whole
+   file (both modes).
 
 Key changes in *v3*
 -------------------
@@ -23,10 +35,15 @@ Key changes in *v3*
 from __future__ import annotations
 
 import argparse
+import os
 import subprocess
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterator, List, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 # ──────────────────────────────── helpers ─────────────────────────────────────
 
@@ -38,16 +55,19 @@ LANG_MAP: Dict[str, str] = {
 }
 
 
+TEXT_CHARS = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x7F)))
+
+
 def is_binary(path: Path, sniff_bytes: int = 1024) -> bool:
     """Heuristic binary detection via NUL and non-printable ratio."""
     try:
-        chunk = path.read_bytes()[:sniff_bytes]
+        with path.open("rb") as fh:
+            chunk = fh.read(sniff_bytes)
     except Exception:
         return True
     if b"\0" in chunk:
         return True
-    text_chars = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x7F)))
-    non_printable = chunk.translate(None, text_chars)
+    non_printable = chunk.translate(None, TEXT_CHARS)
     return len(non_printable) / max(len(chunk), 1) > 0.3
 
 
@@ -63,6 +83,64 @@ def git_ignored(path: Path, repo_root: Path) -> bool:
         == 0
     )
 
+
+def git_ignored_paths(root: Path) -> Tuple[Set[str], Set[str]] | None:
+    """Return (ignored files, ignored dirs) as POSIX paths relative to *root*.
+
+    `ls-files --directory` also collapses directories whose contents are all
+    ignored (listing those contents too), so directory entries are confirmed
+    with one batched `check-ignore` – only real matches are pruned, as in the
+    per-path mode. None when *root* is not inside a Git work tree.
+    """
+    try:
+        listed = subprocess.run(
+            ["git", "ls-files", "-z", "--others", "--ignored", "--exclude-standard", "--directory"],
+            cwd=root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    files: Set[str] = set()
+    candidates: List[str] = []
+    for rel in map(os.fsdecode, listed.split(b"\0")):
+        if rel.endswith("/"):
+            candidates.append(rel)
+        elif rel:
+            files.add(rel)
+    if not candidates:
+        return files, set()
+
+    matched = subprocess.run(
+        ["git", "check-ignore", "-z", "--stdin"],
+        cwd=root,
+        input=b"\0".join(map(os.fsencode, candidates)) + b"\0",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ).stdout
+    dirs = {os.fsdecode(d).rstrip("/") for d in matched.split(b"\0") if d}
+    return files, dirs
+
+
+BATCH = 256   # paths per pool task – one future per file costs more than reading a small file
+
+
+def ordered_map(pool: ThreadPoolExecutor, fn: Callable[[T], R], items: List[T], window: int) -> Iterator[R]:
+    """`pool.map` over *BATCH*-sized slices, keeping at most *window* slices in
+    flight so results stream out in order with bounded memory."""
+    def run(batch: List[T]) -> List[R]:
+        return [fn(item) for item in batch]
+
+    pending: deque = deque()
+    for start in range(0, len(items), BATCH):
+        pending.append(pool.submit(run, items[start:start + BATCH]))
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
 # ────────────────────────── directory tree printer ────────────────────────────
 
 def build_tree(directories: List[Path], files: List[Path], root: Path) -> str:
@@ -73,8 +151,9 @@ def build_tree(directories: List[Path], files: List[Path], root: Path) -> str:
     for f in files:
         tree[f.parent].append(f)
 
+    dir_set = set(directories)
     for children in tree.values():
-        children.sort(key=lambda x: (x.is_file(), x.name.lower()))
+        children.sort(key=lambda x: (x not in dir_set, x.name.lower()))
 
     lines: List[str] = [f"{root.name}/"]
 
@@ -82,8 +161,9 @@ def build_tree(directories: List[Path], files: List[Path], root: Path) -> str:
         children = tree.get(dir_path, [])
         for idx, child in enumerate(children):
             connector = "└── " if idx == len(children) - 1 else "├── "
-            lines.append(f"{prefix}{connector}{child.name}{'/' if child.is_dir() else ''}")
-            if child.is_dir():
+            is_dir = child in dir_set
+            lines.append(f"{prefix}{connector}{child.name}{'/' if is_dir else ''}")
+            if is_dir:
                 _rec(child, prefix + ("    " if idx == len(children) - 1 else "│   "))
 
     _rec(root)
@@ -109,6 +189,59 @@ def collect(root: Path, max_bytes: int, exclude: set[Path], respect_gitignore: b
     return dirs, files
 
 
+def _dumpable(path: Path, max_bytes: int) -> bool:
+    try:
+        if path.stat().st_size > max_bytes:
+            return False
+    except OSError:
+        return False
+    return not is_binary(path)
+
+
+def collect_fast(root: Path, max_bytes: int, exclude: set[Path], respect_gitignore: bool,
+                 pool: ThreadPoolExecutor) -> Tuple[List[Path], List[Path]]:
+    """Same result as `collect()` (minus `.git/`), without a subprocess per path."""
+    ignored_files: Set[str] = set()
+    ignored_dirs: Set[str] = set()
+    if respect_gitignore:
+        found = git_ignored_paths(root)
+        if found is None:
+            print(f"⚠️  {root} is not a Git work tree – --respect-gitignore has no effect")
+        else:
+            ignored_files, ignored_dirs = found
+
+    dirs: List[Path] = []
+    candidates: List[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        base = Path(dirpath)
+        rel_base = os.path.relpath(dirpath, root)
+        prefix = "" if rel_base == "." else rel_base.replace(os.sep, "/") + "/"
+        kept = []
+        for name in dirnames:
+            p = base / name
+            if name == ".git" or prefix + name in ignored_dirs or p in exclude:
+                continue
+            kept.append(name)
+            dirs.append(p)
+        dirnames[:] = kept          # pruned directories are never walked
+        for name in filenames:
+            p = base / name
+            if prefix + name in ignored_files or p in exclude:
+                continue
+            candidates.append(p)
+
+    keep = ordered_map(pool, lambda p: _dumpable(p, max_bytes), candidates, window=len(candidates))
+    files = [p for p, ok in zip(candidates, keep) if ok]
+    return dirs, files
+
+
+def read_source(path: Path) -> str:
+    try:
+        return path.read_text(errors="replace")
+    except Exception as exc:
+        return f"<Could not read file: {exc}>\n"
+
+
 def guess_lang(path: Path) -> str:
     return LANG_MAP.get(path.suffix.lstrip("."), "")
 
@@ -120,6 +253,10 @@ def main() -> None:
     pa.add_argument("--max-mb", type=float, default=2.0)
     pa.add_argument("--output", default="repo_dump.md")
     pa.add_argument("--respect-gitignore", action="store_true")
+    pa.add_argument("--fast", action="store_true",
+                    help="batched git ignore lookup, pruned walk, threaded reads, streamed output")
+    pa.add_argument("--workers", type=int, default=min(32, (os.cpu_count() or 1) + 4),
+                    help="thread pool size for --fast")
     args = pa.parse_args()
 
     root = Path(args.root).resolve()
@@ -127,35 +264,51 @@ def main() -> None:
     out_path = Path(args.output).resolve()
     max_bytes = int(args.max_mb * 1024 * 1024)
 
-    dirs, files = collect(
-        root=root,
-        max_bytes=max_bytes,
-        exclude={script_path, out_path},
-        respect_gitignore=args.respect_gitignore,
-    )
+    pool = ThreadPoolExecutor(max_workers=args.workers) if args.fast else None
+    try:
+        if pool is not None:
+            dirs, files = collect_fast(
+                root=root,
+                max_bytes=max_bytes,
+                exclude={script_path, out_path},
+                respect_gitignore=args.respect_gitignore,
+                pool=pool,
+            )
+        else:
+            dirs, files = collect(
+                root=root,
+                max_bytes=max_bytes,
+                exclude={script_path, out_path},
+                respect_gitignore=args.respect_gitignore,
+            )
+
+        files.sort(key=lambda p: p.parts)   # common root prefix – same order, no relative_to()
+        dirs.sort(key=lambda p: p.parts)
 
-    files.sort(key=lambda p: p.relative_to(root).parts)
-    dirs.sort(key=lambda p: p.relative_to(root).parts)
-
-    with out_path.open("w", encoding="utf-8") as fp:
-        # 1. Full directory tree
-        fp.write("## Repository Structure\n\n")
-        fp.write("```text\n")
-        fp.write(build_tree(dirs, files, root))
-        fp.write("\n```\n\n")
-
-        # 2. Source files
-        fp.write("## Source Files\n\n")
-        for f in files:
-            rel = f.relative_to(root)
-            lang = guess_lang(f)
-            fp.write(f"### {rel}\n\n```{lang}\n")
-            try:
-                fp.write(f.read_text(errors="replace"))
-            except Exception as exc:
-                fp.write(f"<Could not read file: {exc}>\n")
+        if pool is not None:
+            contents = ordered_map(pool, read_source, files, window=args.workers * 2)
+        else:
+            contents = map(read_source, files)
+
+        with out_path.open("w", encoding="utf-8", buffering=1 << 20) as fp:
+            # 1. Full directory tree
+            fp.write("## Repository Structure\n\n")
+            fp.write("```text\n")
+            fp.write(build_tree(dirs, files, root))
             fp.write("\n```\n\n")
 
+            # 2. Source files (streamed in order)
+            fp.write("## Source Files\n\n")
+            for f, text in zip(files, contents):
+                rel = f.relative_to(root)
+                lang = guess_lang(f)
+                fp.write(f"### {rel}\n\n```{lang}\n")
+                fp.write(text)
+                fp.write("\n```\n\n")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
     print(f"✅ Wrote {len(files)} files to {out_path.relative_to(Path.cwd())} (limit {args.max_mb} MB)")
 
 
@@ -0,0 +1,69 @@
+# bench_import.py
+"""API 프로세스 cold import 시간 측정 (autoscaling 반응 시간 가드).
+
+새 인터프리터에서 ``python -X importtime -c "import cardnews.main"`` 을 실행해
+누적 import 시간과 가장 무거운 모듈을 출력한다. 예산을 넘으면 exit 1 이라
+CI 단계로 그대로 쓸 수 있다.
+
+    python scripts/bench_import.py --budget-ms 1500 --top 15
+
+무거운 모듈의 eager import 여부는 ``tests/test_lazy_imports.py`` 가 pytest 로도
+확인한다 (시간 예산은 머신마다 달라 여기서만 본다).
+"""
+import argparse, os, subprocess, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 이 모듈들이 cardnews.main import 시점에 로드되면 lazy 로딩이 깨진 것
+FORBIDDEN = ("google.adk", "litellm", "camoufox", "cardnews.workers.agent_runner")
+
+
+def measure(module: str):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT / "src"), env.get("PYTHONPATH")]))
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017")
+    env.setdefault("API_HASH_SECRET", "bench")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(proc.stderr)
+
+    rows = []  # (cumulative_us, module)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cum_us, name = (x.strip() for x in line[len("import time:"):].split("|"))
+        if not cum_us.isdigit():
+            continue
+        rows.append((int(cum_us), name))
+    return rows
+
+
+def main():
+    pa = argparse.ArgumentParser("cardnews import-time benchmark")
+    pa.add_argument("--module", default="cardnews.main")
+    pa.add_argument("--budget-ms", type=float, default=1500.0)
+    pa.add_argument("--top", type=int, default=10)
+    args = pa.parse_args()
+
+    rows = measure(args.module)
+    total_ms = next((us for us, name in rows if name == args.module), 0) / 1000
+    loaded = {name for _, name in rows}
+
+    print(f"import {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for us, name in sorted(rows, reverse=True)[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    leaked = [m for m in FORBIDDEN if m in loaded]
+    if leaked:
+        print(f"❌ eager import of heavy modules: {leaked}")
+    if total_ms > args.budget_ms:
+        print("❌ over budget")
+    sys.exit(1 if leaked or total_ms > args.budget_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 # create_test_apikey.py
-import os, hmac, hashlib, secrets, asyncio
+import os, sys, hmac, hashlib, secrets, asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from dotenv import load_dotenv
@@ -18,7 +18,8 @@ async def main():
         "prefix": raw_key[:8],                       # 색인용 접두어
         "hash":   hash_key(raw_key),                 # HMAC-SHA-256
         "company": "TestCorp",
-        "active": True
+        "active": True,
+        "admin": "--admin" in sys.argv,             # /admin/* 접근 권한
     }
 
     # 2) Mongo 삽입
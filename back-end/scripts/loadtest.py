@@ -0,0 +1,491 @@
+# loadtest.py
+"""HTTP 부하 테스트 – 파이프라인 *바깥* 비용 측정 (인증·rate limit·GZip·ORJSON·로그·메트릭).
+
+``cardnews.main:app`` 을 별도 uvicorn 프로세스로 띄우되 Mongo 는 메모리 stand-in,
+카드뉴스 파이프라인은 고정 덱을 돌려주는 stub 으로 바꾼다. 동시성 단계별로
+closed-loop 부하를 걸어 처리량·지연 분위수를 JSON 리포트로 남긴다.
+
+    python scripts/loadtest.py run --concurrency 1,10,100,1000 --requests 5000 \\
+        --hit-ratio 1.0 --compare --out loadtest.json
+
+* ``--hit-ratio``  – 결과 저장소 적중 비율 (1.0: 전부 캐시 적중, 0.0: 전부 stub 생성)
+* ``--compare``    – 기본 구성 + 구성요소를 하나씩 끈 변형(no-auth / no-ratelimit /
+  no-gzip / no-log / no-metrics)을 각각 새 서버로 돌려 비교
+* ``--mongo-latency-ms`` – stand-in 의 연산마다 넣을 지연 (실제 Mongo RTT 흉내)
+* ``--mongo-uri``  – stand-in 대신 실제 mongod 사용 (``cardnews`` DB 에 쓴다 – 버려도 되는 인스턴스로)
+
+클라이언트와 서버가 같은 호스트의 CPU 를 나눠 쓰므로 절대값보다 변형 간 비교를 볼 것.
+rate limit 은 기본적으로 사실상 무제한으로 올려 둔다 (429 가 아니라 limiter 비용을 재기 위해).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import secrets
+import subprocess
+import sys
+import time
+import types
+import uuid
+from copy import deepcopy
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+HIT_QUERY = "loadtest-hit"
+
+VARIANTS = {
+    "baseline": [],
+    "no-auth": ["--no-auth"],
+    "no-ratelimit": ["--no-ratelimit"],
+    "no-gzip": ["--no-gzip"],
+    "no-log": ["--no-log"],
+    "no-metrics": ["--no-metrics"],
+}
+
+
+# ---------------------------------------------------------------------------
+# Mongo stand-in – 요청 경로가 쓰는 연산만
+# ---------------------------------------------------------------------------
+def _get(doc: Dict, key: str):
+    for part in key.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return _MISSING
+        doc = doc[part]
+    return doc
+
+
+_MISSING = object()
+
+_OPS = {
+    "$gt": lambda v, a: v is not _MISSING and v > a,
+    "$gte": lambda v, a: v is not _MISSING and v >= a,
+    "$lt": lambda v, a: v is not _MISSING and v < a,
+    "$lte": lambda v, a: v is not _MISSING and v <= a,
+    "$ne": lambda v, a: v != a,
+    "$in": lambda v, a: v in a,
+    "$exists": lambda v, a: (v is not _MISSING) == bool(a),
+}
+
+
+def _match(doc: Dict, flt: Dict) -> bool:
+    for key, cond in (flt or {}).items():
+        if key == "$or":
+            if not any(_match(doc, f) for f in cond):
+                return False
+            continue
+        val = _get(doc, key)
+        if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+            if not all(_OPS[op](val, arg) for op, arg in cond.items()):
+                return False
+        elif val != cond:
+            return False
+    return True
+
+
+def _project(doc: Dict, proj: Dict | None) -> Dict:
+    if not proj:
+        return dict(doc)
+    return {k: v for k, v in doc.items() if k == "_id" or proj.get(k)}
+
+
+class _Result:
+    def __init__(self, **kw):
+        self.__dict__.update(kw)
+
+
+class _Cursor:
+    def __init__(self, docs: List[Dict]):
+        self.docs = docs
+
+    def sort(self, *a, **k):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n] if n else self.docs
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else self.docs
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    """motor 컬렉션 흉내 – _id 조회는 dict, 나머지는 선형 탐색."""
+
+    latency = 0.0
+
+    def __init__(self):
+        self.docs: Dict = {}
+
+    async def _rtt(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _find(self, flt: Dict) -> List[Dict]:
+        if flt and "_id" in flt and not isinstance(flt["_id"], dict):
+            doc = self.docs.get(flt["_id"])
+            return [doc] if doc is not None and _match(doc, flt) else []
+        return [d for d in self.docs.values() if _match(d, flt)]
+
+    async def create_index(self, *a, **k):
+        return "stand-in"
+
+    async def find_one(self, flt=None, projection=None, **kw):
+        await self._rtt()
+        found = self._find(flt or {})
+        return _project(found[0], projection) if found else None
+
+    def find(self, flt=None, projection=None, **kw):
+        return _Cursor([_project(d, projection) for d in self._find(flt or {})])
+
+    async def insert_one(self, doc, **kw):
+        await self._rtt()
+        from bson import ObjectId
+
+        doc.setdefault("_id", ObjectId())
+        self.docs[doc["_id"]] = doc
+        return _Result(inserted_id=doc["_id"])
+
+    async def update_one(self, flt, update, upsert=False, **kw):
+        await self._rtt()
+        found = self._find(flt)
+        if not found and not upsert:
+            return _Result(matched_count=0, modified_count=0, upserted_id=None)
+        doc = found[0] if found else {k: v for k, v in flt.items() if not isinstance(v, dict)}
+        doc.update(deepcopy(update.get("$set", {})))
+        if not found:
+            doc.update(update.get("$setOnInsert", {}))
+        for key in update.get("$unset", {}):
+            doc.pop(key, None)
+        self.docs.setdefault(doc["_id"], doc)
+        return _Result(matched_count=len(found), modified_count=len(found),
+                       upserted_id=None if found else doc["_id"])
+
+    async def update_many(self, flt, update, **kw):
+        found = self._find(flt)
+        for doc in found:
+            doc.update(update.get("$set", {}))
+        return _Result(matched_count=len(found), modified_count=len(found))
+
+    async def delete_one(self, flt, **kw):
+        await self._rtt()
+        for doc in self._find(flt)[:1]:
+            del self.docs[doc["_id"]]
+        return _Result(deleted_count=1)
+
+    async def delete_many(self, flt, **kw):
+        found = self._find(flt)
+        for doc in found:
+            del self.docs[doc["_id"]]
+        return _Result(deleted_count=len(found))
+
+    async def count_documents(self, flt, **kw):
+        return len(self._find(flt))
+
+    async def estimated_document_count(self, **kw):
+        return len(self.docs)
+
+
+# ---------------------------------------------------------------------------
+# stub 파이프라인
+# ---------------------------------------------------------------------------
+def sample_deck(keyword: str, cards: int, images: int) -> Dict:
+    """실제 응답과 비슷한 크기의 덱 – 카드마다 base64 썸네일 ``images`` 개."""
+    # 썸네일마다 다른 바이트 – 같은 값을 반복하면 GZip 이 비현실적으로 잘 압축한다
+    thumb = lambda: "data:image/jpeg;base64," + base64.b64encode(os.urandom(1_500)).decode()
+    return {
+        "category": "with_sub_title",
+        "cards": [
+            {
+                "title": f"{keyword} {i}",
+                "sub_title": "부제목",
+                "body": "본문 " * 60,
+                "img_keyword": keyword,
+                "img_urls": [thumb() for _ in range(images)],
+                "ref_urls": [f"https://example.com/{i}/{j}" for j in range(images)],
+                "img_desc": ["설명"] * images,
+            }
+            for i in range(cards)
+        ],
+        "desc": "default descriptions",
+    }
+
+
+def _install_stub_pipeline(delay: float, cards: int, images: int) -> None:
+    mod = types.ModuleType("cardnews.workers.agent_runner")
+
+    async def generate_cardnews(client, keyword: str, date_range=None):
+        if delay:
+            await asyncio.sleep(delay)
+        return sample_deck(keyword, cards, images)
+
+    mod.generate_cardnews = generate_cardnews
+    sys.modules[mod.__name__] = mod
+
+
+# ---------------------------------------------------------------------------
+# serve – 테스트 대상 서버 프로세스
+# ---------------------------------------------------------------------------
+def serve(args) -> None:
+    sys.path.insert(0, str(ROOT / "src"))
+    os.environ.setdefault("MONGO_URI", args.mongo_uri or "mongodb://127.0.0.1:1")
+    os.environ.setdefault("API_HASH_SECRET", "loadtest")
+
+    from cardnews.core.settings import get_settings
+
+    # 라우터 데코레이터가 import 시점에 설정을 읽으므로 app import 전에 조정
+    s = get_settings()
+    s.rate_limit_per_min = args.rate_limit
+    s.preload_pipeline = False
+    s.prewarm_enabled = False
+    s.log_sweep_enabled = False
+    s.scrape_backend = "local"
+    s.mongo_create_indexes_on_startup = False
+    _install_stub_pipeline(args.pipeline_ms / 1000, args.cards, args.images)
+
+    import uvicorn
+    from cardnews import main as app_main
+    from cardnews.core.db import mongo
+    from cardnews.core.security import hash_key, verify_api_key
+    from cardnews.routers import cardnews as card_router
+    from cardnews.services import cardnews_service, payload, result_cache
+
+    app = app_main.app
+    # 미들웨어 스택은 첫 ASGI 호출(lifespan)에서 만들어지므로 서버 시작 전에 제거
+    drop = set()
+    if args.no_gzip:
+        drop.add("GZipMiddleware")
+    if args.no_metrics:
+        drop.add("PrometheusInstrumentatorMiddleware")
+    app.user_middleware = [m for m in app.user_middleware if m.cls.__name__ not in drop]
+    if args.no_ratelimit:
+        card_router.limiter.enabled = False
+        app_main.limiter.enabled = False
+    if args.no_auth:
+        app.dependency_overrides[verify_api_key] = lambda: args.api_key[:8]
+    if args.no_log:
+        async def _no_log(*a, **k):
+            return None
+        cardnews_service._log_async = _no_log
+
+    @app.on_event("startup")
+    async def _stand_in():
+        if not args.mongo_uri:
+            MemoryCollection.latency = args.mongo_latency_ms / 1000
+            for name in ("api_keys", "logs_meta", "logs_body", "thumbs", "scrape_jobs",
+                         "results", "proxy_leases", "checkpoints"):
+                setattr(mongo, name, MemoryCollection())
+        task = getattr(app.state, "readiness", None)
+        if task is not None:
+            task.cancel()            # 프록시·LLM 프로브는 부하 측정과 무관
+        await mongo.api_keys.update_one(
+            {"_id": "loadtest"},
+            {"$set": {"prefix": args.api_key[:8], "hash": hash_key(args.api_key), "active": True}},
+            upsert=True,
+        )
+        deck = sample_deck(HIT_QUERY, args.cards, args.images)
+        await result_cache.put(HIT_QUERY, None, payload.encode(deck))
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+# ---------------------------------------------------------------------------
+# run – 부하 발생 & 리포트
+# ---------------------------------------------------------------------------
+def _percentile(xs: List[float], q: float) -> float:
+    return xs[min(len(xs) - 1, int(q * (len(xs) - 1)))] if xs else 0.0
+
+
+async def _level(client, base: str, key: str, concurrency: int, total: int, hit_ratio: float) -> Dict:
+    import httpx
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    sizes: List[int] = []
+    remaining = total
+    headers = {"X-Api-Key": key, "Accept-Encoding": "gzip"}
+
+    async def _worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            q = HIT_QUERY if random.random() < hit_ratio else uuid.uuid4().hex
+            started = time.perf_counter()
+            try:
+                resp = await client.get(f"{base}/generate", params={"q": q}, headers=headers)
+                code = str(resp.status_code)
+                sizes.append(int(resp.headers.get("content-length") or len(resp.content)))
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[code] = statuses.get(code, 0) + 1
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    client_cpu = (time.process_time() - cpu_started) / elapsed
+    latencies.sort()
+    ms = lambda x: round(x * 1000, 2)
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "latency_ms": {
+            "mean": ms(sum(latencies) / len(latencies)),
+            "p50": ms(_percentile(latencies, 0.50)),
+            "p90": ms(_percentile(latencies, 0.90)),
+            "p99": ms(_percentile(latencies, 0.99)),
+            "max": ms(latencies[-1]),
+        },
+        "status": statuses,
+        "wire_bytes_mean": int(sum(sizes) / len(sizes)) if sizes else 0,
+        # ≈1.0 이면 클라이언트가 CPU 한 코어를 다 씀 → 서버가 아니라 부하 발생기가 병목
+        "client_cpu": round(client_cpu, 2),
+    }
+
+
+def _spawn(args, variant_flags: List[str], port: int, key: str) -> subprocess.Popen:
+    cmd = [
+        sys.executable, __file__, "serve",
+        "--port", str(port), "--api-key", key,
+        "--rate-limit", str(args.rate_limit),
+        "--pipeline-ms", str(args.pipeline_ms),
+        "--mongo-latency-ms", str(args.mongo_latency_ms),
+        "--cards", str(args.cards), "--images", str(args.images),
+        *(["--mongo-uri", args.mongo_uri] if args.mongo_uri else []),
+        *variant_flags,
+    ]
+    log = open(args.server_log, "ab") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(cmd, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT)
+
+
+async def _wait_ready(base: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise SystemExit(f"server exited with {proc.returncode} (see --server-log)")
+            try:
+                if (await client.get(f"{base}/livez")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit("server did not become ready")
+
+
+async def _run_variant(args, name: str, flags: List[str], port: int) -> Dict:
+    import httpx
+
+    key = "lt" + secrets.token_urlsafe(24)
+    base = f"http://127.0.0.1:{port}"
+    proc = _spawn(args, flags, port, key)
+    try:
+        await _wait_ready(base, proc)
+        levels = []
+        for concurrency in args.concurrency:
+            limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+            async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+                if args.warmup:
+                    await _level(client, base, key, min(concurrency, args.warmup), args.warmup, args.hit_ratio)
+                row = await _level(client, base, key, concurrency, args.requests, args.hit_ratio)
+            lat = row["latency_ms"]
+            print(f"  [{name}] c={concurrency:<5} {row['rps']:>9.1f} rps  "
+                  f"p50 {lat['p50']:>8.2f} ms  p99 {lat['p99']:>8.2f} ms  "
+                  f"client cpu {row['client_cpu']:.2f}  {row['status']}")
+            levels.append(row)
+        return {"variant": name, "flags": flags, "levels": levels}
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+async def run(args) -> None:
+    variants = VARIANTS if args.compare else {"baseline": VARIANTS["baseline"]}
+    results = []
+    for i, (name, flags) in enumerate(variants.items()):
+        print(f"▶ {name}")
+        results.append(await _run_variant(args, name, flags, args.port + i))
+    report = {
+        "created": datetime.utcnow().isoformat(),
+        "config": {
+            "requests_per_level": args.requests,
+            "concurrency": args.concurrency,
+            "hit_ratio": args.hit_ratio,
+            "pipeline_ms": args.pipeline_ms,
+            "mongo": "real" if args.mongo_uri else f"stand-in (+{args.mongo_latency_ms} ms/op)",
+            "rate_limit_per_min": args.rate_limit,
+            "cards": args.cards,
+            "images_per_card": args.images,
+            "python": sys.version.split()[0],
+        },
+        "variants": results,
+    }
+    Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"✅ report → {args.out}")
+
+
+def main() -> None:
+    pa = argparse.ArgumentParser("cardnews HTTP load test")
+    sub = pa.add_subparsers(dest="cmd", required=True)
+
+    def _common(p):
+        p.add_argument("--rate-limit", type=int, default=10_000_000, help="분당 허용 요청 수")
+        p.add_argument("--pipeline-ms", type=float, default=0.0, help="stub 파이프라인 지연")
+        p.add_argument("--mongo-latency-ms", type=float, default=0.0)
+        p.add_argument("--mongo-uri", help="stand-in 대신 실제 Mongo")
+        p.add_argument("--cards", type=int, default=6)
+        p.add_argument("--images", type=int, default=10, help="카드당 base64 썸네일 수")
+
+    r = sub.add_parser("run", help="서버를 띄우고 부하를 건 뒤 리포트 작성")
+    _common(r)
+    r.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 10, 100, 1000])
+    r.add_argument("--requests", type=int, default=5_000, help="동시성 단계별 요청 수")
+    r.add_argument("--warmup", type=int, default=200)
+    r.add_argument("--hit-ratio", type=float, default=1.0)
+    r.add_argument("--compare", action="store_true", help="구성요소를 하나씩 끈 변형도 측정")
+    r.add_argument("--port", type=int, default=18_000)
+    r.add_argument("--timeout", type=float, default=60.0)
+    r.add_argument("--server-log", help="서버 stdout/stderr 를 이 파일에 (기본: 버림)")
+    r.add_argument("--out", default="loadtest.json")
+
+    s = sub.add_parser("serve", help="(내부용) stand-in 구성으로 앱 실행")
+    _common(s)
+    s.add_argument("--port", type=int, required=True)
+    s.add_argument("--api-key", required=True)
+    for flag in ("--no-auth", "--no-ratelimit", "--no-gzip", "--no-log", "--no-metrics"):
+        s.add_argument(flag, action="store_true")
+
+    args = pa.parse_args()
+    if args.cmd == "serve":
+        serve(args)
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
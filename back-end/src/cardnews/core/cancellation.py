@@ -0,0 +1,63 @@
+# cancellation.py
+"""클라이언트가 연결을 끊은 요청의 파이프라인 취소.
+
+``/generate`` 는 수십 초가 걸리므로 그 사이 클라이언트가 떠나도 브라우저·
+프록시·LLM 호출이 계속 돈다. ``until_disconnected`` 는 작업을 태스크로
+띄우고 ``disconnect_poll_interval`` 마다 ``Request.is_disconnected()`` 를
+확인해, 끊기면 태스크 트리를 취소한다. 취소는 ``async with`` 로 잡은
+스테이지 풀 슬롯·Camoufox 브라우저·스크래핑 잡을 그대로 풀어 준다.
+
+``disconnect_policy: finish`` 면 취소하지 않고 끝까지 돌려 결과 저장소만 채운다.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Set
+
+from fastapi import Request
+from prometheus_client import Counter
+
+from cardnews.core.settings import get_settings
+
+_DISCONNECTS = Counter(
+    "client_disconnects", "Requests abandoned by the client before completion", ["policy"]
+)
+
+# finish 정책으로 분리된 태스크 (GC 방지용 참조)
+_detached: Set[asyncio.Task] = set()
+
+
+def _forget(task: asyncio.Task) -> None:
+    _detached.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"⚠️  detached task failed: {task.exception()!r}")
+
+
+class ClientDisconnected(Exception):
+    """작업이 끝나기 전에 클라이언트 연결이 끊김."""
+
+
+async def until_disconnected(request: Request, coro: Awaitable[Any]) -> Any:
+    s = get_settings()
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=s.disconnect_poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                break
+    except asyncio.CancelledError:
+        # 서버 종료 등으로 핸들러 자체가 취소된 경우
+        task.cancel()
+        raise
+
+    policy = s.disconnect_policy if s.result_cache_enabled else "cancel"
+    _DISCONNECTS.labels(policy).inc()
+    print(f"🔌 client disconnected ({request.url.path}) → {policy}")
+    if policy == "finish":
+        _detached.add(task)
+        task.add_done_callback(_forget)
+    else:
+        task.cancel()
+    raise ClientDisconnected()
@@ -1,33 +1,120 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import timedelta
+from pymongo import WriteConcern
+from pymongo.monitoring import ConnectionPoolListener
+from prometheus_client import Counter, Gauge
 from cardnews.core.settings import get_settings
 
+# ⭐ 커넥션 풀 메트릭 (Prometheus + /admin/mongo)
+_POOL_CONNECTIONS = Gauge("mongo_pool_connections", "Open connections in the Mongo pool")
+_POOL_CHECKED_OUT = Gauge("mongo_pool_checked_out", "Connections currently checked out")
+_POOL_CHECKOUT_FAILED = Counter("mongo_pool_checkout_failed", "Failed connection checkouts", ["reason"])
+
+class PoolStats(ConnectionPoolListener):
+    """pymongo 커넥션 풀 이벤트를 세어 현재 상태를 노출."""
+
+    def __init__(self):
+        self.connections = 0
+        self.checked_out = 0
+        self.checkout_failed = 0
+        self.pools_cleared = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "connections": self.connections,
+            "checked_out": self.checked_out,
+            "checkout_failed": self.checkout_failed,
+            "pools_cleared": self.pools_cleared,
+        }
+
+    def connection_created(self, event):
+        self.connections += 1
+        _POOL_CONNECTIONS.inc()
+
+    def connection_closed(self, event):
+        self.connections -= 1
+        _POOL_CONNECTIONS.dec()
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+        _POOL_CHECKED_OUT.inc()
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+        _POOL_CHECKED_OUT.dec()
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failed += 1
+        _POOL_CHECKOUT_FAILED.labels(reason=str(event.reason)).inc()
+
+    def pool_cleared(self, event):
+        self.pools_cleared += 1
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+pool_stats = PoolStats()
+
 class Mongo:
     client: AsyncIOMotorClient = None
     db = None
     api_keys = None
     logs_meta = None
     logs_body = None
+    thumbs = None
+    scrape_jobs = None
+    results = None
+    proxy_leases = None
+    checkpoints = None
 
 mongo = Mongo()
 
-async def connect_to_mongo():
+def _client_options(s) -> dict:
+    opts = dict(
+        appname="cardnews",
+        maxPoolSize=s.mongo_max_pool_size,
+        minPoolSize=s.mongo_min_pool_size,
+        maxIdleTimeMS=s.mongo_max_idle_ms,
+        connectTimeoutMS=s.mongo_connect_timeout_ms,
+        serverSelectionTimeoutMS=s.mongo_server_selection_timeout_ms,
+        waitQueueTimeoutMS=s.mongo_wait_queue_timeout_ms,
+        event_listeners=[pool_stats],
+    )
+    if s.mongo_socket_timeout_ms:
+        opts["socketTimeoutMS"] = s.mongo_socket_timeout_ms
+    if s.mongo_compressors:
+        # zstd → `zstandard`, snappy → `python-snappy` 패키지 필요 (zlib 는 내장)
+        opts["compressors"] = ",".join(s.mongo_compressors)
+    return opts
+
+def _collection(name: str, write_concerns: dict):
+    """컬렉션별 write concern 프로필 적용 (미지정 시 클라이언트 기본값)"""
+    w = write_concerns.get(name)
+    if w is None:
+        return mongo.db[name]
+    return mongo.db.get_collection(name, write_concern=WriteConcern(w=w))
+
+async def connect_to_mongo(apply_migrations: bool = True):
+    """컬렉션 핸들 연결. ``apply_migrations=False`` 면 설정과 무관하게 인덱스 적용을 건너뜀."""
     s = get_settings()
-    mongo.client = AsyncIOMotorClient(s.mongo_uri)
+    mongo.client = AsyncIOMotorClient(s.mongo_uri, **_client_options(s))
     mongo.db = mongo.client["cardnews"]
-    mongo.api_keys = mongo.db["api_keys"]
-    mongo.logs_meta = mongo.db["logs_meta"]
-    mongo.logs_body = mongo.db["logs_body"]
-
-    # 인덱스 – APIKey prefix & TTL(30일)
-    await mongo.api_keys.create_index("prefix", unique=True)
-    await mongo.logs_meta.create_index(
-        [("api_key_prefix", 1), ("ts", -1)]
-    )
-    await mongo.logs_meta.create_index(
-        "ts",
-        expireAfterSeconds=int(timedelta(days=30).total_seconds()),
-    )
+    wc = s.mongo_write_concerns
+    mongo.api_keys = _collection("api_keys", wc)
+    mongo.logs_meta = _collection("logs_meta", wc)
+    mongo.logs_body = _collection("logs_body", wc)
+    mongo.thumbs = _collection("thumbs", wc)
+    mongo.scrape_jobs = _collection("scrape_jobs", wc)
+    mongo.results = _collection("results", wc)
+    mongo.proxy_leases = _collection("proxy_leases", wc)
+    mongo.checkpoints = _collection("checkpoints", wc)
+
+    # 적용 안 된 인덱스 변경만 적용 (지문 비교 – 평소엔 find_one 한 번)
+    if apply_migrations and s.mongo_create_indexes_on_startup:
+        from cardnews.core.migrations import apply_pending
+        await apply_pending()
 
 async def close_mongo():
     mongo.client.close()
@@ -0,0 +1,264 @@
+# memory.py
+"""메모리 프로파일링 – OOM 원인이 Python 객체인지 브라우저 프로세스인지 가르기.
+
+* RSS – 이 프로세스와 자식 프로세스(Camoufox 는 fetch 마다 Playwright 드라이버 →
+  Firefox 트리를 띄운다)를 ``/proc`` 에서 읽어 프록시 포트별로 합산한다.
+  드라이버 pid 는 브라우저를 띄운 직후 새로 생긴 직계 자식으로 추정하므로,
+  동시에 여러 개가 떠서 구분할 수 없으면 ``unattributed`` 로 잡힌다.
+* 요청별 peak – 생성 요청이 도는 동안 ``memory_sample_interval`` 마다 RSS 를
+  샘플링해 시작 대비 최대 증가량을 히스토그램으로 남긴다 (동시 요청끼리는 겹침).
+* tracemalloc – ``/admin/memory/tracemalloc/start`` 로 켠 뒤 top allocator /
+  직전 스냅샷 대비 증가분을 조회. 켜 두면 할당이 느려지므로 필요할 때만.
+
+Linux 가 아니면 (``/proc`` 없음) RSS 관련 값은 0 이다.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from prometheus_client import Gauge, Histogram
+
+from cardnews.core.settings import get_settings
+
+_PROCESS_RSS = Gauge("process_rss_self_bytes", "RSS of the API process itself")
+_CHILDREN_RSS = Gauge("process_children_rss_bytes", "RSS of all descendant processes (browsers)")
+_BROWSER_RSS = Gauge("browser_rss_bytes", "RSS of browser process trees per proxy", ["proxy"])
+_TRACED = Gauge("tracemalloc_traced_bytes", "Python heap traced by tracemalloc (0 when off)")
+_ACTIVE = Gauge("memory_tracked_requests", "Generation requests currently sampled")
+_PEAK = Histogram(
+    "request_rss_growth_bytes", "Peak RSS growth while a generation request ran",
+    buckets=(1e6, 5e6, 2e7, 5e7, 1e8, 2e8, 5e8, 1e9, 2e9),
+)
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_PROC = Path("/proc")
+
+
+# ---------------------------------------------------------------------------
+# /proc RSS
+# ---------------------------------------------------------------------------
+def rss(pid: int) -> int:
+    try:
+        return int((_PROC / str(pid) / "statm").read_text().split()[1]) * _PAGE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def _children_map() -> Dict[int, List[int]]:
+    """ppid → [pid] (전체 /proc 한 번 훑기)."""
+    out: Dict[int, List[int]] = {}
+    for entry in _PROC.glob("[0-9]*"):
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # comm 에 공백·괄호가 있을 수 있으니 마지막 ')' 뒤에서 자른다
+        ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        out.setdefault(ppid, []).append(int(entry.name))
+    return out
+
+
+def _tree(pid: int, children: Dict[int, List[int]]) -> List[int]:
+    stack, out = [pid], []
+    while stack:
+        p = stack.pop()
+        out.append(p)
+        stack.extend(children.get(p, ()))
+    return out
+
+
+def direct_children() -> Set[int]:
+    if not _PROC.exists():
+        return set()
+    return set(_children_map().get(os.getpid(), ()))
+
+
+# ---------------------------------------------------------------------------
+# 브라우저 프로세스 ↔ 프록시 포트
+# ---------------------------------------------------------------------------
+# 직계 자식 pid → (프록시 key, claim 시각). process_rss 는 스레드에서 돌므로
+# 스캔 도중 claim 된 pid 를 "종료됨" 으로 지우지 않도록 시각을 함께 둔다.
+_browser_owner: Dict[int, Tuple[str, float]] = {}
+
+
+def claim_browser(key: str, before: Set[int], after: Set[int]) -> int | None:
+    """브라우저를 띄운 직후 호출 – 새로 생긴 직계 자식이 하나면 그 트리를 key 로 표시.
+
+    ``before`` / ``after`` 는 launch 전후의 ``direct_children()`` – /proc 전체를
+    훑으므로 호출하는 쪽에서 ``asyncio.to_thread`` 로 구한다.
+    """
+    new = after - before - set(_browser_owner)
+    if len(new) != 1:
+        return None
+    pid = new.pop()
+    _browser_owner[pid] = (key, time.monotonic())
+    return pid
+
+
+def release_browser(pid: int | None) -> None:
+    if pid is not None:
+        _browser_owner.pop(pid, None)
+
+
+def process_rss() -> Dict:
+    """자기 자신 / 프록시별 브라우저 트리 / 기타 자식 RSS."""
+    me = os.getpid()
+    if not _PROC.exists():
+        return {"self": 0, "children": 0, "browsers": {}}
+    scanned_at = time.monotonic()
+    children = _children_map()
+    per_proxy: Dict[str, Dict[str, int]] = {}
+    total_children = 0
+    for child in children.get(me, ()):
+        tree = _tree(child, children)
+        size = sum(rss(p) for p in tree)
+        total_children += size
+        key = _browser_owner.get(child, ("unattributed", 0.0))[0]
+        row = per_proxy.setdefault(key, {"rss": 0, "processes": 0})
+        row["rss"] += size
+        row["processes"] += len(tree)
+    for pid, (_, claimed_at) in list(_browser_owner.items()):
+        # 스캔 시작 뒤에 claim 된 pid 는 이 맵에 없을 수 있음 – 다음 스캔에서 판단
+        if claimed_at < scanned_at and pid not in children.get(me, ()):
+            _browser_owner.pop(pid, None)       # 이미 종료된 트리
+    return {"self": rss(me), "children": total_children, "browsers": per_proxy}
+
+
+def refresh_gauges() -> Dict:
+    snap = process_rss()
+    _PROCESS_RSS.set(snap["self"])
+    _CHILDREN_RSS.set(snap["children"])
+    _BROWSER_RSS.clear()
+    for key, row in snap["browsers"].items():
+        _BROWSER_RSS.labels(key).set(row["rss"])
+    _TRACED.set(tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0)
+    return snap
+
+
+async def gauge_loop() -> None:
+    """Prometheus 게이지 주기 갱신 (/proc 훑기는 스레드에서)."""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_gauges)
+        except Exception as e:
+            print(f"⚠️  memory gauge 갱신 실패: {e}")
+        await asyncio.sleep(get_settings().memory_gauge_interval)
+
+
+# ---------------------------------------------------------------------------
+# 요청별 peak RSS
+# ---------------------------------------------------------------------------
+class _Sample:
+    __slots__ = ("label", "start", "peak", "started")
+
+    def __init__(self, label: str, start: int):
+        self.label = label
+        self.start = self.peak = start
+        self.started = time.monotonic()
+
+
+_active: Set[_Sample] = set()
+_sampler: asyncio.Task | None = None
+recent: List[Dict] = []                 # 최근 요청 peak (admin 조회용)
+
+
+def in_flight() -> int:
+    return len(_active)
+
+
+def _total_rss() -> int:
+    me = os.getpid()
+    if not get_settings().memory_sample_children:
+        return rss(me)
+    return sum(rss(p) for p in _tree(me, _children_map()))
+
+
+async def _sample_loop() -> None:
+    while _active:
+        now = await asyncio.to_thread(_total_rss)     # /proc 훑기는 스레드에서
+        for s in list(_active):
+            s.peak = max(s.peak, now)
+        await asyncio.sleep(get_settings().memory_sample_interval)
+
+
+@asynccontextmanager
+async def track_request(label: str):
+    """생성 요청 동안 RSS peak 를 샘플링."""
+    global _sampler
+    if not get_settings().memory_sampling_enabled or not _PROC.exists():
+        yield
+        return
+    sample = _Sample(label, await asyncio.to_thread(_total_rss))
+    _active.add(sample)
+    _ACTIVE.inc()
+    if _sampler is None or _sampler.done():
+        _sampler = asyncio.create_task(_sample_loop())
+    try:
+        yield
+    finally:
+        _active.discard(sample)
+        _ACTIVE.dec()
+        growth = max(0, sample.peak - sample.start)
+        _PEAK.observe(growth)
+        recent.append({
+            "label": label,
+            "growth": growth,
+            "peak": sample.peak,
+            "seconds": round(time.monotonic() - sample.started, 1),
+        })
+        del recent[: -get_settings().memory_recent_requests]
+
+
+# ---------------------------------------------------------------------------
+# tracemalloc
+# ---------------------------------------------------------------------------
+_last_snapshot: tracemalloc.Snapshot | None = None
+
+
+def start_tracing(frames: int | None = None) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames or get_settings().memory_tracemalloc_frames)
+
+
+def stop_tracing() -> None:
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+
+
+def _stat_row(stat) -> Dict:
+    return {
+        "where": [f"{f.filename}:{f.lineno}" for f in stat.traceback],
+        "size": stat.size,
+        "count": stat.count,
+        **({"size_diff": stat.size_diff, "count_diff": stat.count_diff}
+           if hasattr(stat, "size_diff") else {}),
+    }
+
+
+def top_allocators(limit: int = 20, group_by: str = "lineno", compare: bool = False) -> Dict:
+    """현재 스냅샷의 상위 할당 위치. compare=True 면 직전 스냅샷 대비 증가분."""
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    snap = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    if compare and _last_snapshot is not None:
+        stats = snap.compare_to(_last_snapshot, group_by)
+    else:
+        stats = snap.statistics(group_by)
+    _last_snapshot = snap
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "traced": current,
+        "traced_peak": peak,
+        "top": [_stat_row(s) for s in stats[:limit]],
+    }
@@ -0,0 +1,136 @@
+# migrations.py
+"""MongoDB 인덱스 마이그레이션.
+
+인덱스 명세(``index_specs``)의 지문을 ``schema_migrations`` 에 기록해 두고,
+startup 에서는 지문이 다를 때(= 적용 안 된 변경이 있을 때)만 적용한다
+(``mongo_create_indexes_on_startup``, 기본 true). 워커마다 매번 도는 건
+``find_one`` 한 번뿐이다. 적용되지 않은 변경이 남아 있으면 ``/readyz`` 가
+실패한다. 배포 파이프라인에서 따로 돌리려면:
+
+    python -m cardnews.core.migrations
+
+TTL 값이 바뀐 인덱스는 ``create_index`` 가 ``IndexOptionsConflict`` 를 내므로
+``collMod`` 로 ``expireAfterSeconds`` 만 바꾼다.
+"""
+import asyncio
+import hashlib
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+from cardnews.core.db import connect_to_mongo, close_mongo, mongo
+from cardnews.core.settings import get_settings
+
+IndexSpec = Tuple[str, List[Tuple[str, int]], Dict]
+
+state: Dict = {"applied": None, "error": None}
+
+
+def _days(n: int) -> int:
+    return int(timedelta(days=n).total_seconds())
+
+
+def index_specs() -> List[IndexSpec]:
+    """(컬렉션, 키, 옵션) – TTL 값은 설정에서 오므로 설정이 바뀌면 지문도 바뀐다."""
+    s = get_settings()
+    log_ttl = _days(s.log_ttl_days)
+    return [
+        # APIKey prefix
+        ("api_keys", [("prefix", 1)], {"unique": True}),
+        ("logs_meta", [("api_key_prefix", 1), ("ts", -1)], {}),
+        # log export – (ts, _id) 워터마크 순회
+        ("logs_meta", [("ts", 1), ("_id", 1)], {}),
+        # 로그 TTL (log_ttl_days, 메타·본문 동일)
+        ("logs_meta", [("ts", 1)], {"expireAfterSeconds": log_ttl}),
+        # 스위퍼의 ts 없는 본문 조회도 이 인덱스로 (hint)
+        ("logs_body", [("ts", 1)], {"expireAfterSeconds": log_ttl}),
+        # 로그 스위퍼 – ts 없는 예전 본문의 메타 조회
+        ("logs_meta", [("body_id", 1)], {}),
+        # /img/{hash} 썸네일 – 마지막 참조 후 thumb_ttl_days 지나면 만료
+        ("thumbs", [("ts", 1)], {"expireAfterSeconds": _days(s.thumb_ttl_days)}),
+        # 결과 저장소 · 스테이지 체크포인트 – expires_at 시각에 만료
+        ("results", [("expires_at", 1)], {"expireAfterSeconds": 0}),
+        ("checkpoints", [("expires_at", 1)], {"expireAfterSeconds": 0}),
+        # 스크래핑 잡 큐 – claim 용 인덱스 & 하루 지난 잡 정리
+        ("scrape_jobs", [("status", 1), ("created", 1)], {}),
+        ("scrape_jobs", [("created", 1)], {"expireAfterSeconds": _days(1)}),
+    ]
+
+
+def fingerprint(specs: List[IndexSpec] | None = None) -> str:
+    return hashlib.sha1(repr(specs or index_specs()).encode()).hexdigest()
+
+
+def _same_keys(a, b) -> bool:
+    return [(k, int(v)) for k, v in a] == [(k, int(v)) for k, v in b]
+
+
+async def _ensure(name: str, keys: List[Tuple[str, int]], opts: Dict) -> None:
+    col = mongo.db[name]
+    ttl = opts.get("expireAfterSeconds")
+    if ttl is not None:
+        for spec in (await col.index_information()).values():
+            if _same_keys(spec["key"], keys) and "expireAfterSeconds" in spec:
+                old = int(spec["expireAfterSeconds"])
+                if old != ttl:
+                    await mongo.db.command(
+                        "collMod", name,
+                        index={"keyPattern": dict(keys), "expireAfterSeconds": ttl},
+                    )
+                    print(f"🔧 {name} {dict(keys)} TTL {old} → {ttl}s")
+                return
+    await col.create_index(keys, **opts)
+
+
+async def ensure_indexes() -> str:
+    specs = index_specs()
+    for name, keys, opts in specs:
+        await _ensure(name, keys, opts)
+    fp = fingerprint(specs)
+    await mongo.db.schema_migrations.update_one(
+        {"_id": "indexes"}, {"$set": {"fingerprint": fp}}, upsert=True
+    )
+    state.update(applied=fp, error=None)
+    return fp
+
+
+async def pending() -> bool:
+    """적용 안 된 인덱스 변경이 있는지 (readiness 용)."""
+    fp = fingerprint()
+    if state["applied"] == fp:
+        return False
+    doc = await mongo.db.schema_migrations.find_one({"_id": "indexes"})
+    applied = doc and doc.get("fingerprint")
+    if applied == fp:
+        state["applied"] = fp
+    return applied != fp
+
+
+async def apply_pending() -> bool:
+    """startup 용 – 변경이 있을 때만 적용. 실패해도 프로세스는 뜨고 readiness 가 막는다."""
+    try:
+        if not await pending():
+            return False
+        await ensure_indexes()
+        print("✅ index migrations applied")
+        return True
+    except Exception as e:
+        state["error"] = f"{type(e).__name__}: {e}"
+        print(f"⚠️  index migration 실패: {e}")
+        return False
+
+
+async def _main():
+    await connect_to_mongo(apply_migrations=False)     # 아래에서 무조건 적용
+    try:
+        await ensure_indexes()
+        print("✅ indexes ensured")
+    finally:
+        await close_mongo()
+
+
+def main():
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# pools.py
+"""프로세스 전역 스테이지 풀 (page fetch / image search / LLM).
+
+요청마다 ``Semaphore(5)`` 를 새로 만들면 동시 요청 N 개일 때 브라우저가
+5N 개까지 뜬다. 대신 Settings 와 프록시 수로 크기를 정한 풀을 프로세스에
+하나씩 두고, 빈 슬롯은 *현재 가장 적게 점유한 요청* 의 대기자에게 먼저
+넘겨 요청 간 공정하게 나눈다.
+
+요청 식별자는 ``request_owner`` contextvar 로 전달된다
+(``asyncio.gather`` 로 만든 하위 태스크에도 그대로 복사됨). 배치 요청은
+항목 전체가 한 owner 라서 단건 요청을 밀어내지 않는다.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Tuple
+
+from cardnews.core.settings import get_settings
+
+request_owner: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "request_owner", default="default"
+)
+
+# 배치 요청 내에서 같은 SERP/본문/이미지 검색을 한 번만 하도록 공유하는 memo
+# (키 → Future). None 이면 공유하지 않음.
+shared_fetches: contextvars.ContextVar[Dict[tuple, asyncio.Future] | None] = (
+    contextvars.ContextVar("shared_fetches", default=None)
+)
+
+
+async def shared_fetch(key: tuple, factory):
+    """``shared_fetches`` 가 설정돼 있으면 같은 key 의 작업을 한 번만 실행해 결과를 공유."""
+    memo = shared_fetches.get()
+    if memo is None:
+        return await factory()
+    fut = memo.get(key)
+    if fut is None:
+        fut = memo[key] = asyncio.ensure_future(factory())
+        # 성공한 결과만 남긴다 – 실패·취소는 다음 항목(또는 재시도)이 다시 실행
+        fut.add_done_callback(
+            lambda f: memo.pop(key, None) if f.cancelled() or f.exception() else None
+        )
+    # 한 소비자가 취소돼도 공유 작업은 계속
+    return await asyncio.shield(fut)
+
+
+class StagePool:
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = max(1, size)
+        self.in_use = 0
+        self._held: Counter[str] = Counter()
+        # owner -> (대기 시작 시각, future) 큐. 삽입 순서 = 최초 대기 순서
+        self._waiters: "OrderedDict[str, Deque[Tuple[float, asyncio.Future]]]" = OrderedDict()
+        self.acquired_total = 0
+        self.wait_seconds_total = 0.0
+
+    # ------------------------------------------------------------------
+    def _pick_waiter(self) -> Tuple[str, asyncio.Future] | None:
+        """점유 슬롯이 가장 적은 owner 의 가장 오래된 대기자."""
+        best = None
+        for owner, q in self._waiters.items():
+            while q and q[0][1].done():      # 취소된 대기자 정리
+                q.popleft()
+            if not q:
+                continue
+            key = (self._held[owner], q[0][0])
+            if best is None or key < best[0]:
+                best = (key, owner)
+        if best is None:
+            self._waiters.clear()
+            return None
+        owner = best[1]
+        _, fut = self._waiters[owner].popleft()
+        if not self._waiters[owner]:
+            del self._waiters[owner]
+        return owner, fut
+
+    def _discard(self, owner: str, fut: asyncio.Future) -> None:
+        q = self._waiters.get(owner)
+        if not q:
+            return
+        for entry in q:
+            if entry[1] is fut:
+                q.remove(entry)
+                break
+        if not q:
+            del self._waiters[owner]
+
+    def _grant(self, owner: str) -> None:
+        self.in_use += 1
+        self._held[owner] += 1
+        self.acquired_total += 1
+
+    async def acquire(self, owner: str | None = None) -> str:
+        owner = owner or request_owner.get()
+        if self.in_use < self.size and not any(self._waiters.values()):
+            self._grant(owner)
+            return owner
+
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        started = time.monotonic()
+        self._waiters.setdefault(owner, deque()).append((started, fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소됐다면 반납
+            if fut.done() and not fut.cancelled():
+                self.release(owner)
+            else:
+                self._discard(owner, fut)
+            raise
+        self.wait_seconds_total += time.monotonic() - started
+        return owner
+
+    def release(self, owner: str) -> None:
+        self.in_use -= 1
+        self._held[owner] -= 1
+        if self._held[owner] <= 0:
+            del self._held[owner]
+        while self.in_use < self.size:
+            nxt = self._pick_waiter()
+            if nxt is None:
+                break
+            nxt_owner, fut = nxt
+            self._grant(nxt_owner)
+            fut.set_result(None)
+
+    @property
+    def has_waiters(self) -> bool:
+        return any(not f.done() for q in self._waiters.values() for _, f in q)
+
+    @asynccontextmanager
+    async def slot(self):
+        owner = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(owner)
+
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Dict:
+        waiting = {o: sum(1 for _, f in q if not f.done()) for o, q in self._waiters.items()}
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "waiting": sum(waiting.values()),
+            "owners": {
+                o: {"held": self._held.get(o, 0), "waiting": waiting.get(o, 0)}
+                for o in set(self._held) | {o for o, n in waiting.items() if n}
+            },
+            "acquired_total": self.acquired_total,
+            "avg_wait_ms": round(
+                1000 * self.wait_seconds_total / max(self.acquired_total, 1), 2
+            ),
+        }
+
+
+# ---------------------------------------------------------------------------
+# 전역 레지스트리
+# ---------------------------------------------------------------------------
+_pools: Dict[str, StagePool] = {}
+
+
+def _default_sizes() -> Dict[str, int]:
+    s = get_settings()
+    n_proxy = max(1, len(s.ports))
+    return {
+        # 프록시 포트당 브라우저 1개가 기본
+        "page_fetch": s.page_fetch_concurrency or n_proxy,
+        "image_search": s.image_search_concurrency or max(1, n_proxy // 2),
+        "llm": s.llm_concurrency,
+    }
+
+
+def get_pool(name: str) -> StagePool:
+    pool = _pools.get(name)
+    if pool is None:
+        pool = _pools[name] = StagePool(name, _default_sizes()[name])
+    return pool
+
+
+def snapshot_all() -> Dict[str, Dict]:
+    return {name: get_pool(name).snapshot() for name in _default_sizes()}
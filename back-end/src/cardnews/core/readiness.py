@@ -0,0 +1,168 @@
+# readiness.py
+"""/readyz 용 의존성 프로브.
+
+프로브 요청마다 Mongo·프록시·LLM 을 찌르면 LB 헬스체크가 곧 부하가 되므로,
+백그라운드 루프가 ``readiness_interval`` 마다 검사해 ``state`` 에 저장하고
+엔드포인트는 저장된 스냅샷만 읽는다 (O(1)).
+
+검사 항목
+---------
+* mongo   – ``ping``
+* indexes – 적용 안 된 인덱스 마이그레이션이 없는지 (``core.migrations``)
+* proxies – 프록시 포트 TCP 연결 (scrape_backend=local/inproc 일 때만)
+* browser – page_fetch 풀 대기열 길이
+* queue   – 스크래핑 잡 큐 적체 (queue 백엔드일 때만)
+* llm     – OpenAI ``/v1/models`` 응답. 키가 없거나 거부(401/403)될 때만
+  실패로 친다. 429·5xx·접속 실패는 모든 인스턴스가 동시에 겪는 외부 장애라
+  ``degraded`` 로만 표시한다 – 캐시 히트는 LLM 없이도 응답할 수 있다.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict
+
+import httpx
+
+from cardnews.core.db import mongo
+from cardnews.core.pools import get_pool
+from cardnews.core.settings import get_settings
+
+state: Dict = {"ready": False, "checked_at": None, "checks": {}, "degraded": []}
+
+# 이 응답이면 우리 쪽 설정(키) 문제 – 재시작·재배포로만 고쳐짐
+_LLM_AUTH_FAILED = (401, 403)
+
+
+def _result(ok: bool | None, **detail) -> Dict:
+    # ok=None → 이 배포 형태에선 해당 없음 / 외부 장애(degraded) – readiness 판정에서 제외
+    return {"ok": ok, **detail}
+
+
+async def check_mongo() -> Dict:
+    try:
+        await asyncio.wait_for(mongo.client.admin.command({"ping": 1}), 3)
+        return _result(True)
+    except Exception as e:
+        return _result(False, error=str(e))
+
+
+async def check_migrations() -> Dict:
+    from cardnews.core import migrations
+
+    if await migrations.pending():
+        return _result(False, pending=True, error=migrations.state["error"])
+    return _result(True)
+
+
+async def _tcp_ok(host: str, port: int, timeout: float) -> bool:
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def check_proxies() -> Dict:
+    s = get_settings()
+    if s.scrape_backend == "mongo" or not s.proxy_host:
+        return _result(None, skipped=True)
+    results = await asyncio.gather(*[_tcp_ok(s.proxy_host, p, 3) for p in s.ports])
+    healthy = [p for p, ok in zip(s.ports, results) if ok]
+    return _result(
+        len(healthy) >= s.readiness_min_proxies,
+        healthy=len(healthy),
+        total=len(s.ports),
+        down=[p for p in s.ports if p not in healthy],
+    )
+
+
+async def check_browser_pool() -> Dict:
+    snap = get_pool("page_fetch").snapshot()
+    limit = get_settings().readiness_max_waiting_factor * snap["size"]
+    return _result(
+        snap["waiting"] <= limit,
+        size=snap["size"],
+        in_use=snap["in_use"],
+        waiting=snap["waiting"],
+    )
+
+
+async def check_queue() -> Dict:
+    from cardnews.services import cardnews_service as svc
+
+    queue = getattr(svc.client, "queue", None)
+    if queue is None:
+        return _result(None, skipped=True)
+    depth = await queue.depth()
+    return _result(depth <= get_settings().readiness_max_queue_depth, depth=depth)
+
+
+_llm_last: Dict = {"ts": 0.0, "result": None}
+
+
+async def check_llm() -> Dict:
+    s = get_settings()
+    if not s.openai_api_key:
+        return _result(False, error="OPENAI_API_KEY not set")
+    # 외부 API 라 더 긴 주기로만 실제 호출
+    if _llm_last["result"] is not None and time.time() - _llm_last["ts"] < s.readiness_llm_interval:
+        return _llm_last["result"]
+    try:
+        async with httpx.AsyncClient(timeout=5) as http:
+            resp = await http.get(
+                "https://api.openai.com/v1/models",
+                headers={"Authorization": f"Bearer {s.openai_api_key}"},
+            )
+        if resp.status_code == 200:
+            result = _result(True, status=200)
+        elif resp.status_code in _LLM_AUTH_FAILED:
+            result = _result(False, status=resp.status_code)
+        else:
+            result = _result(None, degraded=True, status=resp.status_code)
+    except httpx.HTTPError as e:
+        result = _result(None, degraded=True, error=str(e))
+    _llm_last.update(ts=time.time(), result=result)
+    return result
+
+
+CHECKS = {
+    "mongo": check_mongo,
+    "indexes": check_migrations,
+    "proxies": check_proxies,
+    "browser": check_browser_pool,
+    "queue": check_queue,
+    "llm": check_llm,
+}
+
+
+async def refresh() -> Dict:
+    names = list(CHECKS)
+    results = await asyncio.gather(*[CHECKS[n]() for n in names], return_exceptions=True)
+    checks = {
+        n: r if isinstance(r, dict) else _result(False, error=repr(r))
+        for n, r in zip(names, results)
+    }
+    state.update(
+        ready=all(c["ok"] is not False for c in checks.values()),
+        checked_at=time.time(),
+        checks=checks,
+        degraded=[n for n, c in checks.items() if c.get("degraded")],
+    )
+    return state
+
+
+def is_fresh() -> bool:
+    ts = state["checked_at"]
+    return ts is not None and time.time() - ts < 3 * get_settings().readiness_interval
+
+
+async def refresh_loop() -> None:
+    s = get_settings()
+    while True:
+        try:
+            await refresh()
+        except Exception as e:
+            print(f"⚠️  readiness 갱신 실패: {e}")
+        await asyncio.sleep(s.readiness_interval)
@@ -7,11 +7,23 @@ def hash_key(raw: str) -> str:
     secret = get_settings().api_hash_secret.encode()
     return hmac.new(secret, raw.encode(), hashlib.sha256).hexdigest()
 
-async def verify_api_key(x_api_key: str = Header(...)):
-    """FastAPI dependency — 401 if invalid"""
+async def _lookup_key(x_api_key: str) -> dict:
     pref = x_api_key[:8]
     doc = await mongo.api_keys.find_one({"prefix": pref, "active": True})
     if not doc or not hmac.compare_digest(doc["hash"], hash_key(x_api_key)):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail="Invalid API Key")
-    return pref  # 나중에 로그용 반환
+    return doc
+
+async def verify_api_key(x_api_key: str = Header(...)):
+    """FastAPI dependency — 401 if invalid"""
+    doc = await _lookup_key(x_api_key)
+    return doc["prefix"]  # 나중에 로그용 반환
+
+async def verify_admin_key(x_api_key: str = Header(...)):
+    """FastAPI dependency — 401 if invalid, 403 if not an admin key"""
+    doc = await _lookup_key(x_api_key)
+    if not doc.get("admin"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Admin API Key required")
+    return doc["prefix"]
@@ -15,15 +15,164 @@ class Settings(BaseSettings):
     proxy_pass: str | None = Field(None, env="PROXY_PASS")
     openai_api_key: str | None = Field(None, env="OPENAI_API_KEY")
 
+    # MongoDB 커넥션 풀 & write concern
+    mongo_max_pool_size: int = 50
+    mongo_min_pool_size: int = 5
+    mongo_max_idle_ms: int = 300_000
+    mongo_connect_timeout_ms: int = 5_000
+    mongo_server_selection_timeout_ms: int = 5_000
+    mongo_socket_timeout_ms: int | None = None
+    mongo_wait_queue_timeout_ms: int = 2_000
+    mongo_compressors: list[str] = []      # 예: ["zstd", "snappy", "zlib"]
+    # 컬렉션 → w (0 = unacknowledged, 1, "majority"); 없으면 URI 기본값
+    mongo_write_concerns: dict[str, int | str] = {
+        "logs_body": 0,
+        "logs_meta": 1,
+        "api_keys": "majority",
+    }
+    mongo_create_indexes_on_startup: bool = True    # 적용 안 된 인덱스 마이그레이션만 startup 에서 적용
+
     worker_count: int | None = 1
+    preload_pipeline: bool = True          # startup 후 ADK/LiteLLM 을 백그라운드에서 미리 import
 
     rate_limit_per_min: int = 60    # 기본 60rpm
+    # /generate/batch – 호출 단위 rate limit, 항목 수 상한, 동시에 진행할 항목 수
+    batch_rate_limit_per_min: int = 10
+    batch_max_items: int = 50
+    batch_concurrency: int = 4
     cors_origins: list[str] = []
 
     # Proxy & 기타 YAML 설정 병합
     ports: list[int] = []
     min_delay: int = 10
     max_retries: int = 2
+    # 프록시 포트 임대 (scraping/proxy_leases.py) – 여러 워커/레플리카면 mongo
+    proxy_lease_backend: str = "local"      # local / mongo
+    proxy_lease_seconds: int = 120          # 임대 만료 (죽은 프로세스 대비)
+    proxy_lease_wait_timeout: float = 60.0
+    proxy_lease_poll_interval: float = 0.5
+    proxy_partition_count: int = 1          # >1 이면 포트를 워커별로 정적 분할
+    proxy_partition_index: int | None = None
+    # 프록시별 브라우저 storage state 재사용 (scraping/profiles.py)
+    browser_profiles_enabled: bool = True
+    browser_profile_dir: str = ".browser_profiles"
+    browser_profile_max_age: int = 7 * 86_400
+
+    # 스테이지 풀 (프로세스 전역 동시성, None 이면 프록시 수 기준 자동)
+    page_fetch_concurrency: int | None = None    # 기본: len(ports)
+    image_search_concurrency: int | None = None  # 기본: len(ports) // 2
+    llm_concurrency: int = 8
+    # LLM 응답 JSON-schema 강제
+    llm_structured_output: bool = True
+    llm_streaming: bool = True              # img_keyword 응답을 스트리밍 → 카드별로 이미지 검색 선행
+    # stage 별 모델 캐스케이드 – 앞 모델 응답이 검증 실패하면 다음 모델로
+    llm_cascades: dict[str, list[str]] = {
+        "filter": ["openai/gpt-4.1-nano", "openai/gpt-4.1-mini"],
+        "text_maker": ["openai/o4-mini", "openai/gpt-4.1-mini"],
+        "img_keyword": ["openai/gpt-4.1-mini", "openai/o4-mini"],
+    }
+    llm_large_input_chars: int = 60_000     # 이보다 긴 입력은 아래 모델 건너뜀
+    llm_large_input_skip: list[str] = ["openai/gpt-4.1-nano"]
+
+    # 본문 크롤링 deadline / quorum / 헤징
+    page_fetch_deadline: float = 90.0      # TEXT 스테이지 전체 상한 (초)
+    page_fetch_quorum: float = 0.8         # 이 비율만큼 모이면 grace 후 진행
+    page_fetch_grace: float = 5.0
+    page_fetch_hedge: bool = True
+    page_fetch_hedge_quantile: float = 0.9 # 이 분위수를 넘기면 중복 요청
+    # 도메인별 서킷 브레이커 / 동시성 / HTTP 우선 fetch (scraping/domains.py)
+    domain_breaker_window: int = 20
+    domain_breaker_min_calls: int = 4
+    domain_breaker_failure_rate: float = 0.5
+    domain_breaker_cooldown: float = 300.0
+    # 사용자별 공간을 나눠 쓰는 호스트 – 브레이커를 첫 경로(블로그 id) 단위로
+    domain_breaker_path_hosts: list[str] = [
+        "m.blog.naver.com", "blog.naver.com", "m.cafe.naver.com", "cafe.naver.com",
+        "m.post.naver.com", "post.naver.com", "brunch.co.kr", "velog.io", "medium.com",
+    ]
+    domain_max_concurrency: int = 2          # 호스트당 (공유 호스트도 호스트 하나로)
+    domain_registry_max_entries: int = 5_000  # 호스트·브레이커 표 상한 (유휴 LRU 부터 버림)
+    domain_http_first: bool = True         # 브라우저 전에 HTTP GET 으로 시도
+    domain_http_timeout: float = 8.0
+    domain_http_min_chars: int = 500       # 이보다 짧으면 브라우저로 재시도
+    page_extract_main: bool = True         # 본문 추출기 (False: 예전처럼 body 전체 텍스트)
+    page_extract_min_chars: int = 200      # 추출 본문이 이보다 짧으면 전체 텍스트로
+    page_text_max_chars: int = 20_000      # 페이지당 LLM 입력 상한
+
+    # 스크래핑 백엔드: local(API 프로세스에서 직접) / inproc(로컬 큐 + 내부 워커) / mongo(별도 워커)
+    scrape_backend: str = "local"
+    scrape_worker_concurrency: int = 4     # 워커 프로세스당 동시 브라우저 수
+    scrape_job_timeout: float = 180.0      # 잡 결과 대기 & 워커 lease (초)
+    scrape_cancel_check_interval: float = 2.0   # 워커가 실행 중인 잡의 취소 여부 확인 주기
+    scrape_job_poll_interval: float = 0.2
+
+    # 결과 저장소 & 인기 키워드 프리워밍
+    result_cache_enabled: bool = True
+    result_cache_ttl: int = 21_600          # 6시간
+    # 스테이지 체크포인트 – 실패한 생성의 재시도는 마지막 성공 스테이지부터 (workers/checkpoints.py)
+    checkpoints_enabled: bool = True
+    checkpoint_ttl: int = 1_800
+    checkpoint_lease: int = 300             # 한 실행이 체크포인트를 독점하는 시간 (저장마다 연장)
+    checkpoint_auto_retries: int = 1        # 실패 시 서비스 내부에서 이어서 재시도할 횟수
+    # 클라이언트 연결 끊김 – cancel: 파이프라인 취소 / finish: 끝까지 돌려 결과 저장소만 채움
+    disconnect_policy: str = "cancel"
+    disconnect_poll_interval: float = 1.0
+    # 유사 쿼리 매칭 – "잠실 맛집" ≈ "잠실맛집" ≈ "잠실 맛집 추천"
+    similar_query_enabled: bool = True
+    similar_query_threshold: float = 0.85   # 코사인 유사도 하한 (숫자·영문 토큰은 별도로 정확히 일치)
+    similar_query_ngram: int = 3            # 자모 n-gram 길이
+    similar_query_refresh_interval: int = 300
+    prewarm_enabled: bool = False
+    prewarm_interval: int = 600             # 스케줄러 주기 (초)
+    prewarm_lookback_hours: int = 24
+    prewarm_top_n: int = 20
+    prewarm_refresh_margin: int = 1_800     # 만료까지 이보다 적게 남으면 재생성
+    prewarm_concurrency: int = 1
+    prewarm_max_pool_utilization: float = 0.5  # page_fetch 풀이 이 이상 차 있으면 쉼
+    prewarm_lock_seconds: int = 600
+
+    # /readyz 백그라운드 프로브
+    readiness_interval: int = 10           # 초
+    readiness_llm_interval: int = 60       # LLM 엔드포인트는 이 주기로만 실제 호출
+    readiness_min_proxies: int = 1         # 연결 가능한 프록시 포트 최소 개수
+    readiness_max_waiting_factor: float = 4.0   # page_fetch 대기자 ≤ 풀 크기 × factor
+    readiness_max_queue_depth: int = 200   # 스크래핑 잡 큐 적체 상한
+
+    # 이미지 프로브 (img_urls 검증·중복 제거)
+    image_probe_enabled: bool = True
+    image_probe_concurrency: int = 16      # 프로세스 전역 동시 요청 수 (= 커넥션 풀 크기)
+    image_probe_timeout: float = 5.0
+    image_probe_max_bytes: int = 65_536    # Range GET 으로 받는 최대 byte
+    image_probe_cache_size: int = 5_000
+    image_probe_cache_ttl: int = 3_600     # 초
+    image_probe_negative_ttl: int = 60     # 실패 결과는 짧게 (일시적 타임아웃·5xx 가 1시간 박히지 않게)
+    image_min_width: int = 100
+    image_min_height: int = 100
+    image_min_bytes: int = 1_024
+    image_phash_distance: int = 6          # dHash 해밍 거리 이하면 중복으로 간주
+
+    # compact 응답 (/generate?compact=true)
+    public_base_url: str | None = None     # /img/{hash} 절대 URL 용 (리버스 프록시 뒤라면 지정)
+    thumb_cache_size: int = 2_000          # 프로세스 내 썸네일 LRU 개수
+    thumb_ttl_days: int = 7
+
+    # 메모리 프로파일링 (core/memory.py, /admin/memory)
+    memory_sampling_enabled: bool = True   # 요청별 RSS peak + 프록시별 브라우저 RSS
+    memory_sample_interval: float = 1.0
+    memory_sample_children: bool = True    # peak 에 브라우저 자식 프로세스 포함
+    memory_gauge_interval: float = 15.0
+    memory_recent_requests: int = 50
+    memory_tracemalloc_on_start: bool = False   # 켜면 할당이 느려짐 – 조사할 때만
+    memory_tracemalloc_frames: int = 1
+
+    # 로그 수명 (services/log_lifecycle.py) – logs_meta·logs_body 같은 TTL
+    log_ttl_days: int = 30
+    log_sweep_enabled: bool = False        # 한 워커에서만 켜거나 크론으로 CLI 실행
+    log_sweep_interval: int = 3_600
+    log_sweep_batch: int = 500
+    log_archive_enabled: bool = False      # 만료 전 gzip NDJSON 세그먼트로 보관
+    log_archive_dir: str = "log_archive"
+    log_archive_lead_hours: int = 24       # 만료 이만큼 전에 보관
 
 
     class Config:
@@ -9,10 +9,9 @@ import uvicorn, asyncio
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 from starlette.middleware.gzip import GZipMiddleware
-from cardnews.core.db import connect_to_mongo, close_mongo
+from cardnews.core.db import connect_to_mongo, close_mongo, mongo
 from cardnews.routers.cardnews import router
-from cardnews.services.cardnews_service import client
-from cardnews.scraping.proxy_client import ProxyRotationClient
+from cardnews.scraping.jobs import LocalJobQueue, MongoJobQueue, QueueScrapeClient
 from cardnews.core.settings import get_settings
 
 settings = get_settings()
@@ -36,8 +35,10 @@ app.add_middleware(
 # ⭐ 라우터
 from cardnews.routers.cardnews import router as card_router
 from cardnews.routers.health import router as health_router
+from cardnews.routers.admin import router as admin_router
 app.include_router(card_router)
 app.include_router(health_router)
+app.include_router(admin_router)
 
 # ⭐ Prometheus
 Instrumentator().instrument(app).expose(app)
@@ -51,14 +52,67 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
-    # ProxyRotationClient 싱글턴 준비
+    # 스크래핑 클라이언트 싱글턴 준비 (scrape_backend 설정에 따라)
     import importlib
     svc = importlib.import_module("cardnews.services.cardnews_service")
-    svc.client = ProxyRotationClient()
+    from cardnews.scraping.proxy_client import ProxyRotationClient
+    if settings.scrape_backend == "mongo":
+        # 브라우저는 별도 프로세스(cardnews.workers.scrape_worker)에서
+        svc.client = QueueScrapeClient(MongoJobQueue(mongo.scrape_jobs))
+    elif settings.scrape_backend == "inproc":
+        from cardnews.workers.scrape_worker import run_worker
+        queue = LocalJobQueue()
+        svc.client = QueueScrapeClient(queue)
+        app.state.scrape_workers = asyncio.create_task(
+            run_worker(queue, ProxyRotationClient(), settings.scrape_worker_concurrency)
+        )
+    else:
+        svc.client = ProxyRotationClient()
+
+    # /readyz 프로브 백그라운드 갱신
+    from cardnews.core.readiness import refresh_loop
+    app.state.readiness = asyncio.create_task(refresh_loop())
+
+    # 무거운 파이프라인 모듈(ADK/LiteLLM)은 startup 을 막지 않고 백그라운드 스레드에서 로드
+    if settings.preload_pipeline:
+        app.state.preload = asyncio.create_task(
+            asyncio.to_thread(importlib.import_module, "cardnews.workers.agent_runner")
+        )
+
+    # 유사 쿼리 인덱스 – 다른 워커가 만든 결과/만료 반영
+    if settings.result_cache_enabled and settings.similar_query_enabled:
+        from cardnews.services.query_index import refresh_loop as index_loop
+        app.state.query_index = asyncio.create_task(index_loop())
+
+    # 메모리 게이지 (프로세스·브라우저 RSS) & 필요 시 tracemalloc
+    from cardnews.core import memory
+    if settings.memory_tracemalloc_on_start:
+        memory.start_tracing()
+    if settings.memory_sampling_enabled:
+        app.state.memory_gauges = asyncio.create_task(memory.gauge_loop())
+
+    # 로그 수명 관리 – 레거시 본문 정리 / 보관 / 용량 지표
+    if settings.log_sweep_enabled:
+        from cardnews.services.log_lifecycle import sweep_loop
+        app.state.log_sweep = asyncio.create_task(sweep_loop())
+
+    # 인기 키워드 프리워밍
+    if settings.prewarm_enabled:
+        from cardnews.services.prewarm import scheduler_loop
+        app.state.prewarm = asyncio.create_task(scheduler_loop(lambda: svc.client))
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    for name in ("scrape_workers", "prewarm", "readiness", "query_index", "log_sweep",
+                 "memory_gauges"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
     await close_mongo()
+    from cardnews.scraping.image_probe import close_prober
+    await close_prober()
+    from cardnews.scraping.http_fetch import close_http
+    await close_http()
 
 if __name__ == "__main__":
     uvicorn.run(
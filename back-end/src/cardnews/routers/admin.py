@@ -0,0 +1,137 @@
+# src/cardnews/routers/admin.py
+import asyncio
+import tracemalloc
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from cardnews.core import memory, pools
+from cardnews.core.db import pool_stats
+from cardnews.core.security import verify_admin_key
+from cardnews.core.settings import get_settings
+from cardnews.scraping.domains import registry as domain_registry
+from cardnews.services import log_export, log_lifecycle
+from cardnews.workers import llm_router
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(verify_admin_key)])
+
+
+@router.get("/pools")
+async def stage_pools():
+    """스테이지 풀(page_fetch / image_search / llm) 현재 점유·대기 현황"""
+    return pools.snapshot_all()
+
+
+@router.get("/mongo")
+async def mongo_pool():
+    """MongoDB 커넥션 풀 현황 (열린 연결 / 대여 중 / checkout 실패)"""
+    return pool_stats.snapshot()
+
+
+@router.get("/proxies")
+async def proxy_leases():
+    """프록시 포트별 임대 여부 / 남은 쿨다운 (mongo 백엔드면 전체 프로세스 공유 상태)"""
+    from cardnews.services import cardnews_service as svc
+
+    leases = getattr(svc.client, "leases", None)
+    if leases is None:
+        from cardnews.scraping.proxy_leases import make_lease_manager
+
+        s = get_settings()
+        leases = make_lease_manager([f"{s.proxy_host}:{p}" for p in s.ports], s.min_delay)
+    return await leases.snapshot()
+
+
+@router.get("/profiles")
+async def browser_profiles():
+    """프록시별 브라우저 프로필 사용 / 봇 탐지 횟수 (이 프로세스 기준)"""
+    from cardnews.scraping.profiles import get_store
+
+    return get_store().snapshot()
+
+
+@router.get("/domains")
+async def domains():
+    """본문 크롤링 도메인별 브레이커 상태 / 성공률 / 지연 중앙값 / HTTP·브라우저 프로필"""
+    return domain_registry.snapshot()
+
+
+@router.get("/llm")
+async def llm_models():
+    """stage × 모델별 호출 수 / 검증 통과율 / 평균 지연"""
+    return llm_router.snapshot()
+
+
+@router.get("/storage")
+async def storage():
+    """컬렉션별 문서 수 / 크기 / 디스크 사용량 + 마지막 로그 스위프 결과"""
+    return {
+        "collections": await log_lifecycle.storage_stats(),
+        "last_sweep": {k: v for k, v in log_lifecycle.last_sweep.items() if k != "storage"},
+    }
+
+
+@router.get("/memory")
+async def memory_usage():
+    """RSS (프로세스 / 프록시별 브라우저 트리), 최근 요청 peak, 대기 중 로그 태스크"""
+    from cardnews.services import cardnews_service as svc
+
+    snap = await asyncio.to_thread(memory.refresh_gauges)
+    tracing = tracemalloc.is_tracing()
+    traced, traced_peak = tracemalloc.get_traced_memory() if tracing else (None, None)
+    return {
+        **snap,
+        "tracemalloc": {"tracing": tracing, "traced": traced, "traced_peak": traced_peak},
+        "pending_log_tasks": len(svc.pending_logs),
+        "requests_in_flight": memory.in_flight(),
+        "recent_requests": memory.recent,
+    }
+
+
+@router.post("/memory/tracemalloc/start")
+async def tracemalloc_start(frames: int | None = None):
+    """tracemalloc 시작 (frames: 할당 위치당 저장할 스택 깊이)"""
+    memory.start_tracing(frames)
+    return {"tracing": True}
+
+
+@router.post("/memory/tracemalloc/stop")
+async def tracemalloc_stop():
+    memory.stop_tracing()
+    return {"tracing": False}
+
+
+@router.get("/memory/top")
+async def memory_top(limit: int = 20, group_by: str = "lineno", compare: bool = False):
+    """상위 할당 위치 (compare=true 면 직전 조회 대비 증가분)"""
+    if group_by not in ("lineno", "filename", "traceback"):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "group_by: lineno / filename / traceback")
+    try:
+        return await asyncio.to_thread(memory.top_allocators, limit, group_by, compare)
+    except RuntimeError as e:
+        raise HTTPException(status.HTTP_409_CONFLICT, str(e))
+
+
+@router.get("/logs/export")
+async def export_logs(
+    prefix: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after_ts: str | None = None,        # 이어받기: 마지막으로 받은 레코드의 ts
+    after_id: str | None = None,        #           〃                     _id
+    batch_size: int = Query(200, ge=1, le=5000),
+):
+    """로그를 (ts, _id) 순 NDJSON 으로 스트리밍 (메모리는 batch_size 에 비례)"""
+    try:
+        after = log_export.parse_watermark(after_ts, after_id)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, f"after_ts/after_id: {e}")
+    stream = log_export.iter_ndjson(
+        prefix=prefix,
+        since=since,
+        until=until,
+        after=after,
+        batch_size=batch_size,
+    )
+    return StreamingResponse(stream, media_type="application/x-ndjson")
@@ -1,13 +1,17 @@
 # src/cardnews/routers/cardnews.py
 from enum import Enum
+from typing import List
 
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import ORJSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from cardnews.core.cancellation import ClientDisconnected, until_disconnected
 from cardnews.core.security import verify_api_key
 from cardnews.core.settings import get_settings
+from cardnews.services import batch, payload, thumb_store
 from cardnews.services.cardnews_service import generate_and_log
 
 settings = get_settings()
@@ -29,22 +33,110 @@ class RangeEnum(str, Enum):
     none = "None"  # 파라미터 미전송 시 기본값
 
 
+class FormatEnum(str, Enum):
+    json = "json"
+    msgpack = "msgpack"
+
+
+def _img_base(request: Request) -> str:
+    base = settings.public_base_url or str(request.base_url)
+    return base.rstrip("/") + "/img/"
+
+
 @router.get("/generate", response_class=ORJSONResponse)
 @limiter.limit(f"{settings.rate_limit_per_min}/minute")
 async def generate_cardnews_endpoint(
     request: Request,                               # SlowAPI용 필수
     q: str,                                         # 검색 키워드
     range_: RangeEnum = RangeEnum.none,             # ← 복원 ✅
+    top_k: int | None = Query(None, ge=1, le=20),   # 카드별 이미지 후보 수
+    compact: bool = False,                          # base64 썸네일 → /img/{hash}
+    format: FormatEnum = FormatEnum.json,           # json / msgpack
     api_key_prefix: str = Depends(verify_api_key),  # API-Key 검증
 ):
     """
     카드뉴스 생성 엔드포인트  
-    - **q**      : 검색 키워드  
-    - **range**  : d, w, m, m3, y 또는 None  
+    - **q**        : 검색 키워드  
+    - **range**    : d, w, m, m3, y 또는 None  
+    - **top_k**    : 카드별 img_urls / ref_urls / img_desc 최대 개수  
+    - **compact**  : true 면 base64 썸네일을 `/img/{hash}` URL 로 치환  
+    - **format**   : json(기본) 또는 msgpack  
     """
+    if format == FormatEnum.msgpack and not payload.msgpack_available():
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                            detail="msgpack encoding is not available")
+
     # Enum → 실제 값(None / 'd' …)
     date_range = None if range_ == RangeEnum.none else range_.value
 
-    # 카드뉴스 생성 & 로그
-    data = await generate_and_log(q, date_range, api_key_prefix)
-    return data
+    # 카드뉴스 생성 & 로그 (직렬화된 bytes 그대로 전달)
+    # 클라이언트가 먼저 끊으면 파이프라인 취소 (core/cancellation.py)
+    try:
+        body = await until_disconnected(request, generate_and_log(
+            q,
+            date_range,
+            api_key_prefix,
+            top_k=top_k,
+            img_base=_img_base(request) if compact else None,
+            fmt=format.value,
+        ))
+    except ClientDisconnected:
+        return Response(status_code=499)   # nginx 관례: Client Closed Request
+    return Response(content=body, media_type=payload.MEDIA_TYPES[format.value])
+
+
+class BatchItem(BaseModel):
+    q: str
+    range_: RangeEnum = RangeEnum.none
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(..., min_length=1)
+    top_k: int | None = Field(None, ge=1, le=20)
+    compact: bool = False
+
+
+@router.post("/generate/batch")
+@limiter.limit(f"{settings.batch_rate_limit_per_min}/minute")
+async def generate_batch_endpoint(
+    request: Request,
+    req: BatchRequest,
+    api_key_prefix: str = Depends(verify_api_key),
+):
+    """
+    여러 키워드 카드뉴스 일괄 생성 – 결과를 끝나는 순서대로 NDJSON 으로 스트리밍
+    - 각 줄: `{"index": [원래 위치...], "q", "range", "status": "ok"|"error", "result"}`
+    - 같은 (q, range) 는 한 번만 생성해 해당 인덱스 전부에 돌려준다
+    """
+    if len(req.items) > settings.batch_max_items:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"batch is limited to {settings.batch_max_items} items")
+    items = [
+        (it.q, None if it.range_ == RangeEnum.none else it.range_.value)
+        for it in req.items
+    ]
+    stream = batch.run_batch(
+        items,
+        api_key_prefix,
+        top_k=req.top_k,
+        img_base=_img_base(request) if req.compact else None,
+    )
+    return StreamingResponse(stream, media_type="application/x-ndjson")
+
+
+@router.get("/img/{digest}")
+async def get_thumbnail(request: Request, digest: str = Path(..., pattern="^[0-9a-f]{64}$")):
+    """compact 응답의 썸네일. 내용 주소(sha256) 기반이라 영구 캐시 가능."""
+    etag = f'"{digest}"'
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    hit = await thumb_store.get(digest)
+    if hit is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    content_type, data = hit
+    return Response(content=data, media_type=content_type, headers=headers)
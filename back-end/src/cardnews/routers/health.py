@@ -1,21 +1,30 @@
-from fastapi import APIRouter
-from cardnews.core.db import mongo
-import asyncio
+from fastapi import APIRouter, Response, status
+from cardnews.core import readiness
 
 router = APIRouter()
 
 @router.get("/health")
 async def health():
-    try:
-        await mongo.client.admin.command({"ping": 1})
-        mongo_ok = True
-    except Exception:
-        mongo_ok = False
-
-    # proxy client 객체 존재 여부만 확인
-    proxy_ok = hasattr(mongo, "client")
+    # 백그라운드 프로브 결과 요약 (기존 응답 형태 유지)
+    checks = readiness.state["checks"]
+    mongo_ok = checks.get("mongo", {}).get("ok") is True
+    proxies = checks.get("proxies")
+    proxy_ok = proxies is not None and proxies["ok"] is not False
 
     return {
         "mongo": "ok" if mongo_ok else "fail",
         "proxy": "ok" if proxy_ok else "fail",
     }
+
+@router.get("/livez")
+async def livez():
+    """프로세스·이벤트 루프가 응답하는지만 확인 (의존성 검사 없음)"""
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz(response: Response):
+    """트래픽을 받아도 되는지 – 백그라운드에서 갱신한 스냅샷을 그대로 반환"""
+    ready = readiness.state["ready"] and readiness.is_fresh()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"ready": ready, **readiness.state}
@@ -0,0 +1,248 @@
+# domains.py
+"""도메인별 fetch 상태 – 서킷 브레이커 · 동시성 제한 · 학습된 fetch 프로필.
+
+본문 크롤링(``agent_runner.fetch_page_text``)이 도메인 단위로 결과를 기록한다.
+
+* 서킷 브레이커 – 최근 ``domain_breaker_window`` 건 중 실패율이
+  ``domain_breaker_failure_rate`` 이상이면 open → ``domain_breaker_cooldown``
+  동안 해당 도메인은 바로 건너뜀 → 이후 half-open 으로 한 건만 시험.
+  실패는 호스트 단위(접속 실패·차단)만 센다 – 404·빈 본문은 성공으로 친다.
+  여러 사용자가 나눠 쓰는 호스트(``domain_breaker_path_hosts``, 네이버 블로그
+  등)는 첫 경로(블로그 id)까지를 키로 써서 한 블로그가 호스트 전체를 막지 않는다.
+* 동시성 – 호스트당 ``domain_max_concurrency`` 개까지만 동시에 fetch
+  (공유 호스트도 블로그 수와 관계없이 호스트 하나로 센다).
+* 프로필 – 가벼운 HTTP GET 으로 충분한 호스트인지(브라우저 불필요),
+  성공률, 지연 중앙값을 학습한다.
+
+open 도메인은 FILTER_AGENT 에 넘기기 전 검색 결과에서도 빠진다.
+상태는 프로세스 메모리에만 있다 (워커마다 따로 학습). 호스트·브레이커 표는
+각각 ``domain_registry_max_entries`` 개까지 두고, 넘치면 오래 안 쓴 유휴
+항목부터 버린다.
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+import urllib.parse
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Iterable, List
+
+from prometheus_client import Counter
+
+from cardnews.core.settings import get_settings
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_BREAKER_OPENED = Counter("domain_breaker_opened", "Per-domain circuit breaker trips")
+
+
+class DomainOpen(RuntimeError):
+    """서킷이 열린 도메인 – fetch 하지 않음."""
+
+
+def domain_of(url: str) -> str:
+    host = urllib.parse.urlsplit(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def breaker_key(url: str) -> str:
+    """상태 키 – 보통은 호스트, 공유 호스트는 ``host/첫 경로``.
+
+    ``m.blog.naver.com/PostView.naver?blogId=x`` 처럼 경로가 스크립트면
+    ``blogId`` 쿼리를 쓴다.
+    """
+    host = domain_of(url)
+    if host not in get_settings().domain_breaker_path_hosts:
+        return host
+    parts = urllib.parse.urlsplit(url)
+    seg = parts.path.strip("/").split("/", 1)[0]
+    if "." in seg:
+        seg = urllib.parse.parse_qs(parts.query).get("blogId", [""])[0]
+    return f"{host}/{seg}" if seg else host
+
+
+class HostState:
+    """호스트 단위 – 동시성 제한과 HTTP/브라우저 프로필."""
+
+    def __init__(self):
+        self.sem = asyncio.Semaphore(get_settings().domain_max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.latencies: Deque[float] = deque(maxlen=50)
+        self.http_ok = 0
+        self.http_fail = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        try:
+            await self.sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.sem.release()
+
+    @property
+    def idle(self) -> bool:
+        return not self.active and not self.waiting
+
+    @property
+    def prefers_http(self) -> bool:
+        """HTTP 로 충분했던 호스트이거나 아직 모르는 호스트면 True."""
+        return self.http_fail < 2 or self.http_ok > self.http_fail
+
+    def record_http(self, ok: bool) -> None:
+        if ok:
+            self.http_ok += 1
+        else:
+            self.http_fail += 1
+
+    def snapshot(self) -> Dict:
+        return {
+            "median_seconds": round(statistics.median(self.latencies), 2) if self.latencies else None,
+            "http_ok": self.http_ok,
+            "http_fail": self.http_fail,
+            "mode": "http" if self.prefers_http else "browser",
+            "active": self.active,
+            "waiting": self.waiting,
+        }
+
+
+class DomainState:
+    """브레이커 키 단위 상태. 동시성·프로필은 ``host`` (호스트 공용) 에 위임."""
+
+    def __init__(self, host: HostState):
+        self.host = host
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.outcomes: Deque[bool] = deque(maxlen=get_settings().domain_breaker_window)
+
+    # -- 호스트 공용 -----------------------------------------------------
+    def slot(self):
+        return self.host.slot()
+
+    @property
+    def prefers_http(self) -> bool:
+        return self.host.prefers_http
+
+    def record_http(self, ok: bool) -> None:
+        self.host.record_http(ok)
+
+    @property
+    def idle(self) -> bool:
+        return self.state == CLOSED and not self.probing
+
+    # -- 브레이커 --------------------------------------------------------
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= get_settings().domain_breaker_cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self.probing:
+            self.probing = True           # half-open 은 시험 요청 하나만
+            return True
+        return False
+
+    def record(self, ok: bool, seconds: float | None = None) -> None:
+        s = get_settings()
+        self.outcomes.append(ok)
+        if ok and seconds is not None:
+            self.host.latencies.append(seconds)
+        if self.state == HALF_OPEN:
+            self.probing = False
+            if ok:
+                self.state = CLOSED
+                self.outcomes.clear()
+            else:
+                self._trip()
+            return
+        failures = self.outcomes.count(False)
+        if (
+            self.state == CLOSED
+            and len(self.outcomes) >= s.domain_breaker_min_calls
+            and failures / len(self.outcomes) >= s.domain_breaker_failure_rate
+        ):
+            self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        _BREAKER_OPENED.inc()
+
+    def snapshot(self) -> Dict:
+        n = len(self.outcomes)
+        return {
+            "state": self.state,
+            "success_rate": round(self.outcomes.count(True) / n, 3) if n else None,
+            "calls": n,
+        }
+
+
+def _evict(table: "OrderedDict[str, HostState | DomainState]") -> None:
+    """상한을 넘으면 오래 안 쓴 유휴 항목부터 버린다 (사용 중·open 은 남김)."""
+    excess = len(table) - get_settings().domain_registry_max_entries
+    if excess <= 0:
+        return
+    stale = []
+    for key, st in table.items():          # 앞쪽이 오래 안 쓴 항목
+        if st.idle:
+            stale.append(key)
+            if len(stale) == excess:
+                break
+    for key in stale:
+        del table[key]
+
+
+class DomainRegistry:
+    def __init__(self):
+        self._hosts: "OrderedDict[str, HostState]" = OrderedDict()
+        self._domains: "OrderedDict[str, DomainState]" = OrderedDict()
+
+    def _host(self, url: str) -> HostState:
+        h = domain_of(url)
+        st = self._hosts.get(h)
+        if st is None:
+            st = self._hosts[h] = HostState()
+            _evict(self._hosts)
+        else:
+            self._hosts.move_to_end(h)
+        return st
+
+    def get(self, url: str) -> DomainState:
+        d = breaker_key(url)
+        st = self._domains.get(d)
+        if st is None:
+            st = self._domains[d] = DomainState(self._host(url))
+            _evict(self._domains)
+        else:
+            self._domains.move_to_end(d)
+            st.host = self._host(url)     # 호스트 항목이 버려졌다면 새로 붙임
+        return st
+
+    def is_open(self, url: str) -> bool:
+        """브레이커가 열려 있어 당분간 건너뛸 도메인인지 (상태를 바꾸지 않음)."""
+        st = self._domains.get(breaker_key(url))
+        if st is None or st.state == CLOSED:
+            return False
+        if st.state == OPEN:
+            return time.monotonic() - st.opened_at < get_settings().domain_breaker_cooldown
+        return st.probing
+
+    def drop_open(self, items: Iterable, key=lambda x: x) -> List:
+        return [it for it in items if not self.is_open(key(it))]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {
+            "hosts": {h: st.snapshot() for h, st in sorted(self._hosts.items())},
+            "breakers": {d: st.snapshot() for d, st in sorted(self._domains.items())},
+        }
+
+
+registry = DomainRegistry()
@@ -0,0 +1,280 @@
+# extract.py
+"""기사 본문 추출 (readability 방식).
+
+태그 몇 개만 지우고 body 텍스트를 통째로 넣으면 댓글·사이드바·관련 기사
+목록·쿠키 배너가 ``page_texts`` 를 채우고, 20,000 자 컷에 정작 본문이
+잘려 나간다. 여기서는
+
+1. 사이트별 규칙 – 네이버 블로그(모바일)·네이버/다음 뉴스·주요 언론사의
+   본문 컨테이너 셀렉터를 먼저 시도하고,
+2. 없으면 블록별 점수(텍스트 길이·구두점 수 → 부모/조부모에 누적,
+   class/id 가중치, 링크 밀도 감점)로 본문 후보를 고른 뒤
+   점수가 비슷한 형제 블록까지 붙인다.
+
+본문이 ``page_extract_min_chars`` 보다 짧게 나오면 기존 방식(전체 텍스트)으로
+돌아간다. 제목·작성일은 메타 태그에서 따로 뽑는다.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+from cardnews.core.settings import get_settings
+
+# 사이트별 본문 컨테이너 (앞쪽이 우선)
+SITE_RULES: List[str] = [
+    # 네이버 블로그 (모바일 / SmartEditor ONE · 구 에디터)
+    "div.se-main-container", "div#viewTypeSelector", "div.post_ct",
+    # 네이버 뉴스 / 다음 뉴스
+    "#dic_area", "#newsct_article", "#articleBodyContents",
+    "div.article_view", "section[dmcf-ptype='general']",
+    # 주요 언론사 CMS
+    "#article-view-content-div",            # 지역·전문지 다수 (ndsoft)
+    "section.article-body",                 # 조선
+    "div#article_body",                     # 중앙
+    "section.news_view", "div.article_txt", # 동아
+    "div.article-text",                     # 한겨레
+    "article.story-news", "div.story-news", # 연합
+    "#cont_newstext",                       # KBS
+    "div#articletxt", "div#news_body_id", "div.news_cnt_detail_wrap",
+    # 티스토리 / 브런치
+    "div.tt_article_useless_p_margin", "div.contents_style", "div.wrap_body",
+    # 마크업 표준
+    "[itemprop='articleBody']",
+]
+# 트리를 규칙마다 훑지 않도록 한 번의 select 로 모은 뒤 규칙 순서로 정렬
+_RULES = [soupsieve.compile(sel) for sel in SITE_RULES]
+_ANY_RULE = soupsieve.compile(", ".join(SITE_RULES))
+
+# 네이버 블로그 PC 페이지는 본문을 iframe 에 담는다 → 모바일 페이지로 fetch
+_NAVER_BLOG = re.compile(r"^(?:www\.)?blog\.naver\.com$")
+
+_JUNK_TAGS = (
+    "script", "style", "noscript", "template", "form", "button", "select",
+    "img", "svg", "canvas", "iframe", "video", "audio",
+    "nav", "header", "footer", "aside",
+)
+_JUNK_ROLES = ("navigation", "banner", "contentinfo", "complementary", "dialog", "alert")
+
+_NEGATIVE = re.compile(
+    r"comment|reply|related|recommend|sidebar|side_|widget|cookie|consent|gdpr|"
+    r"banner|share|sns|social|footer|header|gnb|lnb|menu|nav(?!er)|popup|modal|"
+    r"advert|(?:^|[-_ ])ads?(?:$|[-_ ])|sponsor|promo|subscribe|newsletter|copyright|"
+    r"byline|breadcrumb|(?:^|[-_ ])tags?(?:$|[-_ ])|rank|popular|keyword|login|pagination",
+    re.I,
+)
+_POSITIVE = re.compile(r"article|body|content|entry|main|post|text|story|view|news_?cont", re.I)
+_PUNCT = re.compile(r"[,，、.。!?]")
+
+_BLOCKS = ("p", "pre", "td", "blockquote", "li", "h2", "h3", "h4", "div", "section", "article")
+
+_TITLE_META = ("og:title", "twitter:title")
+_DATE_META = (
+    "article:published_time", "og:article:published_time", "datePublished",
+    "pubdate", "publishdate", "date", "article:modified_time",
+)
+_DATE_NODES = [
+    soupsieve.compile(sel) for sel in (
+        "span.media_end_head_info_datestamp_time", "span.se_publishDate",
+        "p.blog_date", "span.date", "time",
+    )
+]
+_ANY_DATE = soupsieve.compile(", ".join(sel.pattern for sel in _DATE_NODES))
+
+
+def mobile_url(url: str) -> str:
+    """blog.naver.com → m.blog.naver.com (PC 페이지는 iframe 이라 본문이 비어 있음)."""
+    parts = urlsplit(url)
+    if _NAVER_BLOG.match(parts.netloc.lower()):
+        return urlunsplit(parts._replace(netloc="m.blog.naver.com"))
+    return url
+
+
+def _attrs(el: Tag) -> str:
+    return " ".join(el.get("class") or []) + " " + (el.get("id") or "")
+
+
+def _text(el: Tag) -> str:
+    return " ".join(el.get_text(" ", strip=True).split())
+
+
+def _link_lengths(root: Tag) -> Dict[int, int]:
+    """요소별 하위 <a> 텍스트 길이 합 – 링크마다 조상으로 한 번씩 올려 더한다."""
+    out: Dict[int, int] = {}
+    for a in root.find_all("a"):
+        n = len(_text(a))
+        node = a
+        while isinstance(node, Tag):
+            out[id(node)] = out.get(id(node), 0) + n
+            node = node.parent
+    return out
+
+
+def _link_density(el: Tag, text_len: int, links: Dict[int, int]) -> float:
+    if not text_len:
+        return 0.0
+    return min(1.0, links.get(id(el), 0) / text_len)
+
+
+def _metas(soup: BeautifulSoup) -> Dict[str, str]:
+    """<meta property|name|itemprop=… content=…> 를 한 번에 모음 (먼저 나온 값 우선)."""
+    out: Dict[str, str] = {}
+    for tag in soup.find_all("meta", content=True):
+        key = tag.get("property") or tag.get("name") or tag.get("itemprop")
+        if key and tag["content"].strip():
+            out.setdefault(key, tag["content"].strip())
+    return out
+
+
+def _first(metas: Dict[str, str], names) -> Optional[str]:
+    return next((metas[n] for n in names if n in metas), None)
+
+
+def _title(soup: BeautifulSoup, metas: Dict[str, str]) -> Optional[str]:
+    title = _first(metas, _TITLE_META)
+    if not title:
+        h1 = soup.find("h1")
+        title = _text(h1) if h1 else None
+    if not title and soup.title:
+        title = _text(soup.title)
+    return title or None
+
+
+def _date(soup: BeautifulSoup, metas: Dict[str, str]) -> Optional[str]:
+    date = _first(metas, _DATE_META)
+    if date:
+        return date
+    found = _ANY_DATE.select(soup)
+    found.sort(key=lambda el: next(i for i, sel in enumerate(_DATE_NODES) if sel.match(el)))
+    for el in found:
+        value = el.get("data-date-time") or el.get("datetime") or _text(el)
+        if value:
+            return value.strip()
+    return None
+
+
+def _strip_junk(root: Tag) -> None:
+    for el in root.find_all(_JUNK_TAGS):
+        el.decompose()
+    for el in root.find_all(attrs={"role": _JUNK_ROLES}):
+        el.decompose()
+    for el in root.find_all(True):
+        if el.decomposed or el.name in ("html", "body", "article", "main"):
+            continue
+        attrs = _attrs(el)
+        if attrs.strip() and _NEGATIVE.search(attrs) and not _POSITIVE.search(attrs):
+            el.decompose()
+
+
+def _blocks_text(root: Tag) -> str:
+    """블록 경계는 줄바꿈으로 남긴다 (문단 구분은 LLM 에게 유용)."""
+    lines = [" ".join(line.split()) for line in root.get_text("\n", strip=True).splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def _class_weight(el: Tag) -> float:
+    attrs = _attrs(el)
+    weight = 0.0
+    if _NEGATIVE.search(attrs):
+        weight -= 25
+    if _POSITIVE.search(attrs):
+        weight += 25
+    return weight
+
+
+def _best_candidate(root: Tag) -> Optional[Tag]:
+    scores: Dict[int, float] = {}
+    nodes: Dict[int, Tag] = {}
+
+    def _init(el: Tag) -> None:
+        if id(el) not in scores:
+            base = {"article": 10, "div": 5, "section": 3, "td": 3, "pre": 3, "blockquote": 3}
+            scores[id(el)] = base.get(el.name, 0) + _class_weight(el)
+            nodes[id(el)] = el
+
+    blocks = root.find_all(_BLOCKS)
+    links = _link_lengths(root)
+    # 블록 자손이 있는 div/section 은 문단이 아니라 컨테이너 – 가장 가까운 블록 조상만 표시
+    containers = set()
+    for el in blocks:
+        anc = el.parent
+        while isinstance(anc, Tag) and anc.name not in _BLOCKS:
+            anc = anc.parent
+        if isinstance(anc, Tag):
+            containers.add(id(anc))
+
+    for el in blocks:
+        if el.name in ("div", "section", "article") and id(el) in containers:
+            continue
+        text = _text(el)
+        if len(text) < 25:
+            continue
+        score = 1 + len(_PUNCT.findall(text)) + min(len(text) // 100, 3)
+        parent = el.parent
+        grand = parent.parent if isinstance(parent, Tag) else None
+        for anc, share in ((parent, 1.0), (grand, 0.5)):
+            if isinstance(anc, Tag) and anc.name not in ("html", "[document]"):
+                _init(anc)
+                scores[id(anc)] += score * share
+
+    best, best_score = None, 0.0
+    for key, el in nodes.items():
+        text_len = len(_text(el))
+        final = scores[key] * (1 - _link_density(el, text_len, links))
+        if final > best_score:
+            best, best_score = el, final
+    if best is None:
+        return None
+
+    # 점수가 비슷한 형제 블록 (본문이 여러 div 로 나뉜 경우) 도 합친다
+    threshold = max(10.0, best_score * 0.2)
+    parent = best.parent
+    if not isinstance(parent, Tag):
+        return best
+    wrapper = BeautifulSoup("<div></div>", "html.parser").div
+    for sib in list(parent.children):
+        if not isinstance(sib, Tag):
+            continue
+        keep = sib is best
+        if not keep and id(sib) in scores:
+            text_len = len(_text(sib))
+            keep = scores[id(sib)] * (1 - _link_density(sib, text_len, links)) >= threshold
+        if not keep and sib.name == "p":
+            text = _text(sib)
+            keep = len(text) > 80 and _link_density(sib, len(text), links) < 0.25
+        if keep:
+            wrapper.append(sib.extract())
+    return wrapper
+
+
+def extract_article(html: str) -> Dict[str, Optional[str]]:
+    """HTML → ``{"title", "date", "text"}``. text 는 본문만 (문단은 줄바꿈)."""
+    soup = BeautifulSoup(html, "html.parser")
+    metas = _metas(soup)
+    title, date = _title(soup, metas), _date(soup, metas)
+    root = soup.body or soup
+    min_chars = get_settings().page_extract_min_chars
+
+    text = ""
+    matched = _ANY_RULE.select(root)
+    matched.sort(key=lambda el: next(i for i, rule in enumerate(_RULES) if rule.match(el)))
+    for el in matched:
+        _strip_junk(el)
+        text = _blocks_text(el)
+        if len(text) >= min_chars:
+            break
+        text = ""
+
+    if not text:
+        _strip_junk(root)
+        full = _blocks_text(root)
+        candidate = _best_candidate(root)
+        text = _blocks_text(candidate) if candidate is not None else ""
+        if len(text) < min_chars:
+            text = full          # 점수로 못 고르면 (정리된) 전체 텍스트
+
+    return {"title": title, "date": date, "text": text}
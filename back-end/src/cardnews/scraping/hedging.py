@@ -0,0 +1,111 @@
+# hedging.py
+"""꼬리 지연(tail latency) 완화 도구.
+
+* ``LatencyTracker`` – 최근 성공 요청 지연 분포 (p90 등 분위수 조회)
+* ``hedged``        – 요청이 (슬롯을 얻은 뒤로) 분위수를 넘기면 같은 작업을 한 번 더 띄우고
+                      먼저 성공한 쪽을 채택 (ProxyRotationClient 는 호출마다
+                      프록시를 임대하고, 첫 요청이 아직 임대를 쥐고 있으므로
+                      중복 요청은 다른 프록시로 간다 – 빈 프록시가 없으면
+                      lease 대기 후 LeaseTimeout)
+* ``first_k``       – N 개 중 K 개가 성공하면 grace 만큼만 더 기다리고 나머지는
+                      취소, 스테이지 deadline 이 지나도 취소
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.hedges = 0
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """샘플이 부족하면 None (= 헤징하지 않음)."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def hedged(
+    factory: Callable[[], Awaitable[Any]],
+    hedge_after: float | None,
+    tracker: LatencyTracker | None = None,
+    *,
+    started: asyncio.Event | None = None,
+    should_hedge: Callable[[], bool] | None = None,
+) -> Any:
+    """``factory()`` 를 실행하고, ``hedge_after`` 초 안에 끝나지 않으면 한 번 더 실행.
+
+    ``started`` 를 주면 그 이벤트가 set 된 뒤부터(= 작업이 동시성 슬롯을 얻은 뒤)
+    시간을 잰다 – 대기열에서 기다린 시간으로 헤징하면 포화 때 부하만 두 배가 된다.
+    ``should_hedge()`` 가 False 면(대기자가 있는 등) 중복 요청을 띄우지 않는다.
+    """
+    primary = asyncio.ensure_future(factory())
+    if hedge_after is None:
+        return await primary
+
+    pending = {primary}
+    try:
+        if started is not None:
+            waiter = asyncio.ensure_future(started.wait())
+            try:
+                await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        if not done and (should_hedge is None or should_hedge()):
+            pending.add(asyncio.ensure_future(factory()))
+            if tracker is not None:
+                tracker.hedges += 1
+
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    return t.result()
+                error = error or t.exception()
+        raise error
+    finally:
+        for t in pending:
+            t.cancel()
+
+
+async def first_k(
+    coros: Iterable[Awaitable[Any]],
+    k: int,
+    deadline: float,
+    grace: float = 0.0,
+    ok: Callable[[Any], bool] = bool,
+) -> Dict[int, Any]:
+    """완료된 결과만 ``{index: result}`` 로 반환 (실패·미완료 인덱스는 빠짐)."""
+    tasks = {asyncio.ensure_future(c): i for i, c in enumerate(coros)}
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    results: Dict[int, Any] = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            timeout = end - loop.time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for t in done:
+                if t.exception() is None:
+                    results[tasks[t]] = t.result()
+            if pending and sum(1 for v in results.values() if ok(v)) >= k:
+                end = min(end, loop.time() + grace)
+    finally:
+        for t in pending:
+            t.cancel()
+    return results
@@ -0,0 +1,62 @@
+# http_fetch.py
+"""브라우저 없이 HTTP GET 한 번으로 본문을 가져오는 빠른 경로.
+
+정적 HTML 로 본문이 충분히 나오는 사이트(뉴스·블로그 대부분)는 Camoufox 를
+띄울 필요가 없다. 충분한 본문을 얻지 못하면 text None → 호출 측이 브라우저로
+재시도. 요청은 ``ProxyRotationClient.fetch_http`` 가 임대한 프록시를 거친다
+(프록시별 커넥션 풀).
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Dict, Tuple
+
+import httpx
+
+from cardnews.core.settings import get_settings
+
+_clients: Dict[str | None, httpx.AsyncClient] = {}
+
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8",
+}
+
+
+def _http(proxy: str | None) -> httpx.AsyncClient:
+    client = _clients.get(proxy)
+    if client is None:
+        client = _clients[proxy] = httpx.AsyncClient(
+            timeout=get_settings().domain_http_timeout,
+            follow_redirects=True,
+            headers=_HEADERS,
+            proxy=proxy,
+        )
+    return client
+
+
+async def fetch_text(url: str, proxy: str | None = None) -> Tuple[int | None, str | None]:
+    """(HTTP status, 본문). 연결 실패·잘못된 URL 이면 status None, 본문이 부족하면 text None."""
+    from cardnews.scraping.parsers import PARSERS
+
+    try:
+        resp = await _http(proxy).get(url)
+        if resp.status_code != 200 or "html" not in resp.headers.get("content-type", ""):
+            return resp.status_code, None
+        html = resp.text
+    except (httpx.HTTPError, httpx.InvalidURL, ValueError):
+        return None, None
+    except LookupError:               # 알 수 없는 charset
+        return resp.status_code, None
+    text = await asyncio.to_thread(PARSERS["text_page"], html)
+    return resp.status_code, (text if len(text) >= get_settings().domain_http_min_chars else None)
+
+
+async def close_http() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
@@ -0,0 +1,359 @@
+# image_probe.py
+"""이미지 URL 검증 & 메타데이터 프리페치.
+
+``search_google_images`` 가 돌려준 썸네일 URL 을 Range GET 으로 앞부분만
+받아 content-type · 해상도(px) · byte size 를 채운다.
+
+* 깨진 링크 / 이미지가 아닌 응답 / 너무 작은 이미지는 제거
+* perceptual hash(dHash, Pillow 설치 시) 로 시각적 중복 제거
+* ``data:`` URI 는 네트워크 없이 로컬 디코딩
+* 프로브 결과는 URL 단위로 TTL 캐시 (실패는 ``image_probe_negative_ttl`` 로 짧게)
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from urllib.parse import unquote_to_bytes
+
+import httpx
+
+from cardnews.core.settings import get_settings
+
+try:  # Pillow 는 선택 의존성 (perceptual hash 용)
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None
+
+
+@dataclass
+class ImageMeta:
+    url: str
+    ok: bool
+    content_type: str | None = None
+    width: int | None = None
+    height: int | None = None
+    size: int | None = None          # 전체 byte 수 (알 수 없으면 None)
+    phash: int | None = None         # 64bit dHash
+    digest: str | None = None        # 전체 본문을 받았을 때의 sha1
+    error: str | None = None
+
+
+# ---------------------------------------------------------------------------
+# 헤더 스니핑 (PNG / GIF / JPEG / WebP / BMP)
+# ---------------------------------------------------------------------------
+def _sniff_format(data: bytes) -> str | None:
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data.startswith(b"BM"):
+        return "image/bmp"
+    return None
+
+
+def _jpeg_size(data: bytes) -> Tuple[int, int] | None:
+    i = 2
+    n = len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        seg_len = struct.unpack(">H", data[i + 2:i + 4])[0]
+        # SOF0..SOF15 (DHT/JPG/DAC 제외)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return w, h
+        i += 2 + seg_len
+    return None
+
+
+def sniff_dimensions(data: bytes) -> Tuple[int, int] | None:
+    """이미지 앞부분 byte 만으로 (width, height) 추정. 실패 시 None."""
+    fmt = _sniff_format(data)
+    try:
+        if fmt == "image/png" and len(data) >= 24:
+            return struct.unpack(">II", data[16:24])
+        if fmt == "image/gif" and len(data) >= 10:
+            return struct.unpack("<HH", data[6:10])
+        if fmt == "image/jpeg":
+            return _jpeg_size(data)
+        if fmt == "image/bmp" and len(data) >= 26:
+            w, h = struct.unpack("<ii", data[18:26])
+            return w, abs(h)
+        if fmt == "image/webp" and len(data) >= 30:
+            chunk = data[12:16]
+            if chunk == b"VP8 ":
+                w, h = struct.unpack("<HH", data[26:30])
+                return w & 0x3FFF, h & 0x3FFF
+            if chunk == b"VP8L":
+                b = data[21:25]
+                w = 1 + (((b[1] & 0x3F) << 8) | b[0])
+                h = 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+                return w, h
+            if chunk == b"VP8X":
+                w = 1 + int.from_bytes(data[24:27], "little")
+                h = 1 + int.from_bytes(data[27:30], "little")
+                return w, h
+    except struct.error:
+        return None
+    return None
+
+
+def _dhash(data: bytes) -> int | None:
+    """64bit difference hash. Pillow 가 없거나 디코딩 실패 시 None."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            px = list(im.convert("L").resize((9, 8)).getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return bits
+
+
+def _fill_from_bytes(meta: ImageMeta, data: bytes, complete: bool) -> None:
+    meta.content_type = _sniff_format(data) or meta.content_type
+    dims = sniff_dimensions(data)
+    if dims:
+        meta.width, meta.height = dims
+    if complete:
+        meta.size = len(data)
+        meta.digest = hashlib.sha1(data).hexdigest()
+        meta.phash = _dhash(data)
+
+
+# ---------------------------------------------------------------------------
+# URL 단위 TTL 캐시
+# ---------------------------------------------------------------------------
+class _ProbeCache:
+    def __init__(self, maxsize: int, ttl: int, negative_ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._data: "OrderedDict[str, Tuple[float, ImageMeta]]" = OrderedDict()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        # data: URI 는 수십 KB 라 키로 쓰지 않고 해시만 보관
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def get(self, url: str) -> ImageMeta | None:
+        k = self._key(url)
+        hit = self._data.get(k)
+        if not hit:
+            return None
+        expires, meta = hit
+        if time.monotonic() > expires:
+            del self._data[k]
+            return None
+        self._data.move_to_end(k)
+        return meta
+
+    def put(self, url: str, meta: ImageMeta) -> None:
+        k = self._key(url)
+        ttl = self.ttl if meta.ok else self.negative_ttl
+        if ttl <= 0:
+            self._data.pop(k, None)
+            return
+        self._data[k] = (time.monotonic() + ttl, meta)
+        self._data.move_to_end(k)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+# ---------------------------------------------------------------------------
+# 프로브 본체
+# ---------------------------------------------------------------------------
+class ImageProber:
+    """커넥션 풀 + 동시성 제한 + 캐시를 공유하는 프로세스 단위 프로버."""
+
+    def __init__(self):
+        s = get_settings()
+        self.max_bytes = s.image_probe_max_bytes
+        self.timeout = s.image_probe_timeout
+        self.cache = _ProbeCache(s.image_probe_cache_size, s.image_probe_cache_ttl, s.image_probe_negative_ttl)
+        self._sem = asyncio.Semaphore(s.image_probe_concurrency)
+        self._http: httpx.AsyncClient | None = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            s = get_settings()
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=s.image_probe_concurrency,
+                    max_keepalive_connections=s.image_probe_concurrency,
+                ),
+                headers={"User-Agent": "Mozilla/5.0 (cardnews image probe)"},
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _probe_data_uri(self, url: str) -> ImageMeta:
+        """``data:`` URI – 선언된 MIME 이 image/* 이고 헤더에서 해상도를 읽었을 때만 ok."""
+        meta = ImageMeta(url=url, ok=False)
+        try:
+            header, payload = url.split(",", 1)
+            meta.content_type = header[5:].split(";", 1)[0].strip().lower() or None
+            if not (meta.content_type or "").startswith("image/"):
+                meta.error = f"not an image ({meta.content_type})"
+                return meta
+            if ";base64" in header:
+                data = base64.b64decode("".join(unquote_to_bytes(payload).decode("ascii").split()), validate=True)
+            else:
+                data = unquote_to_bytes(payload)
+        except (ValueError, binascii.Error) as e:
+            meta.error = f"bad data uri: {e}"
+            return meta
+        _fill_from_bytes(meta, data, complete=True)
+        meta.ok = bool(
+            meta.content_type and meta.content_type.startswith("image/")
+            and meta.width and meta.height
+        )
+        if not meta.ok:
+            meta.error = f"undecodable image payload ({meta.content_type})"
+        return meta
+
+    async def _probe_remote(self, url: str) -> ImageMeta:
+        meta = ImageMeta(url=url, ok=False)
+        headers = {"Range": f"bytes=0-{self.max_bytes - 1}"}
+        try:
+            async with self._sem:
+                async with self._client().stream("GET", url, headers=headers) as resp:
+                    if resp.status_code >= 400:
+                        meta.error = f"HTTP {resp.status_code}"
+                        return meta
+                    meta.content_type = resp.headers.get("content-type", "").split(";")[0] or None
+                    buf = bytearray()
+                    async for chunk in resp.aiter_bytes():
+                        buf.extend(chunk)
+                        if len(buf) >= self.max_bytes:
+                            break
+                    total = _total_size(resp.headers, resp.status_code)
+        except (httpx.HTTPError, httpx.InvalidURL, ValueError, asyncio.TimeoutError) as e:
+            # InvalidURL / ValueError – 검색 결과의 깨진 src (잘못된 포트·IDN 등)
+            meta.error = f"{type(e).__name__}: {e}"
+            return meta
+
+        data = bytes(buf[: self.max_bytes])
+        complete = total is not None and len(data) >= total
+        _fill_from_bytes(meta, data, complete)
+        if total is not None:
+            meta.size = total
+        meta.ok = bool(meta.content_type and meta.content_type.startswith("image/"))
+        if not meta.ok:
+            meta.error = f"not an image ({meta.content_type})"
+        return meta
+
+    async def probe(self, url: str) -> ImageMeta:
+        cached = self.cache.get(url)
+        if cached is not None:
+            return cached
+        if url.startswith("data:"):
+            meta = self._probe_data_uri(url)
+        elif url.startswith(("http://", "https://")):
+            meta = await self._probe_remote(url)
+        else:
+            meta = ImageMeta(url=url, ok=False, error="unsupported scheme")
+        self.cache.put(url, meta)
+        return meta
+
+
+def _total_size(headers: httpx.Headers, status: int) -> int | None:
+    # 206 → Content-Range: bytes 0-65535/123456
+    cr = headers.get("content-range")
+    if cr and "/" in cr:
+        total = cr.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    cl = headers.get("content-length")
+    if status == 200 and cl and cl.isdigit():
+        return int(cl)
+    return None
+
+
+def _acceptable(meta: ImageMeta) -> bool:
+    s = get_settings()
+    if not meta.ok:
+        return False
+    if meta.size is not None and meta.size < s.image_min_bytes:
+        return False
+    if meta.width is not None and meta.height is not None:
+        if meta.width < s.image_min_width or meta.height < s.image_min_height:
+            return False
+    return True
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+# ---------------------------------------------------------------------------
+# 외부 API
+# ---------------------------------------------------------------------------
+_prober: ImageProber | None = None
+
+
+def get_prober() -> ImageProber:
+    global _prober
+    if _prober is None:
+        _prober = ImageProber()
+    return _prober
+
+
+async def close_prober() -> None:
+    if _prober is not None:
+        await _prober.aclose()
+
+
+async def filter_images(items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """이미지 검색 결과(``img_url`` 키 포함 dict 리스트)를 검증·중복 제거.
+
+    원래 순서(검색 랭킹)는 유지하고, 프로브 결과가 나쁜 항목만 빠진다.
+    """
+    prober = get_prober()
+    max_dist = get_settings().image_phash_distance
+    metas: List[ImageMeta] = await asyncio.gather(
+        *[prober.probe(it["img_url"]) for it in items]
+    )
+
+    kept: List[Dict[str, str]] = []
+    seen_digest: set[str] = set()
+    seen_phash: List[int] = []
+    for item, meta in zip(items, metas):
+        if not _acceptable(meta):
+            continue
+        if meta.digest:
+            if meta.digest in seen_digest:
+                continue
+            seen_digest.add(meta.digest)
+        if meta.phash is not None:
+            if any(_hamming(meta.phash, h) <= max_dist for h in seen_phash):
+                continue
+            seen_phash.append(meta.phash)
+        kept.append(item)
+    return kept
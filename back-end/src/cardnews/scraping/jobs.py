@@ -0,0 +1,196 @@
+# jobs.py
+"""스크래핑 잡 큐 – API 프로세스와 스크래핑 워커를 분리한다.
+
+API 쪽은 ``QueueScrapeClient`` 를 ``ProxyRotationClient`` 대신 주입받아
+``fetch_parsed(url, parser)`` 를 잡으로 넣고 결과를 기다린다.
+워커(``cardnews.workers.scrape_worker``)는 잡을 claim 해서 자기 브라우저
+풀로 가져오고 파싱한 결과만 돌려준다.
+
+백엔드
+-------
+* ``MongoJobQueue`` – ``scrape_jobs`` 컬렉션. 여러 호스트/프로세스 간 공유.
+* ``LocalJobQueue`` – asyncio.Queue 기반 in-process 대체재 (개발·테스트용).
+"""
+from __future__ import annotations
+
+import asyncio
+import socket
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Tuple
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from cardnews.core.settings import get_settings
+
+QUEUED, RUNNING, DONE, FAILED, EXPIRED, CANCELLED = (
+    "queued", "running", "done", "failed", "expired", "cancelled"
+)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class MongoJobQueue:
+    def __init__(self, collection):
+        self.col = collection
+
+    # -- API 쪽 ------------------------------------------------------------
+    async def enqueue(self, url: str, parser: str) -> ObjectId:
+        res = await self.col.insert_one({
+            "url": url,
+            "parser": parser,
+            "status": QUEUED,
+            "created": datetime.utcnow(),
+        })
+        return res.inserted_id
+
+    async def wait(self, job_id: ObjectId, timeout: float) -> Any:
+        s = get_settings()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = s.scrape_job_poll_interval
+        while loop.time() < deadline:
+            doc = await self.col.find_one(
+                {"_id": job_id, "status": {"$in": [DONE, FAILED]}},
+                {"status": 1, "result": 1, "error": 1},
+            )
+            if doc:
+                if doc["status"] == FAILED:
+                    raise RuntimeError(doc.get("error") or "scrape job failed")
+                return doc.get("result")
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 1.0)
+
+        # 아직 claim 되지 않았다면 워커가 집어가지 않도록 만료 처리
+        await self.col.update_one({"_id": job_id, "status": QUEUED}, {"$set": {"status": EXPIRED}})
+        raise asyncio.TimeoutError(f"scrape job {job_id} timed out after {timeout}s")
+
+    async def cancel(self, job_id: ObjectId) -> None:
+        """요청자가 사라진 잡 – 대기 중이면 claim 되지 않고, 실행 중이면 워커가 중단."""
+        await self.col.update_one(
+            {"_id": job_id, "status": {"$in": [QUEUED, RUNNING]}},
+            {"$set": {"status": CANCELLED, "finished": datetime.utcnow()}},
+        )
+
+    async def depth(self) -> int:
+        return await self.col.count_documents({"status": QUEUED})
+
+    # -- 워커 쪽 -----------------------------------------------------------
+    async def claim(self, worker: str, lease_seconds: float) -> Dict | None:
+        now = datetime.utcnow()
+        return await self.col.find_one_and_update(
+            {
+                "$or": [
+                    {"status": QUEUED},
+                    # 워커가 죽어 lease 가 끝난 잡 재시도
+                    {"status": RUNNING, "lease_until": {"$lt": now}},
+                ]
+            },
+            {"$set": {
+                "status": RUNNING,
+                "worker": worker,
+                "lease_until": now + timedelta(seconds=lease_seconds),
+            }},
+            sort=[("created", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def is_cancelled(self, job_id: ObjectId) -> bool:
+        return await self.col.count_documents({"_id": job_id, "status": CANCELLED}, limit=1) > 0
+
+    async def complete(self, job_id: ObjectId, result: Any) -> None:
+        await self.col.update_one(
+            {"_id": job_id, "status": RUNNING},
+            {"$set": {"status": DONE, "result": result, "finished": datetime.utcnow()}},
+        )
+
+    async def fail(self, job_id: ObjectId, error: str) -> None:
+        await self.col.update_one(
+            {"_id": job_id, "status": RUNNING},
+            {"$set": {"status": FAILED, "error": error, "finished": datetime.utcnow()}},
+        )
+
+
+class LocalJobQueue:
+    """MongoJobQueue 와 같은 인터페이스의 in-process 브로커."""
+
+    def __init__(self):
+        self._q: asyncio.Queue[Tuple[int, str, str]] = asyncio.Queue()
+        self._futures: Dict[int, asyncio.Future] = {}
+        self._seq = 0
+
+    async def enqueue(self, url: str, parser: str) -> int:
+        self._seq += 1
+        self._futures[self._seq] = asyncio.get_running_loop().create_future()
+        await self._q.put((self._seq, url, parser))
+        return self._seq
+
+    async def wait(self, job_id: int, timeout: float) -> Any:
+        fut = self._futures[job_id]
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except asyncio.TimeoutError:
+            await self.cancel(job_id)
+            raise
+        finally:
+            if fut.done():
+                self._futures.pop(job_id, None)
+
+    async def cancel(self, job_id: int) -> None:
+        fut = self._futures.pop(job_id, None)
+        if fut and not fut.done():
+            fut.cancel()
+
+    async def depth(self) -> int:
+        return self._q.qsize()
+
+    async def claim(self, worker: str, lease_seconds: float) -> Dict | None:
+        while True:
+            job_id, url, parser = await self._q.get()
+            if not await self.is_cancelled(job_id):
+                return {"_id": job_id, "url": url, "parser": parser}
+
+    async def is_cancelled(self, job_id: int) -> bool:
+        fut = self._futures.get(job_id)
+        return fut is None or fut.cancelled()
+
+    async def complete(self, job_id: int, result: Any) -> None:
+        fut = self._futures.get(job_id)
+        if fut and not fut.done():
+            fut.set_result(result)
+
+    async def fail(self, job_id: int, error: str) -> None:
+        fut = self._futures.get(job_id)
+        if fut and not fut.done():
+            fut.set_exception(RuntimeError(error))
+
+
+class QueueScrapeClient:
+    """``ProxyRotationClient`` 대신 쓰는 API 쪽 클라이언트 (fetch_parsed 만 지원)."""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def fetch_parsed(self, url: str, parser: str):
+        job_id = await self.queue.enqueue(url, parser)
+        delivered = False
+        try:
+            result = await self.queue.wait(job_id, get_settings().scrape_job_timeout)
+            delivered = True
+            return result
+        finally:
+            if not delivered:
+                # 취소·타임아웃·오류 – 워커가 더 이상 이 잡에 브라우저를 쓰지 않도록
+                await asyncio.shield(self._abandon(job_id))
+
+    async def _abandon(self, job_id) -> None:
+        try:
+            await self.queue.cancel(job_id)
+        except Exception as e:
+            print(f"⚠️  scrape job {job_id} 취소 실패: {e}")
+
+    async def fetch(self, url: str) -> str:
+        return await self.fetch_parsed(url, "html")
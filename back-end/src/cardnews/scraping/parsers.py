@@ -2,6 +2,9 @@
 from bs4 import BeautifulSoup, NavigableString, Tag
 from typing import List, Dict, Optional
 
+from cardnews.core.settings import get_settings
+from cardnews.scraping.extract import extract_article
+
 
 
 def _safe_text(node: Tag) -> str:
@@ -120,16 +123,33 @@ def get_parsed_google_search_page(html: str) -> List[Dict[str, Optional[str]]]:
 
 def get_parsed_text_page(html: str) -> str:
     """
-    Parses a raw HTML page and returns only the main content text,
-    stripping out navigation, headers, footers, scripts, styles, and other
-    non-content elements.
+    Parses a raw HTML page and returns only the main article text
+    (see ``scraping/extract.py``), prefixed with its title / date
+    when the page exposes them.
 
     Args:
         html: The raw HTML string of the page.
 
     Returns:
-        A single string containing the page's visible content text.
+        A single string – ``제목:`` / ``작성일:`` lines, then the article
+        paragraphs separated by newlines.
     """
+    if not get_settings().page_extract_main:
+        return _full_text(html)
+
+    article = extract_article(html)
+    head = []
+    if article["title"]:
+        head.append(f"제목: {article['title']}")
+    if article["date"]:
+        head.append(f"작성일: {article['date']}")
+    if not article["text"]:
+        return ""
+    return "\n".join(head + [article["text"]])
+
+
+def _full_text(html: str) -> str:
+    """추출기 이전 방식 – 레이아웃 태그만 지우고 body 전체 텍스트."""
     soup = BeautifulSoup(html, "html.parser")
 
     # Focus on the <body> if available
@@ -150,3 +170,13 @@ def get_parsed_text_page(html: str) -> str:
 
     # Collapse multiple whitespace into single spaces
     return " ".join(text.split())
+
+
+# 파서 이름 → 함수 (스크래핑 워커 잡의 ``parser`` 필드가 이 키를 쓴다)
+PARSERS = {
+    "html": lambda html: html,
+    "google_search": get_parsed_google_search_page,
+    "google_img_search": get_parsed_google_img_search_page,
+    "text_page": get_parsed_text_page,
+    "article": extract_article,
+}
@@ -0,0 +1,88 @@
+# profiles.py
+"""프록시 포트별 브라우저 storage state (쿠키·localStorage) 보관.
+
+빈 프로필로 매번 Camoufox 를 띄우면 Google 동의(consent) 화면과
+"unusual traffic" 탐지가 잦다. 프록시마다 마지막으로 성공한 세션의
+storage state 를 ``browser_profile_dir`` 에 JSON 으로 남겨 다음 실행 때
+``new_context(storage_state=...)`` 로 이어 쓴다.
+
+봇 탐지에 걸린 프로필은 바로 폐기(rotate)하고 빈 상태부터 다시 쌓는다.
+프로필별 사용 횟수 / 탐지 횟수는 ``/admin/profiles`` 로 볼 수 있다.
+"""
+from __future__ import annotations
+
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict
+
+from prometheus_client import Counter
+
+from cardnews.core.settings import get_settings
+
+_DETECTIONS = Counter("browser_profile_detections", "Bot detections per proxy profile", ["proxy"])
+_ROTATIONS = Counter("browser_profile_rotations", "Browser profiles discarded after detection")
+
+
+class ProfileStore:
+    def __init__(self, directory: str | os.PathLike):
+        self.dir = Path(directory)
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _path(self, key: str) -> Path:
+        return self.dir / (re.sub(r"[^A-Za-z0-9_.-]", "_", key) + ".json")
+
+    def _stat(self, key: str) -> Dict[str, int]:
+        return self.stats.setdefault(key, {"uses": 0, "detections": 0, "generation": 0})
+
+    def context_kwargs(self, key: str) -> Dict:
+        """``browser.new_context(**kwargs)`` 인자 – 쓸 만한 저장 상태가 있으면 포함."""
+        path = self._path(key)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return {}
+        if age > get_settings().browser_profile_max_age:
+            path.unlink(missing_ok=True)
+            return {}
+        return {"storage_state": str(path)}
+
+    async def save(self, key: str, context) -> None:
+        """성공한 세션의 상태 저장 (임시 파일 → rename 으로 원자적 교체)."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        await context.storage_state(path=str(tmp))
+        os.replace(tmp, path)
+        self._stat(key)["uses"] += 1
+
+    def flag(self, key: str) -> None:
+        """봇 탐지 – 프로필 폐기."""
+        st = self._stat(key)
+        st["uses"] += 1
+        st["detections"] += 1
+        st["generation"] += 1
+        _DETECTIONS.labels(key).inc()
+        _ROTATIONS.inc()
+        self._path(key).unlink(missing_ok=True)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {
+            key: {
+                **st,
+                "detection_rate": round(st["detections"] / st["uses"], 3) if st["uses"] else None,
+                "has_state": self._path(key).exists(),
+            }
+            for key, st in sorted(self.stats.items())
+        }
+
+
+_store: ProfileStore | None = None
+
+
+def get_store() -> ProfileStore:
+    global _store
+    if _store is None:
+        _store = ProfileStore(get_settings().browser_profile_dir)
+    return _store
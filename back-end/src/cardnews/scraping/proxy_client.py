@@ -1,62 +1,53 @@
 # ProxyRotationClient.py
 
-import os
 import asyncio
-import time
-import yaml
-from dotenv import load_dotenv
-from camoufox.async_api import AsyncCamoufox
 import sys
+import urllib.parse
+from typing import Tuple
+
+from cardnews.core import memory
+from cardnews.core.settings import get_settings
+from cardnews.scraping.profiles import get_store
+from cardnews.scraping.proxy_leases import LeaseTimeout, make_lease_manager
 
 # UTF-8 출력을 강제
 sys.stdout.reconfigure(encoding='utf-8')
 
-# 환경 변수 로드
-load_dotenv()
-PROXY_HOST = os.getenv("PROXY_HOST")
-PROXY_USER = os.getenv("PROXY_USER")
-PROXY_PASS = os.getenv("PROXY_PASS")
-
-# 설정 로드 (.yaml)
-with open("config.yaml", "r", encoding="utf-8") as f:
-    cfg = yaml.safe_load(f)
-PORTS = cfg.get("ports", [])
-MIN_DELAY = cfg.get("min_delay", 10)           # 각 프록시당 최소 대기 시간 (초)
-MAX_RETRIES = cfg.get("max_retries", 2)        # 실패 시 최대 재시도 횟수
-USER_AGENT = cfg.get("user_agent", None)       # Optional: 사용자 에이전트 설정
-
 class ProxyRotationClient:
     def __init__(self):
+        # 프록시/재시도 설정은 get_settings() 한 곳에서 (.env + config.yaml)
+        s = get_settings()
+        self.min_delay = s.min_delay           # 각 프록시당 최소 대기 시간 (초)
+        self.max_retries = s.max_retries       # 실패 시 최대 재시도 횟수
         # 프록시 리스트 생성
         self.proxies = [
             {
-                "server": f"http://{PROXY_HOST}:{port}",
-                "username": PROXY_USER,
-                "password": PROXY_PASS,
+                "server": f"http://{s.proxy_host}:{port}",
+                "username": s.proxy_user,
+                "password": s.proxy_pass,
             }
-            for port in PORTS
+            for port in s.ports
         ]
         self.n = len(self.proxies)
-        self._idx = 0
-        # 마지막 요청 시간 기록 (proxy_index -> timestamp)
-        self.last_request_time = {i: 0 for i in range(self.n)}
-
-    def _next_index(self) -> int:
-        # 순환형 인덱스
-        idx = self._idx % self.n
-        self._idx += 1
-        return idx
+        # 포트 임대 – 반납 후 min_delay 동안 재사용 금지 (프로세스 간 공유 가능)
+        self.leases = make_lease_manager(
+            [f"{s.proxy_host}:{port}" for port in s.ports], self.min_delay
+        )
 
     async def fetch(self, url: str) -> str:
-        attempts = 0
-        while attempts <= MAX_RETRIES:
-            idx = self._next_index()
-            proxy_conf = self.proxies[idx]
+        # camoufox(+playwright) 는 무거워서 실제로 브라우저를 띄울 때만 import
+        from camoufox.async_api import AsyncCamoufox
 
-            # 최소 지연 시간 확보
-            elapsed = time.time() - self.last_request_time[idx]
-            if elapsed < MIN_DELAY:
-                await asyncio.sleep(MIN_DELAY - elapsed)
+        profiles = get_store() if get_settings().browser_profiles_enabled else None
+        track_rss = get_settings().memory_sampling_enabled
+        attempts = 0
+        while attempts <= self.max_retries:
+            # 빈 프록시를 임대 (최소 지연 시간은 lease 매니저가 보장)
+            lease = await self.leases.acquire()
+            proxy_conf = self.proxies[lease.idx]
+            key = self.leases.keys[lease.idx]
+            browser_pid = None
+            before = await asyncio.to_thread(memory.direct_children) if track_rss else set()
 
             try:
                 async with AsyncCamoufox(
@@ -69,22 +60,66 @@ class ProxyRotationClient:
                     disable_coop=True,
                     i_know_what_im_doing=True
                 ) as browser:
-                    page = await browser.new_page()
+                    if track_rss:
+                        # 새로 뜬 드라이버+Firefox 트리를 이 프록시로 집계 (/admin/memory)
+                        after = await asyncio.to_thread(memory.direct_children)
+                        browser_pid = memory.claim_browser(key, before, after)
+                    # 이 프록시로 마지막에 성공한 세션의 쿠키·localStorage 를 이어 씀
+                    context = await browser.new_context(
+                        **(profiles.context_kwargs(key) if profiles else {})
+                    )
+                    page = await context.new_page()
                     await page.goto(url, timeout=60_000, wait_until="networkidle")
                     html = await page.content()
-                # 요청 성공 시 시간 기록 후 반환
-                self.last_request_time[idx] = time.time()
-                if "unusual traffic from your computer network" in html:
-                    raise RuntimeError("봇 탐지됨")
+                    if "unusual traffic from your computer network" in html:
+                        if profiles:
+                            profiles.flag(key)     # 탐지된 프로필은 폐기
+                        raise RuntimeError("봇 탐지됨")
+                    if profiles:
+                        # 프로필 저장은 최적화일 뿐 – 실패해도 받은 HTML 은 쓴다
+                        try:
+                            await profiles.save(key, context)
+                        except Exception as e:
+                            print(f"⚠️  browser profile 저장 실패 ({key}): {e}")
                 return html
 
             except Exception as e:
                 attempts += 1
                 # 재시도 허용 범위 내라면 다음 프록시로 전환
-                if attempts <= MAX_RETRIES:
+                if attempts <= self.max_retries:
                     continue
                 else:
-                    raise RuntimeError(f"Failed to fetch after {MAX_RETRIES} retries: {e}")
+                    raise RuntimeError(f"Failed to fetch after {self.max_retries} retries: {e}")
+            finally:
+                memory.release_browser(browser_pid)
+                await asyncio.shield(self.leases.release(lease))
+
+    def _proxy_url(self, idx: int) -> str:
+        conf = self.proxies[idx]
+        if not conf["username"]:
+            return conf["server"]
+        auth = f"{urllib.parse.quote(conf['username'], safe='')}:{urllib.parse.quote(conf['password'] or '', safe='')}@"
+        return conf["server"].replace("://", f"://{auth}", 1)
+
+    async def fetch_http(self, url: str) -> Tuple[int | None, str | None]:
+        """브라우저 없이 프록시 경유 HTTP GET → (status, 본문). 포트 임대·min_delay 는 브라우저와 같다."""
+        from cardnews.scraping.http_fetch import fetch_text
+
+        try:
+            lease = await self.leases.acquire()
+        except LeaseTimeout:
+            return None, None
+        try:
+            return await fetch_text(url, self._proxy_url(lease.idx))
+        finally:
+            await asyncio.shield(self.leases.release(lease))
+
+    async def fetch_parsed(self, url: str, parser: str):
+        """fetch 후 ``PARSERS[parser]`` 로 파싱. BeautifulSoup 파싱은 스레드로 넘겨 이벤트 루프를 막지 않는다."""
+        from cardnews.scraping.parsers import PARSERS
+
+        html = await self.fetch(url)
+        return await asyncio.to_thread(PARSERS[parser], html)
 
 async def main():
     import argparse
@@ -0,0 +1,222 @@
+# proxy_leases.py
+"""프록시 포트 임대(lease) – 여러 프로세스/호스트가 같은 프록시를 나눠 쓸 때.
+
+``ProxyRotationClient`` 는 요청마다 ``acquire()`` 로 포트 하나를 독점 임대하고
+끝나면 ``release()`` 한다. 반납 후 ``min_delay`` 초 동안은 누구도 그 포트를
+다시 받을 수 없으므로 프로세스 수와 관계없이 포트당 요청 간격이 지켜진다.
+
+백엔드 (``proxy_lease_backend``)
+---------------------------------
+* ``local`` – 프로세스 메모리 (단일 워커용, 기존 동작과 같음)
+* ``mongo`` – ``proxy_leases`` 컬렉션의 원자적 find_one_and_update.
+  임대는 ``proxy_lease_seconds`` 뒤 만료되므로 죽은 프로세스가 포트를 잡고
+  있지 않는다.
+
+``proxy_partition_count`` > 1 이면 포트를 ``index::count`` 로 정적 분할해
+각 워커가 자기 몫만 쓴다 (scrape_worker ``--processes`` 는 자동 지정).
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from prometheus_client import Counter, Gauge, Histogram
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from cardnews.core.settings import get_settings
+
+_WAIT = Histogram(
+    "proxy_lease_wait_seconds", "Time spent waiting for a proxy lease",
+    buckets=(0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60),
+)
+_HELD = Gauge("proxy_leases_held", "Proxy leases currently held by this process")
+_TIMEOUTS = Counter("proxy_lease_timeouts", "Proxy lease acquisitions that timed out")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class LeaseTimeout(RuntimeError):
+    """``proxy_lease_wait_timeout`` 안에 빈 프록시가 없음."""
+
+
+@dataclass
+class Lease:
+    idx: int            # ProxyRotationClient.proxies 인덱스
+    token: str
+    waited: float
+
+
+def partition(indices: List[int]) -> List[int]:
+    s = get_settings()
+    if s.proxy_partition_count <= 1 or s.proxy_partition_index is None:
+        return indices
+    mine = [i for i in indices if i % s.proxy_partition_count == s.proxy_partition_index]
+    return mine or indices
+
+
+class LocalLeaseManager:
+    def __init__(self, keys: List[str], min_delay: float):
+        self.keys = keys
+        self.min_delay = min_delay
+        self.indices = partition(list(range(len(keys))))
+        self._next_allowed: Dict[int, float] = {i: 0.0 for i in self.indices}
+        self._held: Dict[int, str] = {}
+        self._released = asyncio.Event()
+
+    async def acquire(self) -> Lease:
+        s = get_settings()
+        started = time.monotonic()
+        while True:
+            now = time.monotonic()
+            free = [i for i in self.indices if i not in self._held]
+            if free:
+                idx = min(free, key=self._next_allowed.__getitem__)
+                wait = self._next_allowed[idx] - now
+                if wait <= 0:
+                    token = uuid.uuid4().hex
+                    self._held[idx] = token
+                    return _granted(idx, token, started)
+            else:
+                wait = s.proxy_lease_poll_interval
+            if now - started + wait > s.proxy_lease_wait_timeout:
+                _TIMEOUTS.inc()
+                raise LeaseTimeout("no proxy available")
+            self._released.clear()
+            try:
+                await asyncio.wait_for(self._released.wait(), max(wait, 0.01))
+            except asyncio.TimeoutError:
+                pass
+
+    async def release(self, lease: Lease) -> None:
+        if self._held.get(lease.idx) == lease.token:
+            del self._held[lease.idx]
+            self._next_allowed[lease.idx] = time.monotonic() + self.min_delay
+            _HELD.dec()
+        self._released.set()
+
+    async def snapshot(self) -> List[Dict]:
+        now = time.monotonic()
+        return [
+            {
+                "proxy": self.keys[i],
+                "held": i in self._held,
+                "cooldown": round(max(0.0, self._next_allowed[i] - now), 1),
+            }
+            for i in self.indices
+        ]
+
+
+class MongoLeaseManager:
+    def __init__(self, keys: List[str], min_delay: float, collection=None):
+        self.keys = keys
+        self.min_delay = min_delay
+        self.indices = partition(list(range(len(keys))))
+        self._col = collection
+        self._seeded = False
+        # 이 프로세스가 가진 임대 – 만료되면 _HELD 에서 빠진다 (token → 만료 타이머)
+        self._owned: Dict[str, asyncio.TimerHandle] = {}
+
+    @property
+    def col(self):
+        if self._col is None:
+            from cardnews.core.db import mongo   # connect_to_mongo 이후에만 유효
+            self._col = mongo.proxy_leases
+        return self._col
+
+    async def _seed(self) -> None:
+        for i in self.indices:
+            try:
+                await self.col.update_one(
+                    {"_id": self.keys[i]},
+                    {"$setOnInsert": {"lease_until": _EPOCH, "next_allowed": _EPOCH}},
+                    upsert=True,
+                )
+            except DuplicateKeyError:
+                pass          # 다른 프로세스가 동시에 생성
+        self._seeded = True
+
+    async def acquire(self) -> Lease:
+        s = get_settings()
+        if not self._seeded:
+            await self._seed()
+        ids = [self.keys[i] for i in self.indices]
+        started = time.monotonic()
+        token = uuid.uuid4().hex
+        while True:
+            now = datetime.utcnow()
+            doc = await self.col.find_one_and_update(
+                {"_id": {"$in": ids}, "lease_until": {"$lte": now}, "next_allowed": {"$lte": now}},
+                {"$set": {
+                    "holder": token,
+                    "lease_until": now + timedelta(seconds=s.proxy_lease_seconds),
+                    "acquired": now,
+                }},
+                sort=[("next_allowed", 1)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is not None:
+                self._owned[token] = asyncio.get_running_loop().call_later(
+                    s.proxy_lease_seconds, self._expire, token
+                )
+                return _granted(self.keys.index(doc["_id"]), token, started)
+
+            # 가장 먼저 풀리는 포트까지 (최대 poll 간격) 대기
+            wait = s.proxy_lease_poll_interval
+            async for d in self.col.find({"_id": {"$in": ids}}, {"lease_until": 1, "next_allowed": 1}):
+                ready = max(d["lease_until"], d["next_allowed"])
+                wait = min(wait, max(0.01, (ready - now).total_seconds()))
+            if time.monotonic() - started + wait > s.proxy_lease_wait_timeout:
+                _TIMEOUTS.inc()
+                raise LeaseTimeout("no proxy available")
+            await asyncio.sleep(wait)
+
+    def _expire(self, token: str) -> None:
+        if self._owned.pop(token, None) is not None:
+            _HELD.dec()
+
+    async def release(self, lease: Lease) -> None:
+        now = datetime.utcnow()
+        # holder 가 다르면 이미 만료돼 다른 프로세스가 가져간 임대 – 건드리지 않음
+        res = await self.col.update_one(
+            {"_id": self.keys[lease.idx], "holder": lease.token},
+            {"$set": {
+                "lease_until": now,
+                "next_allowed": now + timedelta(seconds=self.min_delay),
+            }, "$unset": {"holder": ""}},
+        )
+        if not res.matched_count:
+            print(f"⚠️  proxy lease {self.keys[lease.idx]} 가 사용 중에 만료됨")
+        # 만료 타이머가 이미 뺐으면 다시 빼지 않는다
+        timer = self._owned.pop(lease.token, None)
+        if timer is not None:
+            timer.cancel()
+            _HELD.dec()
+
+    async def snapshot(self) -> List[Dict]:
+        now = datetime.utcnow()
+        out = []
+        async for d in self.col.find({"_id": {"$in": [self.keys[i] for i in self.indices]}}):
+            out.append({
+                "proxy": d["_id"],
+                "held": d["lease_until"] > now,
+                "cooldown": round(max(0.0, (d["next_allowed"] - now).total_seconds()), 1),
+            })
+        return out
+
+
+def _granted(idx: int, token: str, started: float) -> Lease:
+    waited = time.monotonic() - started
+    _WAIT.observe(waited)
+    _HELD.inc()
+    return Lease(idx, token, waited)
+
+
+def make_lease_manager(keys: List[str], min_delay: float):
+    if get_settings().proxy_lease_backend == "mongo":
+        return MongoLeaseManager(keys, min_delay)
+    return LocalLeaseManager(keys, min_delay)
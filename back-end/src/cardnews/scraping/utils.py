@@ -1,26 +1,14 @@
-import ast, re, json
+import re
 from typing import List, Dict
 
 def safe_parse_urls(raw: str) -> List[str]:
-    """LLM 이 돌려준 문자열을 최대한 유연하게 리스트로 변환."""
-    raw = raw.strip()
-
-    # ①  ```json ... ```  블록 제거
-    if raw.startswith("```"):
-        raw = re.sub(r"```[a-zA-Z]*\n?", "", raw)    # 앞/뒤 ``` 제거
-        raw = raw.rstrip("`").rstrip()
-
-    # ②  JSON 시도 (정상일 때 가장 빠름)
-    try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        pass
-
-    # ③  Python literal 시도 (작은따옴표 리스트 대응)
-    try:
-        return ast.literal_eval(raw)
-    except Exception:
-        raise ValueError("LLM returned unparsable URL list:\n" + raw)
+    """LLM 이 돌려준 문자열을 최대한 유연하게 리스트로 변환.
+
+    코드펜스·작은따옴표·끝 쉼표 복구(잘린 출력은 오류)는 ``workers.llm_output`` 참고.
+    """
+    from cardnews.workers.llm_output import parse_urls
+
+    return parse_urls(raw)
 
 
 def clean_urls(urls: List[str]) -> List[str]:
@@ -0,0 +1,71 @@
+# batch.py
+"""여러 키워드를 한 번에 생성하는 배치 실행기 (``POST /generate/batch``).
+
+* 같은 ``(q, range)`` (result_cache.cache_key 기준) 는 한 번만 생성
+* 항목 전체가 하나의 ``request_owner`` 라 스테이지 풀에서 단건 요청과
+  공정하게 나눠 쓰고, ``batch_concurrency`` 개씩만 동시에 진행
+* ``shared_fetches`` memo 로 항목 간 같은 SERP/본문/이미지 검색을 재사용
+* 끝나는 순서대로 NDJSON 한 줄씩 내보낸다 (카드 없이 끝난 항목은 ``"error"``)
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import AsyncIterator, Dict, List, Tuple
+
+import orjson
+
+from cardnews.core.pools import request_owner, shared_fetches
+from cardnews.core.settings import get_settings
+from cardnews.services import result_cache
+from cardnews.services.cardnews_service import generate_and_log
+
+
+def _line(indices: List[int], q: str, date_range: str | None, status: str, body: bytes) -> bytes:
+    head = orjson.dumps({"index": indices, "q": q, "range": date_range, "status": status})
+    # 결과 본문은 이미 직렬화된 JSON – 다시 파싱하지 않고 그대로 끼워 넣는다
+    return head[:-1] + b',"result":' + body + b"}\n"
+
+
+async def run_batch(
+    items: List[Tuple[str, str | None]],
+    api_key_prefix: str,
+    *,
+    top_k: int | None = None,
+    img_base: str | None = None,
+) -> AsyncIterator[bytes]:
+    s = get_settings()
+
+    # 중복 제거 – cache_key → (대표 q, range, 원래 인덱스들)
+    groups: Dict[str, Tuple[str, str | None, List[int]]] = {}
+    for i, (q, date_range) in enumerate(items):
+        key = result_cache.cache_key(q, date_range)
+        groups.setdefault(key, (q, date_range, []))[2].append(i)
+
+    request_owner.set(f"batch:{uuid.uuid4().hex[:8]}")
+    memo: Dict = {}
+    shared_fetches.set(memo)
+    sem = asyncio.Semaphore(s.batch_concurrency)
+
+    async def _one(q: str, date_range: str | None, indices: List[int]) -> bytes:
+        async with sem:
+            try:
+                body = await generate_and_log(
+                    q, date_range, api_key_prefix,
+                    top_k=top_k, img_base=img_base, strict=True,
+                )
+            except Exception as e:
+                print(f"⚠️  batch item '{q}' 실패: {e}")
+                return _line(indices, q, date_range, "error", orjson.dumps(str(e)))
+        return _line(indices, q, date_range, "ok", body)
+
+    tasks = [asyncio.ensure_future(_one(*g)) for g in groups.values()]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        # 클라이언트가 스트림을 끊으면 남은 항목과 공유 fetch 모두 취소
+        for t in tasks:
+            t.cancel()
+        for f in memo.values():
+            f.cancel()
@@ -1,30 +1,73 @@
 import asyncio
 import gzip
-import json
+import uuid
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 import bson
+import orjson
+from prometheus_client import Gauge
 
+from cardnews.core import memory
 from cardnews.core.db import mongo
-from cardnews.scraping.proxy_client import ProxyRotationClient
-from cardnews.workers.agent_runner import generate_cardnews
+from cardnews.core.pools import request_owner
+from cardnews.core.settings import get_settings
+from cardnews.services import payload, query_index, result_cache
+
+if TYPE_CHECKING:
+    from cardnews.scraping.proxy_client import ProxyRotationClient
 
 # ProxyRotationClient 싱글턴 (startup 이벤트에서 주입됩니다)
-client: ProxyRotationClient | None = None
+client: "ProxyRotationClient | None" = None
+
+# 아직 끝나지 않은 로그·결과 저장 태스크 (참조 유지 + 적체 관찰용)
+pending_logs: set[asyncio.Task] = set()
+Gauge("pending_log_tasks", "Log writes scheduled but not finished").set_function(
+    lambda: len(pending_logs)
+)
+
+
+def _track(task: asyncio.Task, what: str) -> None:
+    """fire-and-forget 저장 태스크 – 참조를 쥐고, 실패하면 로그만 남긴다."""
+    pending_logs.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        pending_logs.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            print(f"⚠️  {what} 실패: {t.exception()!r}")
+
+    task.add_done_callback(_done)
+
 
+class GenerationFailed(RuntimeError):
+    """재시도까지 실패해 카드가 없는 결과 (``strict=True`` 일 때만)."""
 
-async def _log_async(prefix: str, query: str, body: bytes) -> None:
+
+async def _log_async(
+    prefix: str,
+    query: str,
+    body: bytes,
+    date_range: str | None = None,
+    cached: bool = False,
+    matched_query: str | None = None,
+) -> None:
     """Card‑news 결과를 MongoDB에 gzip 압축해 비동기 저장."""
     meta = {
         "ts": datetime.utcnow(),
         "api_key_prefix": prefix,
         "query": query,
+        "date_range": date_range,
+        "cached": cached,
         "body_size": len(body),
     }
+    if matched_query is not None:
+        meta["matched_query"] = matched_query   # 유사 쿼리 캐시로 응답한 경우
 
-    # 본문 컬렉션에 먼저 저장하고 ObjectId 를 메타와 연결
+    # 본문 컬렉션에 먼저 저장하고 ObjectId 를 메타와 연결 (ts 는 같은 TTL 로 함께 만료되도록)
     body_id = (
-        await mongo.logs_body.insert_one({"body_gzip": bson.Binary(gzip.compress(body))})
+        await mongo.logs_body.insert_one(
+            {"ts": meta["ts"], "body_gzip": bson.Binary(gzip.compress(body))}
+        )
     ).inserted_id
     meta["body_id"] = body_id
     print("--------------------------------")
@@ -35,29 +78,88 @@ async def _log_async(prefix: str, query: str, body: bytes) -> None:
         await mongo.logs_meta.insert_one(meta)
     except Exception as e:
         print(f"Error inserting log meta: {e}")
+        # 메타 없는 본문은 export·보관 대상이 아님 – 고아로 남기지 않음
+        await mongo.logs_body.delete_one({"_id": body_id})
 
 
 async def generate_and_log(
     query: str,
     date_range: str | None,
     api_key_prefix: str,
-) -> dict:
+    *,
+    top_k: int | None = None,
+    img_base: str | None = None,
+    fmt: str = "json",
+    strict: bool = False,
+) -> bytes:
     """카드뉴스 생성 후 로그까지 남기는 메인 엔트리 포인트.
 
     * `query`        – 사용자가 요청한 키워드
     * `date_range`   – Google 검색 기간 필터 (d, w, m, m3, y, None)
     * `api_key_prefix` – 인증된 API 키 접두어(로그용)
+    * `top_k`        – 카드별 이미지 후보 개수 제한 (None 이면 전체)
+    * `img_base`     – 지정 시 base64 썸네일을 ``{img_base}{hash}`` 로 치환 (compact 모드)
+    * `fmt`          – 응답 인코딩 ("json" / "msgpack")
+    * `strict`       – 생성 실패(``[{}]``)를 본문 대신 ``GenerationFailed`` 로 (배치용)
+
+    직렬화된 응답 본문(bytes)을 그대로 반환한다.
     """
     if client is None:
         raise RuntimeError("Proxy client not initialized (startup 이벤트 확인)")
 
-    # ① 카드뉴스 생성 -------------------------------------------------------
-    json_str = await generate_cardnews(client, query, date_range)
-    raw_bytes = json_str.encode()
+    # 스테이지 풀에서 요청 단위 공정 분배를 위한 식별자 (배치·프리워밍은 미리 지정)
+    if request_owner.get() == "default":
+        request_owner.set(uuid.uuid4().hex[:12])
 
-    # ② 비동기 로깅 ---------------------------------------------------------
+    # ① 결과 저장소 조회 → 없으면 카드뉴스 생성 --------------------------------
+    use_cache = get_settings().result_cache_enabled
+    data = None
+    raw_bytes = await result_cache.get(query, date_range) if use_cache else None
+    matched_query = None
+    if raw_bytes is None and use_cache and get_settings().similar_query_enabled:
+        # 표기만 다른 키워드 ("잠실맛집" ↔ "잠실 맛집") 는 가장 가까운 캐시 결과로
+        hit = query_index.find_similar(query, date_range)
+        if hit is not None:
+            raw_bytes = await result_cache.get(hit[0], date_range)
+            if raw_bytes is not None:
+                matched_query = hit[0]
+                print(f"🔁 similar query '{query}' → '{hit[0]}' ({hit[1]:.2f})")
+    cached = raw_bytes is not None
+    if raw_bytes is None:
+        # ADK / LiteLLM 은 import 비용이 커서 실제 생성 시점에 로드
+        from cardnews.workers.agent_runner import generate_cardnews
+
+        async with memory.track_request(query):
+            data = await generate_cardnews(client, query, date_range)
+            # 실패하면 체크포인트(마지막 성공 스테이지)부터 이어서 재시도
+            for _ in range(get_settings().checkpoint_auto_retries):
+                if result_cache.is_cacheable(data):
+                    break
+                print(f"🔁 '{query}' 생성 실패 – 체크포인트에서 재시도")
+                data = await generate_cardnews(client, query, date_range)
+        raw_bytes = payload.encode(data)
+        if use_cache and result_cache.is_cacheable(data):
+            _track(asyncio.create_task(result_cache.put(query, date_range, raw_bytes)), "result cache 저장")
+
+    # ② 비동기 로깅 (원본 전체) ---------------------------------------------
     # 메인 이벤트 루프에 태스크를 붙여두면 Starlette BackgroundTask 의 루프 충돌 문제 해결
-    asyncio.create_task(_log_async(api_key_prefix, query, raw_bytes))
+    _track(
+        asyncio.create_task(
+            _log_async(api_key_prefix, query, raw_bytes, date_range, cached, matched_query)
+        ),
+        "로그 저장",
+    )
+
+    if strict and not cached and not result_cache.is_cacheable(data):
+        raise GenerationFailed(f"generation failed for '{query}'")
 
-    # ③ 결과 반환 (dict)
-    return json.loads(json_str)
+    # ③ 결과 반환 (bytes) – 기본 요청은 재직렬화 없이 로그용 본문 그대로
+    if top_k is None and img_base is None and fmt == "json":
+        return raw_bytes
+    if data is None:
+        data = orjson.loads(raw_bytes)
+    if top_k is not None:
+        payload.trim_cards(data, top_k)
+    if img_base is not None:
+        await payload.externalize_thumbs(data, img_base)
+    return payload.encode(data, fmt)
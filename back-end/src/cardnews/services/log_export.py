@@ -0,0 +1,291 @@
+# log_export.py
+"""logs_meta / logs_body 스트리밍 export (오프라인 분석용).
+
+메타는 ``(ts, _id)`` 순 커서로 읽고, 본문은 배치마다 ``_id $in`` 한 번으로
+모아 가져온다. 레코드 단위로 gzip 을 풀어 바로 내보내므로 메모리는 배치
+크기에만 비례한다. 각 레코드에 ``ts`` / ``_id`` 가 들어 있어 마지막 줄을
+워터마크로 삼아 이어받기(resume)가 가능하다.
+
+``--state`` 를 주면 ``--checkpoint-every`` 레코드마다 체크포인트 – 출력이
+디스크에 내려간 뒤에만 워터마크를 원자적으로 갱신한다. NDJSON 은 fsync 한
+바이트 오프셋을 함께 기록해 resume 시 그 뒤(체크포인트 이후 쓰인 줄)를 잘라
+내고, parquet 은 체크포인트마다 파트 파일(``logs.00000.parquet`` …)을 닫는다.
+
+    python -m cardnews.services.log_export --prefix AbCdEfGh \\
+        --since 2025-05-01 --format parquet --out logs.parquet --state export.state
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Tuple
+
+import orjson
+from bson import ObjectId
+
+from cardnews.core.db import mongo
+
+Watermark = Tuple[datetime, ObjectId]
+
+
+def build_filter(
+    prefix: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after: Watermark | None = None,
+) -> Dict:
+    clauses: List[Dict] = []
+    if prefix:
+        clauses.append({"api_key_prefix": {"$regex": f"^{re.escape(prefix)}"}})
+    if since or until:
+        rng = {}
+        if since:
+            rng["$gte"] = since
+        if until:
+            rng["$lt"] = until
+        clauses.append({"ts": rng})
+    if after:
+        ts, oid = after
+        clauses.append({"$or": [{"ts": {"$gt": ts}}, {"ts": ts, "_id": {"$gt": oid}}]})
+    return {"$and": clauses} if clauses else {}
+
+
+def decode_body(doc: Dict | None):
+    if not doc or "body_gzip" not in doc:
+        return None
+    raw = gzip.decompress(doc["body_gzip"])
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return raw.decode("utf-8", "replace")
+
+
+async def iter_batches(
+    prefix: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    after: Watermark | None = None,
+    batch_size: int = 200,
+) -> AsyncIterator[List[Dict]]:
+    """레코드 리스트(최대 batch_size)를 순서대로 yield."""
+    cursor = (
+        mongo.logs_meta.find(build_filter(prefix, since, until, after))
+        .sort([("ts", 1), ("_id", 1)])
+        .batch_size(batch_size)
+    )
+    batch: List[Dict] = []
+    async for meta in cursor:
+        batch.append(meta)
+        if len(batch) >= batch_size:
+            yield await attach_bodies(batch)
+            batch = []
+    if batch:
+        yield await attach_bodies(batch)
+
+
+async def attach_bodies(metas: List[Dict]) -> List[Dict]:
+    ids = [m["body_id"] for m in metas if m.get("body_id")]
+    bodies = {}
+    if ids:
+        async for doc in mongo.logs_body.find({"_id": {"$in": ids}}):
+            bodies[doc["_id"]] = doc
+    return [
+        {
+            "_id": str(m["_id"]),
+            "ts": m["ts"],
+            "api_key_prefix": m.get("api_key_prefix"),
+            "query": m.get("query"),
+            "date_range": m.get("date_range"),
+            "cached": m.get("cached"),
+            "body_size": m.get("body_size"),
+            "body": decode_body(bodies.get(m.get("body_id"))),
+        }
+        for m in metas
+    ]
+
+
+async def iter_ndjson(**kwargs) -> AsyncIterator[bytes]:
+    async for batch in iter_batches(**kwargs):
+        yield b"".join(orjson.dumps(r) + b"\n" for r in batch)
+
+
+def parse_watermark(ts: str | None, oid: str | None) -> Watermark | None:
+    """(ts, _id) 문자열 → 워터마크. 형식이 틀리면 ``ValueError``."""
+    if not ts or not oid:
+        return None
+    if not ObjectId.is_valid(oid):
+        raise ValueError(f"invalid _id: {oid!r}")
+    return datetime.fromisoformat(ts), ObjectId(oid)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def _parquet_writer(path: Path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("parquet export 에는 pyarrow 가 필요합니다 – `pip install pyarrow`")
+
+    schema = pa.schema([
+        ("_id", pa.string()),
+        ("ts", pa.timestamp("us")),
+        ("api_key_prefix", pa.string()),
+        ("query", pa.string()),
+        ("date_range", pa.string()),
+        ("cached", pa.bool_()),
+        ("body_size", pa.int64()),
+        ("body", pa.string()),            # JSON 문자열
+    ])
+    writer = pq.ParquetWriter(path, schema, compression="zstd")
+
+    def write(batch: List[Dict]) -> None:
+        rows = [
+            {**r, "body": None if r["body"] is None else orjson.dumps(r["body"]).decode()}
+            for r in batch
+        ]
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+    return write, writer.close
+
+
+def _save_state(path: Path, state: Dict) -> None:
+    """임시 파일에 쓰고 fsync 후 os.replace – 크래시 나도 이전/새 상태 둘 중 하나."""
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class _NdjsonSink:
+    def __init__(self, out: Path, offset: int | None):
+        if offset is None:
+            self.fp = out.open("wb")
+        else:
+            # 마지막 체크포인트 이후에 쓰인 (워터마크에 없는) 줄은 버린다
+            self.fp = out.open("r+b" if out.exists() else "wb")
+            self.fp.truncate(offset)
+            self.fp.seek(offset)
+        self.path = out
+
+    def write(self, batch: List[Dict]) -> None:
+        self.fp.write(b"".join(orjson.dumps(r) + b"\n" for r in batch))
+
+    def checkpoint(self) -> Dict:
+        self.fp.flush()
+        os.fsync(self.fp.fileno())
+        return {"offset": self.fp.tell()}
+
+    def close(self) -> None:
+        self.fp.close()
+
+
+class _ParquetSink:
+    """--state 가 있으면 체크포인트마다 파트 파일을 닫고 다음 번호로 넘어간다
+    (parquet 은 close 때 footer 가 써져야 읽힌다)."""
+
+    def __init__(self, out: Path, part: int | None):
+        self.out = out
+        self.part = part
+        self._writer = None
+
+    def _path(self) -> Path:
+        if self.part is None:
+            return self.out
+        return self.out.with_name(f"{self.out.stem}.{self.part:05d}{self.out.suffix}")
+
+    def write(self, batch: List[Dict]) -> None:
+        if self._writer is None:
+            self._writer = _parquet_writer(self._path())
+        self._writer[0](batch)
+
+    def checkpoint(self) -> Dict:
+        if self._writer is not None:
+            self._writer[1]()
+            self._writer = None
+            path = self._path()
+            with path.open("rb") as f:
+                os.fsync(f.fileno())
+            self.part += 1
+        return {"part": self.part}
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer[1]()
+            self._writer = None
+
+    @property
+    def path(self) -> Path:
+        return self.out if self.part is None else self.out.with_name(f"{self.out.stem}.*{self.out.suffix}")
+
+
+async def _export(args) -> None:
+    from cardnews.core.db import connect_to_mongo, close_mongo
+
+    state_path = Path(args.state) if args.state else None
+    st: Dict = {}
+    if state_path and state_path.exists():
+        st = json.loads(state_path.read_text())
+        print(f"↩️  resume after {st}")
+    after = parse_watermark(st.get("ts"), st.get("_id"))
+
+    out = Path(args.out)
+    if args.format == "parquet":
+        # parquet 은 append 가 안 되므로 체크포인트 단위 파트 파일로
+        sink = _ParquetSink(out, st.get("part", 0) if state_path else None)
+    else:
+        sink = _NdjsonSink(out, st.get("offset", 0) if state_path else None)
+
+    await connect_to_mongo()
+    total = pending = 0
+    last = None
+    try:
+        async for batch in iter_batches(
+            prefix=args.prefix,
+            since=datetime.fromisoformat(args.since) if args.since else None,
+            until=datetime.fromisoformat(args.until) if args.until else None,
+            after=after,
+            batch_size=args.batch_size,
+        ):
+            sink.write(batch)
+            total += len(batch)
+            pending += len(batch)
+            last = batch[-1]
+            if state_path and pending >= args.checkpoint_every:
+                # 출력이 디스크에 내려간 뒤에만 워터마크 전진
+                _save_state(state_path, {"ts": last["ts"].isoformat(), "_id": last["_id"], **sink.checkpoint()})
+                pending = 0
+            print(f"… {total} records")
+        if state_path and pending:
+            _save_state(state_path, {"ts": last["ts"].isoformat(), "_id": last["_id"], **sink.checkpoint()})
+    finally:
+        sink.close()
+        await close_mongo()
+    print(f"✅ exported {total} records to {sink.path}")
+
+
+def main() -> None:
+    pa = argparse.ArgumentParser("Export card-news logs (NDJSON / Parquet)")
+    pa.add_argument("--prefix", help="api_key_prefix 앞부분")
+    pa.add_argument("--since", help="ISO 시각 (포함)")
+    pa.add_argument("--until", help="ISO 시각 (제외)")
+    pa.add_argument("--format", choices=["ndjson", "parquet"], default="ndjson")
+    pa.add_argument("--out", default="logs_export.ndjson")
+    pa.add_argument("--state", help="워터마크 파일 – 있으면 이어서 export")
+    pa.add_argument("--batch-size", type=int, default=200)
+    pa.add_argument("--checkpoint-every", type=int, default=10_000,
+                    help="--state 사용 시 이 레코드 수마다 fsync·워터마크 갱신 (parquet 은 파트 파일 단위)")
+    asyncio.run(_export(pa.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# log_lifecycle.py
+"""logs_meta / logs_body 수명 관리.
+
+* 만료 – 두 컬렉션 모두 ``ts`` TTL 인덱스(``log_ttl_days``)로 같은 시점에 지운다.
+  ``ts`` 가 없던 예전 본문은 스위퍼가 메타의 ts 를 채워 넣고(backfill),
+  메타가 이미 사라진 본문(orphan)은 바로 삭제한다.
+* 보관 – ``log_archive_enabled`` 면 만료 ``log_archive_lead_hours`` 전에
+  메타+본문을 log_export 와 같은 레코드로 ``log_archive_dir`` 의
+  gzip NDJSON 세그먼트 파일에 남긴다 (``archived`` 표시로 한 번만).
+* 지표 – 컬렉션별 문서 수 / 데이터 크기 / 디스크 크기를 Prometheus 게이지와
+  ``/admin/storage`` 로 노출.
+
+스위퍼는 한 곳에서만 돌면 된다 – ``log_sweep_enabled`` 를 한 워커에만 켜거나
+크론에서 ``python -m cardnews.services.log_lifecycle`` 을 실행.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import orjson
+from prometheus_client import Counter, Gauge
+from pymongo import UpdateOne
+
+from cardnews.core.db import mongo
+from cardnews.core.settings import get_settings
+from cardnews.services.log_export import attach_bodies, decode_body
+
+_SIZE = Gauge("mongo_collection_size_bytes", "Uncompressed data size per collection", ["collection"])
+_STORAGE = Gauge("mongo_collection_storage_bytes", "On-disk storage size per collection", ["collection"])
+_COUNT = Gauge("mongo_collection_documents", "Documents per collection", ["collection"])
+_ARCHIVED = Counter("log_records_archived", "Log records written to archive segments")
+_ORPHANS = Counter("log_bodies_orphan_deleted", "logs_body documents deleted because their meta expired")
+_BACKFILLED = Counter("log_bodies_ts_backfilled", "Legacy logs_body documents given a ts for TTL expiry")
+
+STORAGE_COLLECTIONS = ("logs_meta", "logs_body", "thumbs", "results", "checkpoints", "scrape_jobs")
+
+last_sweep: Dict = {}
+
+# 새 본문은 항상 ts 와 함께 들어가므로, ts 없는 본문이 한 번 0 건이면 backfill 은
+# 끝난 것 – 이후 스윕에서는 조회하지 않는다 (프로세스당 한 번).
+_legacy_done = False
+
+
+def ttl_seconds() -> int:
+    return int(timedelta(days=get_settings().log_ttl_days).total_seconds())
+
+
+# ---------------------------------------------------------------------------
+# 레거시 본문 정리
+# ---------------------------------------------------------------------------
+async def sweep_legacy_bodies(batch_size: int) -> Dict[str, int]:
+    """ts 없는 본문 – 메타가 있으면 ts 를 채우고, 없으면 (보관 후) 삭제.
+
+    ``$exists: false`` 는 partial index 로 받칠 수 없어서 ts TTL 인덱스의 null
+    구간을 쓰도록 hint 를 준다 (backfill 후엔 빈 구간이라 컬렉션 스캔이 없음).
+    """
+    global _legacy_done
+    backfilled = orphans = 0
+    if _legacy_done:
+        return {"backfilled": 0, "orphans_deleted": 0}
+    while True:
+        ids = [
+            d["_id"]
+            async for d in mongo.logs_body.find({"ts": {"$exists": False}}, {"_id": 1})
+            .hint([("ts", 1)])
+            .limit(batch_size)
+        ]
+        if not ids:
+            _legacy_done = True
+            break
+        ts_by_body = {
+            m["body_id"]: m["ts"]
+            async for m in mongo.logs_meta.find({"body_id": {"$in": ids}}, {"body_id": 1, "ts": 1})
+        }
+        if ts_by_body:
+            await mongo.logs_body.bulk_write(
+                [UpdateOne({"_id": bid}, {"$set": {"ts": ts}}) for bid, ts in ts_by_body.items()],
+                ordered=False,
+            )
+            backfilled += len(ts_by_body)
+        gone = [bid for bid in ids if bid not in ts_by_body]
+        if gone:
+            if get_settings().log_archive_enabled:
+                await _archive_orphans(gone)
+            await mongo.logs_body.delete_many({"_id": {"$in": gone}})
+            orphans += len(gone)
+        if len(ids) < batch_size:
+            break
+    _BACKFILLED.inc(backfilled)
+    _ORPHANS.inc(orphans)
+    return {"backfilled": backfilled, "orphans_deleted": orphans}
+
+
+# ---------------------------------------------------------------------------
+# 보관 (cold archive)
+# ---------------------------------------------------------------------------
+def _segment_path() -> Path:
+    d = Path(get_settings().log_archive_dir)
+    d.mkdir(parents=True, exist_ok=True)
+    return d / f"logs-{datetime.utcnow():%Y%m%d-%H%M%S-%f}.ndjson.gz"
+
+
+def _write_segment(records: List[Dict]) -> Path:
+    """gzip NDJSON 세그먼트 – 임시 파일에 쓰고 rename (부분 파일이 남지 않게)."""
+    path = _segment_path()
+    tmp = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wb", compresslevel=6) as fp:
+        for r in records:
+            fp.write(orjson.dumps(r, default=str) + b"\n")
+    tmp.replace(path)
+    return path
+
+
+async def _archive_orphans(body_ids: List) -> None:
+    records = []
+    async for doc in mongo.logs_body.find({"_id": {"$in": body_ids}}):
+        # 메타가 이미 만료된 본문 – 본문과 id 만 남는다
+        records.append({"_id": None, "body_id": str(doc["_id"]), "body": decode_body(doc)})
+    if records:
+        await asyncio.to_thread(_write_segment, records)
+        _ARCHIVED.inc(len(records))
+
+
+async def archive_expiring(batch_size: int) -> Dict[str, int]:
+    """만료가 ``log_archive_lead_hours`` 안으로 다가온 레코드를 세그먼트로 보관."""
+    s = get_settings()
+    cutoff = (
+        datetime.utcnow()
+        - timedelta(seconds=ttl_seconds())
+        + timedelta(hours=s.log_archive_lead_hours)
+    )
+    archived = segments = 0
+    while True:
+        metas = await mongo.logs_meta.find(
+            {"ts": {"$lt": cutoff}, "archived": {"$ne": True}}
+        ).sort([("ts", 1), ("_id", 1)]).limit(batch_size).to_list(batch_size)
+        if not metas:
+            break
+        records = await attach_bodies(metas)
+        await asyncio.to_thread(_write_segment, records)
+        # 세그먼트를 쓴 뒤에 표시 – 그 사이 죽으면 다음 실행에서 중복 보관될 수 있음 (유실은 없음)
+        await mongo.logs_meta.update_many(
+            {"_id": {"$in": [m["_id"] for m in metas]}}, {"$set": {"archived": True}}
+        )
+        archived += len(metas)
+        segments += 1
+        if len(metas) < batch_size:
+            break
+    _ARCHIVED.inc(archived)
+    return {"archived": archived, "segments": segments}
+
+
+# ---------------------------------------------------------------------------
+# 용량 지표
+# ---------------------------------------------------------------------------
+async def storage_stats() -> Dict[str, Dict]:
+    out: Dict[str, Dict] = {}
+    for name in STORAGE_COLLECTIONS:
+        col = getattr(mongo, name, None)
+        if col is None:
+            continue
+        try:
+            docs = await col.aggregate([{"$collStats": {"storageStats": {}}}]).to_list(None)
+        except Exception as e:
+            out[name] = {"error": str(e)}
+            continue
+        st = (docs[0] if docs else {}).get("storageStats", {})
+        row = {
+            "count": st.get("count", 0),
+            "size": st.get("size", 0),
+            "storage_size": st.get("storageSize", 0),
+            "index_size": st.get("totalIndexSize", 0),
+        }
+        _COUNT.labels(name).set(row["count"])
+        _SIZE.labels(name).set(row["size"])
+        _STORAGE.labels(name).set(row["storage_size"])
+        out[name] = row
+
+    archive = Path(get_settings().log_archive_dir)
+    if archive.exists():
+        files = list(archive.glob("*.ndjson.gz"))
+        out["archive"] = {"segments": len(files), "size": sum(f.stat().st_size for f in files)}
+    return out
+
+
+# ---------------------------------------------------------------------------
+async def sweep_once() -> Dict:
+    s = get_settings()
+    started = datetime.utcnow()
+    result = await sweep_legacy_bodies(s.log_sweep_batch)
+    if s.log_archive_enabled:
+        result.update(await archive_expiring(s.log_sweep_batch))
+    result["storage"] = await storage_stats()
+    result["at"] = started.isoformat()
+    last_sweep.clear()
+    last_sweep.update(result)
+    print(f"🧹 log sweep: { {k: v for k, v in result.items() if k != 'storage'} }")
+    return result
+
+
+async def sweep_loop() -> None:
+    while True:
+        try:
+            await sweep_once()
+        except Exception as e:
+            print(f"⚠️  log sweep 실패: {e}")
+        await asyncio.sleep(get_settings().log_sweep_interval)
+
+
+async def _main() -> None:
+    from cardnews.core.db import connect_to_mongo, close_mongo
+
+    await connect_to_mongo()
+    try:
+        await sweep_once()
+    finally:
+        await close_mongo()
+
+
+def main() -> None:
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# payload.py
+"""/generate 응답 직렬화 & 경량화.
+
+* ``trim_cards``          – 카드별 img_urls / ref_urls / img_desc 를 top_k 개로 자름
+* ``externalize_thumbs``  – base64 data URI 를 ``/img/{hash}`` URL 로 치환
+* ``encode``              – orjson(기본) 또는 msgpack(선택 의존성) 으로 한 번만 직렬화
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+import orjson
+
+from cardnews.services import thumb_store
+
+try:  # msgpack 은 선택 의존성
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/x-msgpack",
+}
+
+_LIST_KEYS = ("img_urls", "ref_urls", "img_desc")
+
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+
+def _cards(data: Any) -> List[Dict]:
+    if isinstance(data, dict):
+        return data.get("cards") or []
+    return [c for c in data if isinstance(c, dict)] if isinstance(data, list) else []
+
+
+def trim_cards(data: Any, top_k: int) -> Any:
+    """세 병렬 리스트를 같은 길이(top_k)로 자른다. 원본을 직접 수정."""
+    for card in _cards(data):
+        for key in _LIST_KEYS:
+            if isinstance(card.get(key), list):
+                card[key] = card[key][:top_k]
+    return data
+
+
+async def externalize_thumbs(data: Any, img_base: str) -> Any:
+    """img_urls 안의 base64 data URI 를 ``{img_base}{hash}`` 로 바꾼다."""
+    slots = []  # (card, index, uri)
+    for card in _cards(data):
+        for i, url in enumerate(card.get("img_urls") or []):
+            if isinstance(url, str) and url.startswith("data:"):
+                slots.append((card, i, url))
+    if not slots:
+        return data
+
+    digests = await asyncio.gather(*[thumb_store.put_data_uri(uri) for _, _, uri in slots])
+    for (card, i, _), digest in zip(slots, digests):
+        if digest:
+            card["img_urls"][i] = f"{img_base}{digest}"
+    return data
+
+
+def encode(data: Any, fmt: str = "json") -> bytes:
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("msgpack 미설치 – `pip install msgpack`")
+        return msgpack.packb(data, use_bin_type=True)
+    return orjson.dumps(data)
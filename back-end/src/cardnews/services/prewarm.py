@@ -0,0 +1,101 @@
+# prewarm.py
+"""인기 키워드 프리워밍 스케줄러.
+
+``logs_meta`` 의 최근 쿼리 빈도 상위 키워드를 주기적으로 골라, 결과 저장소
+(``result_cache``)에 없거나 곧 만료되는 항목을 미리 재생성한다.
+
+라이브 트래픽 보호
+------------------
+* 한 번에 ``prewarm_concurrency`` 개만 생성한다.
+* page_fetch 풀 점유율이 ``prewarm_max_pool_utilization`` 을 넘거나 대기자가
+  있으면 이번 주기는 건너뛴다 (= 프록시 여유가 있을 때만 사용).
+* 스테이지 풀에서는 ``prewarm`` owner 로 잡혀 라이브 요청과 공정 분배된다.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from cardnews.core.db import mongo
+from cardnews.core.pools import get_pool, request_owner
+from cardnews.core.settings import get_settings
+from cardnews.services import payload, result_cache
+
+
+async def top_queries(since: datetime, limit: int) -> List[Tuple[str, str | None, int]]:
+    """최근 로그 기준 (query, date_range, 횟수) 상위 ``limit`` 개."""
+    pipeline = [
+        {"$match": {"ts": {"$gte": since}}},
+        {"$group": {
+            "_id": {"q": "$query", "r": "$date_range"},
+            "n": {"$sum": 1},
+        }},
+        {"$sort": {"n": -1}},
+        {"$limit": limit},
+    ]
+    rows = await mongo.logs_meta.aggregate(pipeline).to_list(length=limit)
+    return [(r["_id"]["q"], r["_id"].get("r"), r["n"]) for r in rows]
+
+
+def _has_capacity() -> bool:
+    pool = get_pool("page_fetch")
+    snap = pool.snapshot()
+    limit = get_settings().prewarm_max_pool_utilization
+    return snap["waiting"] == 0 and snap["in_use"] / snap["size"] < limit
+
+
+async def _refresh(client, query: str, date_range: str | None) -> bool:
+    from cardnews.workers.agent_runner import generate_cardnews
+
+    s = get_settings()
+    if not await result_cache.try_lock_refresh(query, date_range, s.prewarm_lock_seconds):
+        return False
+    data = await generate_cardnews(client, query, date_range)
+    if not result_cache.is_cacheable(data):
+        return False
+    await result_cache.put(query, date_range, payload.encode(data))
+    return True
+
+
+async def run_once(client) -> int:
+    """한 주기 실행. 갱신한 키워드 수 반환."""
+    s = get_settings()
+    request_owner.set("prewarm")
+    now = datetime.utcnow()
+    candidates = await top_queries(now - timedelta(hours=s.prewarm_lookback_hours), s.prewarm_top_n)
+
+    refreshed = 0
+    sem = asyncio.Semaphore(s.prewarm_concurrency)
+
+    async def _one(query: str, date_range: str | None) -> None:
+        nonlocal refreshed
+        exp = await result_cache.expires_at(query, date_range)
+        if exp and exp - now > timedelta(seconds=s.prewarm_refresh_margin):
+            return  # 아직 충분히 신선함
+        async with sem:
+            if not _has_capacity():
+                return
+            try:
+                if await _refresh(client, query, date_range):
+                    refreshed += 1
+                    print(f"🔥 prewarm: {query!r} ({date_range})")
+            except Exception as e:
+                print(f"⚠️  prewarm {query!r} 실패: {e}")
+
+    await asyncio.gather(*[_one(q, r) for q, r, _ in candidates])
+    return refreshed
+
+
+async def scheduler_loop(get_client) -> None:
+    """startup 에서 태스크로 띄우는 무한 루프. ``get_client`` 는 현재 스크래핑 클라이언트를 돌려준다."""
+    s = get_settings()
+    while True:
+        await asyncio.sleep(s.prewarm_interval)
+        client = get_client()
+        if client is None or not _has_capacity():
+            continue
+        try:
+            await run_once(client)
+        except Exception as e:
+            print(f"⚠️  prewarm 주기 실패: {e}")
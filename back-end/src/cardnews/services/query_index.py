@@ -0,0 +1,208 @@
+# query_index.py
+"""의미상 거의 같은 키워드를 위한 유사 쿼리 인덱스.
+
+"잠실 맛집" / "잠실맛집" / "잠실 맛집 추천" 처럼 표기만 조금 다른 요청이
+매번 전체 파이프라인을 돌지 않도록, 최근 생성된 결과(``results``)의 쿼리를
+벡터로 만들어 두고 가장 가까운 것을 찾는다.
+
+* 정규화: NFKC → 소문자 → 구두점 제거 → 공백 제거
+* 뜻을 바꾸지 않는 끝말("추천", "후기", 복수 "들" …)은 떼고 비교 – 짧은
+  쿼리에선 이런 접미어 하나가 n-gram 의 큰 몫이라 임계값을 못 넘는다
+* 한글 음절은 초·중·종성 자모로 분해 후 문자 n-gram (조사·띄어쓰기 차이에 강함)
+* n-gram 은 hashing trick 으로 고정 차원 벡터 → L2 정규화 → 코사인 유사도
+* NumPy 가 있으면 행렬곱 brute-force, 없으면 희소 dict 로 동일 계산
+* 숫자·영문 토큰(연도, 모델명 "s24", "아이폰15" 의 15 …)은 n-gram 유사도가
+  높아도 정확히 같아야 매칭 – "2024년 실적" 과 "2025년 실적" 은 다른 쿼리
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from cardnews.core.db import mongo
+from cardnews.core.settings import get_settings
+
+_DIM = 2048
+_PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
+_EXACT = re.compile(r"[0-9a-z]+")
+# 검색 의도를 바꾸지 않는 끝말 (긴 것부터) – 정규화된(공백 없는) 쿼리 끝에서 반복해 뗀다
+_STOP_SUFFIXES = ("추천해줘", "알려줘", "추천", "후기", "정리", "모음", "들")
+
+_CHO = [chr(c) for c in range(0x1100, 0x1113)]
+_JUNG = [chr(c) for c in range(0x1161, 0x1176)]
+_JONG = [""] + [chr(c) for c in range(0x11A8, 0x11C3)]
+
+
+@lru_cache(maxsize=1)
+def _numpy():
+    """NumPy 는 선택 의존성 – cold start 를 늘리지 않도록 첫 검색 때 로드."""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+def normalize(query: str) -> str:
+    q = unicodedata.normalize("NFKC", query).lower()
+    q = _PUNCT.sub(" ", q)
+    return "".join(q.split())
+
+
+def core(query: str) -> str:
+    """``normalize`` 후 끝의 일반적인 접미어를 뗀 비교용 문자열."""
+    q = normalize(query)
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in _STOP_SUFFIXES:
+            if q.endswith(suffix) and len(q) > len(suffix) + 1:
+                q = q[: -len(suffix)]
+                stripped = True
+                break
+    return q
+
+
+def exact_tokens(query: str) -> Tuple[str, ...]:
+    """유사도와 별개로 일치해야 하는 숫자·영문 토큰 (공백 제거 후 추출 → 띄어쓰기 무관)."""
+    return tuple(sorted(_EXACT.findall(normalize(query))))
+
+
+def to_jamo(text: str) -> str:
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+            out.append(_JUNG[(code % 588) // 28])
+            out.append(_JONG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _grams(query: str, n: int) -> Counter:
+    s = to_jamo(core(query))
+    if len(s) <= n:
+        return Counter([s]) if s else Counter()
+    return Counter(s[i:i + n] for i in range(len(s) - n + 1))
+
+
+def vectorize(query: str) -> Dict[int, float]:
+    """희소 벡터 {hash_bucket: weight}, L2 정규화."""
+    n = get_settings().similar_query_ngram
+    vec: Dict[int, float] = {}
+    for gram, cnt in _grams(query, n).items():
+        h = int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=4).digest(), "little") % _DIM
+        vec[h] = vec.get(h, 0.0) + cnt
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {k: v / norm for k, v in vec.items()}
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class QueryIndex:
+    """date_range 별로 분리된 (쿼리, 만료시각, 벡터, 숫자·영문 토큰) 목록."""
+
+    def __init__(self):
+        self._entries: Dict[str | None, List[Tuple[str, datetime, Dict[int, float], Tuple[str, ...]]]] = {}
+        self._matrix: Dict[str | None, "numpy.ndarray"] = {}
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    def add(self, query: str, date_range: str | None, expires_at: datetime) -> None:
+        entries = self._entries.setdefault(date_range, [])
+        norm = normalize(query)
+        entries[:] = [e for e in entries if normalize(e[0]) != norm]
+        entries.append((query, expires_at, vectorize(query), exact_tokens(query)))
+        self._matrix.pop(date_range, None)   # 다음 검색 때 재구성
+
+    def rebuild(self, rows: List[Tuple[str, str | None, datetime]]) -> None:
+        self._entries.clear()
+        self._matrix.clear()
+        for query, date_range, expires_at in rows:
+            self.add(query, date_range, expires_at)
+
+    def _dense(self, date_range: str | None) -> "numpy.ndarray":
+        np = _numpy()
+        mat = self._matrix.get(date_range)
+        if mat is None:
+            entries = self._entries.get(date_range, [])
+            mat = np.zeros((len(entries), _DIM), dtype=np.float32)
+            for i, (_, _, vec, _) in enumerate(entries):
+                for k, v in vec.items():
+                    mat[i, k] = v
+            self._matrix[date_range] = mat
+        return mat
+
+    def search(self, query: str, date_range: str | None) -> Tuple[str, float] | None:
+        entries = self._entries.get(date_range)
+        if not entries:
+            return None
+        qv = vectorize(query)
+        tokens = exact_tokens(query)
+        now = datetime.utcnow()
+        np = _numpy()
+        if np is not None:
+            q = np.zeros(_DIM, dtype=np.float32)
+            for k, v in qv.items():
+                q[k] = v
+            scores = self._dense(date_range) @ q
+            order = np.argsort(-scores)
+            ranked = ((int(i), float(scores[i])) for i in order)
+        else:
+            ranked = iter(sorted(
+                ((i, cosine(qv, e[2])) for i, e in enumerate(entries)),
+                key=lambda x: -x[1],
+            ))
+        for i, score in ranked:
+            cand, expires_at, _, cand_tokens = entries[i]
+            if expires_at > now and cand_tokens == tokens:
+                return cand, score
+        return None
+
+
+index = QueryIndex()
+
+
+def find_similar(query: str, date_range: str | None) -> Tuple[str, float] | None:
+    """임계값 이상으로 가까운 (다른 표기의) 캐시 쿼리. 없으면 None."""
+    hit = index.search(query, date_range)
+    if hit and hit[1] >= get_settings().similar_query_threshold:
+        return hit
+    return None
+
+
+async def refresh_from_store() -> int:
+    """results 컬렉션에서 아직 유효한 항목으로 인덱스 재구성."""
+    rows = []
+    cursor = mongo.results.find(
+        {"expires_at": {"$gt": datetime.utcnow()}, "body_gzip": {"$exists": True}},
+        {"query": 1, "date_range": 1, "expires_at": 1},
+    )
+    async for doc in cursor:
+        rows.append((doc["query"], doc.get("date_range"), doc["expires_at"]))
+    index.rebuild(rows)
+    return len(rows)
+
+
+async def refresh_loop() -> None:
+    s = get_settings()
+    while True:
+        try:
+            await refresh_from_store()
+        except Exception as e:
+            print(f"⚠️  query index 갱신 실패: {e}")
+        await asyncio.sleep(s.similar_query_refresh_interval)
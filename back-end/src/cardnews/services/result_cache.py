@@ -0,0 +1,92 @@
+# result_cache.py
+"""(query, date_range) 단위 카드뉴스 결과 저장소.
+
+MongoDB ``results`` 컬렉션에 gzip 본문을 ``expires_at`` TTL 과 함께 보관한다.
+``generate_and_log`` 는 먼저 여기서 찾고, 프리워밍 스케줄러는 만료 전에
+인기 키워드를 갱신해 넣는다.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+from datetime import datetime, timedelta
+
+import bson
+from pymongo.errors import DuplicateKeyError
+
+from cardnews.core.db import mongo
+from cardnews.core.settings import get_settings
+
+
+def cache_key(query: str, date_range: str | None) -> str:
+    norm = " ".join(query.split()).lower()
+    return hashlib.sha1(f"{norm}\x00{date_range or ''}".encode()).hexdigest()
+
+
+def is_cacheable(data) -> bool:
+    """실패 결과(``[{}]``)나 카드가 없는 결과는 저장하지 않는다."""
+    return isinstance(data, dict) and bool(data.get("cards"))
+
+
+async def get(query: str, date_range: str | None) -> bytes | None:
+    doc = await mongo.results.find_one(
+        {"_id": cache_key(query, date_range), "expires_at": {"$gt": datetime.utcnow()}},
+        {"body_gzip": 1},
+    )
+    if not doc or "body_gzip" not in doc:
+        return None
+    return gzip.decompress(doc["body_gzip"])
+
+
+async def put(query: str, date_range: str | None, body: bytes, ttl: int | None = None) -> None:
+    from cardnews.services import query_index
+
+    now = datetime.utcnow()
+    ttl = ttl or get_settings().result_cache_ttl
+    await mongo.results.update_one(
+        {"_id": cache_key(query, date_range)},
+        {
+            "$set": {
+                "query": query,
+                "date_range": date_range,
+                "body_gzip": bson.Binary(gzip.compress(body)),
+                "created": now,
+                "expires_at": now + timedelta(seconds=ttl),
+            },
+            "$unset": {"refresh_lock": ""},
+        },
+        upsert=True,
+    )
+    # 다른 워커의 결과는 query_index.refresh_loop 가 주기적으로 반영
+    query_index.index.add(query, date_range, now + timedelta(seconds=ttl))
+
+
+async def expires_at(query: str, date_range: str | None) -> datetime | None:
+    doc = await mongo.results.find_one(
+        {"_id": cache_key(query, date_range)}, {"expires_at": 1}
+    )
+    return doc.get("expires_at") if doc else None
+
+
+async def try_lock_refresh(query: str, date_range: str | None, seconds: int) -> bool:
+    """여러 워커가 같은 키를 동시에 재생성하지 않도록 갱신 잠금."""
+    now = datetime.utcnow()
+    try:
+        await mongo.results.find_one_and_update(
+            {
+                "_id": cache_key(query, date_range),
+                "$or": [
+                    {"refresh_lock": {"$exists": False}},
+                    {"refresh_lock": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {"refresh_lock": now + timedelta(seconds=seconds)},
+                # 본문 없이 잠금만 남은 문서도 TTL 로 정리되도록
+                "$setOnInsert": {"expires_at": now + timedelta(seconds=seconds)},
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return False   # 문서는 있는데 잠금이 살아 있음
+    return True
@@ -0,0 +1,94 @@
+# thumb_store.py
+"""base64 썸네일을 JSON 밖으로 빼기 위한 content-addressed 저장소.
+
+``data:image/...;base64,...`` URI 를 디코딩해 sha256 으로 키를 만들고
+MongoDB ``thumbs`` 컬렉션(+ 프로세스 내 LRU)에 저장한다.
+응답에는 ``/img/{hash}`` URL 만 남는다.
+
+URL 을 내줄 때마다(LRU 히트 포함) 문서의 ``ts`` 가 ``thumb_ttl_days`` 의
+절반보다 오래됐으면 갱신해, 내준 URL 이 TTL 로 사라지지 않게 한다. 저장이
+실패한 슬롯은 호출자가 data URI 를 그대로 둔다.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Tuple
+
+import bson
+
+from cardnews.core.db import mongo
+from cardnews.core.settings import get_settings
+
+# hash -> (content_type, bytes, Mongo 문서의 ts)
+_lru: "OrderedDict[str, Tuple[str, bytes, datetime]]" = OrderedDict()
+
+
+def _remember(digest: str, content_type: str, data: bytes, ts: datetime) -> None:
+    _lru[digest] = (content_type, data, ts)
+    _lru.move_to_end(digest)
+    while len(_lru) > get_settings().thumb_cache_size:
+        _lru.popitem(last=False)
+
+
+def decode_data_uri(uri: str) -> Tuple[str, bytes] | None:
+    """``data:`` URI → (content_type, bytes). base64 가 아니거나 깨졌으면 None."""
+    try:
+        header, payload = uri.split(",", 1)
+    except ValueError:
+        return None
+    if not header.startswith("data:") or ";base64" not in header:
+        return None
+    try:
+        data = base64.b64decode(payload, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+    return header[5:].split(";", 1)[0] or "application/octet-stream", data
+
+
+async def put_data_uri(uri: str) -> str | None:
+    """data URI 를 저장하고 content hash 반환 (저장 불가 시 None)."""
+    decoded = decode_data_uri(uri)
+    if decoded is None:
+        return None
+    content_type, data = decoded
+    digest = hashlib.sha256(data).hexdigest()
+    now = datetime.utcnow()
+    hit = _lru.get(digest)
+    if hit is not None:
+        _lru.move_to_end(digest)
+        if now - hit[2] < timedelta(days=get_settings().thumb_ttl_days) / 2:
+            return digest
+
+    # 같은 해시는 같은 내용이므로 upsert 로 충분 (ts 만 갱신해 TTL 연장)
+    try:
+        await mongo.thumbs.update_one(
+            {"_id": digest},
+            {
+                "$set": {"ts": now},
+                "$setOnInsert": {"content_type": content_type, "data": bson.Binary(data)},
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"⚠️  thumb 저장 실패 ({digest[:12]}): {e}")
+        # 이미 저장된(최근 ts 갱신) 썸네일이면 URL 을 그대로 써도 된다
+        return digest if hit is not None else None
+    _remember(digest, content_type, data, now)
+    return digest
+
+
+async def get(digest: str) -> Tuple[str, bytes] | None:
+    hit = _lru.get(digest)
+    if hit is not None:
+        _lru.move_to_end(digest)
+        return hit[0], hit[1]
+    doc = await mongo.thumbs.find_one({"_id": digest})
+    if not doc:
+        return None
+    content_type, data = doc["content_type"], bytes(doc["data"])
+    _remember(digest, content_type, data, doc.get("ts") or datetime.min)
+    return content_type, data
@@ -15,9 +15,13 @@ from __future__ import annotations
 
 import asyncio
 import json
+import math
+import re
 import sys
+import time
 import urllib.parse
-from typing import List, Dict
+from functools import lru_cache
+from typing import Callable, List, Dict
 
 from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
@@ -27,12 +31,21 @@ from google.genai import types
 from google.adk.events import Event, EventActions
 
 from cardnews.scraping.proxy_client import ProxyRotationClient
-from cardnews.scraping.parsers import (
-    get_parsed_google_search_page,
-    get_parsed_text_page,
-    get_parsed_google_img_search_page,
+from cardnews.scraping.utils import clean_urls
+from cardnews.scraping.image_probe import filter_images
+from cardnews.scraping.domains import DomainOpen, registry as domains
+from cardnews.scraping.extract import mobile_url
+from cardnews.scraping.hedging import LatencyTracker, first_k, hedged
+from cardnews.core.settings import get_settings
+from cardnews.core.pools import get_pool, shared_fetch
+from cardnews.workers import checkpoints, llm_router
+from cardnews.workers.llm_output import (
+    CardStreamParser,
+    LLMOutputError,
+    parse_cards,
+    parse_urls,
+    response_format,
 )
-from cardnews.scraping.utils import safe_parse_urls, clean_urls
 
 from cardnews.workers.instructions import (
     FILTER_INSTRUCTION,
@@ -48,13 +61,88 @@ async def search_google(client, keyword: str, max_results: int = 10, date_range:
     url = f"https://www.google.com/search?q={keyword}&num={max_results}"
     if date_range:
         url += f"&tbs=qdr:{date_range}"
-    html = await client.fetch(url)
-    return get_parsed_google_search_page(html)
+
+    async def _fetch():
+        async with get_pool("page_fetch").slot():
+            return await client.fetch_parsed(url, "google_search")
+
+    return await shared_fetch(("serp", url), _fetch)
+
+
+# 본문 페이지 fetch 지연 분포 (헤징 기준 분위수 계산용)
+_page_latency = LatencyTracker()
+
+
+# 삭제된 글 – 브라우저로 다시 볼 필요 없음
+_DEAD_STATUS = (404, 410)
+
+
+async def _fetch_page_text_once(client, url: str, started: asyncio.Event | None = None) -> str:
+    """도메인 브레이커·동시성 제한 안에서 HTTP → (부족하면) 브라우저 순으로 fetch.
+
+    브레이커에는 호스트 단위 실패(브라우저까지 접속·차단 실패)만 실패로 남긴다.
+    응답은 왔는데 본문이 없는 경우(404·삭제된 글)는 호스트가 살아 있는 것.
+    지연은 도메인 슬롯·page_fetch 풀 대기 시간을 뺀 실제 fetch 시간만 잰다.
+    """
+    dom = domains.get(url)
+    if not dom.allow():
+        raise DomainOpen(url)
+    fetch_http = getattr(client, "fetch_http", None)     # 큐 백엔드는 워커가 브라우저로만
+    queued = 0.0
+    begin = time.monotonic()
+    try:
+        async with dom.slot():
+            queued = time.monotonic() - begin
+            if started is not None:
+                started.set()           # 헤징 타이머는 여기서부터
+            text = None
+            if fetch_http and get_settings().domain_http_first and dom.prefers_http:
+                status, text = await fetch_http(url)
+                dead = status in _DEAD_STATUS
+                dom.record_http(text is not None or dead)
+                if dead:
+                    text = ""
+            if text is None:
+                waited = time.monotonic()
+                async with get_pool("page_fetch").slot():
+                    queued += time.monotonic() - waited
+                    text = await client.fetch_parsed(url, "text_page")
+    except asyncio.CancelledError:
+        dom.probing = False       # 헤징/취소로 끊긴 시험 요청은 결과로 치지 않음
+        raise
+    except Exception:
+        dom.record(False)
+        raise
+    elapsed = time.monotonic() - begin - queued
+    dom.record(True, elapsed if text else None)
+    _page_latency.observe(elapsed)
+    return text
+
+
+def _fetch_contended(url: str) -> bool:
+    """슬롯을 기다리는 요청이 있으면 중복 요청은 대기열만 늘린다."""
+    return get_pool("page_fetch").has_waiters or domains.get(url).host.waiting > 0
 
 
 async def fetch_page_text(client, url: str) -> str:
-    html = await client.fetch(url)
-    return get_parsed_text_page(html)
+    """본문 fetch. 지연이 p90(설정값)을 넘기면 다른 프록시로 중복 요청을 띄운다."""
+    s = get_settings()
+    url = mobile_url(url)
+    hedge_after = (
+        _page_latency.quantile(s.page_fetch_hedge_quantile) if s.page_fetch_hedge else None
+    )
+
+    def _hedged():
+        started = asyncio.Event()
+        return hedged(
+            lambda: _fetch_page_text_once(client, url, started),
+            hedge_after,
+            _page_latency,
+            started=started,
+            should_hedge=lambda: not _fetch_contended(url),
+        )
+
+    return await shared_fetch(("page", url), _hedged)
 
 
 _IMG_SEARCH_BASE = (
@@ -69,174 +157,341 @@ async def search_google_images(
     top_k: int = 20,
 ) -> List[Dict[str, str]]:
     url = _IMG_SEARCH_BASE.format(q=urllib.parse.quote(keyword))
-    html = await client.fetch(url)
-    items = get_parsed_google_img_search_page(html)
+
+    async def _fetch():
+        async with get_pool("image_search").slot():
+            return await client.fetch_parsed(url, "google_img_search")
+
+    items = await shared_fetch(("img", url), _fetch)
     return items[:top_k]
 
 
 async def parallel_fetch_texts(
     client: ProxyRotationClient,
     urls: List[str],
-    max_concurrency: int = 5,
 ) -> str:
-    sem = asyncio.Semaphore(max_concurrency)
+    """선택된 URL 본문을 병렬 수집.
 
-    async def _worker(idx: int, url: str) -> str:
-        async with sem:
-            try:
-                text = await fetch_page_text(client, url)
-                text = text[:20_000]
-                return (
-                    f"---{idx+1}번째 페이지---\n{text}\n--------------------------------\n"
-                )
-            except Exception as e:
-                print(f"⚠️  [{idx + 1}] {url} 실패: {e}")
-                return ""
+    동시성은 프로세스 전역 page_fetch 풀이 제한하고 (core/pools.py),
+    전체 중 ``page_fetch_quorum`` 비율이 모이면 grace 만큼만 더 기다린다.
+    ``page_fetch_deadline`` 이 지나면 못 받은 페이지는 버린다.
+    """
+    s = get_settings()
 
-    tasks = [_worker(i, u) for i, u in enumerate(urls)]
-    chunks = await asyncio.gather(*tasks)
-    return "".join(chunks)
+    async def _worker(idx: int, url: str) -> str:
+        try:
+            text = await fetch_page_text(client, url)
+            text = text[: s.page_text_max_chars]
+            return (
+                f"---{idx+1}번째 페이지---\n{text}\n--------------------------------\n"
+            )
+        except Exception as e:
+            print(f"⚠️  [{idx + 1}] {url} 실패: {e}")
+            return ""
+
+    skipped = [u for u in urls if domains.is_open(u)]
+    if skipped:
+        print(f"🚧 서킷 open 도메인 {len(skipped)}개 생략: {skipped}")
+        urls = [u for u in urls if u not in skipped]
+    if not urls:
+        return ""
+
+    quorum = max(1, math.ceil(len(urls) * s.page_fetch_quorum))
+    chunks = await first_k(
+        [_worker(i, u) for i, u in enumerate(urls)],
+        k=quorum,
+        deadline=s.page_fetch_deadline,
+        grace=s.page_fetch_grace,
+    )
+    dropped = [urls[i] for i in range(len(urls)) if i not in chunks]
+    if dropped:
+        print(f"⏱️  deadline/quorum 으로 {len(dropped)}개 페이지 생략: {dropped}")
+    return "".join(chunks.get(i, "") for i in range(len(urls)))
 
 # ---------------------------------------------------------------------------
 # Agent 정의
 # ---------------------------------------------------------------------------
+# 모델 티어 – stage 별 실제 선택은 settings.llm_cascades (workers/llm_router.py)
 MODEL_LOW = "openai/gpt-4.1-nano"
 MODEL_MID = "openai/gpt-4.1-mini"
 MODEL_HIGH = "openai/o4-mini"
 
-FILTER_AGENT = Agent(
-    name="filter_agent",
-    model=LiteLlm(model=MODEL_HIGH),
-    instruction=FILTER_INSTRUCTION,
-)
-
-TEXT_MAKER_AGENT = Agent(
-    name="text_maker_agent",
-    model=LiteLlm(model=MODEL_HIGH),
-    instruction=TEXT_MAKER_INSTRUCTION,
-)
-
-IMG_KEYWORD_AGENT = Agent(
-    name="img_keyword_agent",
-    model=LiteLlm(model=MODEL_HIGH),
-    instruction=IMG_KEYWORD_INSTRUCTION,
-)
+# stage -> (agent 이름, instruction)
+_AGENT_SPECS = {
+    "filter": ("filter_agent", FILTER_INSTRUCTION),
+    "text_maker": ("text_maker_agent", TEXT_MAKER_INSTRUCTION),
+    "img_keyword": ("img_keyword_agent", IMG_KEYWORD_INSTRUCTION),
+}
+
+
+@lru_cache(maxsize=None)
+def get_agent(stage: str, model: str = MODEL_HIGH) -> Agent:
+    """(stage, model) 별 Agent 를 처음 쓸 때 한 번만 생성 (import 시점 비용 제거)."""
+    name, instruction = _AGENT_SPECS[stage]
+    extra = {}
+    if get_settings().llm_structured_output:
+        # 모델 쪽에서 JSON-schema 강제 → 파싱 실패 자체를 줄임
+        extra["response_format"] = response_format(stage)
+    return Agent(
+        name=name,
+        model=LiteLlm(model=model, **extra),
+        instruction=instruction,
+    )
 
 # ---------------------------------------------------------------------------
 # Runner helper
 # ---------------------------------------------------------------------------
 async def _run_agent(runner: Runner, user_msg: str) -> str:
     content = types.Content(role="user", parts=[types.Part(text=user_msg)])
-    async for event in runner.run_async(user_id="user", session_id="sess", new_message=content):
-        if event.is_final_response():
-            return event.content.parts[0].text if event.content and event.content.parts else ""
+    async with get_pool("llm").slot():
+        async for event in runner.run_async(user_id="user", session_id="sess", new_message=content):
+            if event.is_final_response():
+                return event.content.parts[0].text if event.content and event.content.parts else ""
     raise RuntimeError("Agent did not return final response")
 
+
+_STATE_VAR = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def _render_instruction(stage: str, state: Dict) -> str:
+    """ADK 와 같은 규칙으로 instruction 의 {state 키} 를 치환."""
+    _, instruction = _AGENT_SPECS[stage]
+    return _STATE_VAR.sub(
+        lambda m: str(state[m.group(1)]) if m.group(1) in state else m.group(0), instruction
+    )
+
+
+async def _stream_agent(
+    stage: str, model: str, state: Dict, user_msg: str, on_chunk: Callable[[str], None]
+) -> str:
+    """토큰 스트리밍 호출. 조각이 올 때마다 ``on_chunk`` 를 부르고 전체 텍스트 반환.
+
+    ADK 0.2 의 LiteLlm 스트리밍은 동기 ``completion()`` 을 순회해 이벤트 루프를
+    막으므로, 단발성 stage 는 litellm.acompletion(stream=True) 을 직접 쓴다.
+    """
+    import litellm
+
+    extra = {}
+    if get_settings().llm_structured_output:
+        extra["response_format"] = response_format(stage)
+    parts: List[str] = []
+    async with get_pool("llm").slot():
+        stream = await litellm.acompletion(
+            model=model,
+            messages=[
+                {"role": "system", "content": _render_instruction(stage, state)},
+                {"role": "user", "content": user_msg},
+            ],
+            stream=True,
+            **extra,
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                on_chunk(delta)
+    return "".join(parts)
+
+
+async def _run_stage(
+    service: InMemorySessionService,
+    stage: str,
+    user_msg: str,
+    parse,
+    input_chars: int = 0,
+    *,
+    state: Dict | None = None,
+    on_card: Callable[[Dict], None] | None = None,
+):
+    """stage 실행 + 파싱. ``llm_router.plan`` 의 모델 순서대로 시도하고,
+    응답이 검증에 실패하면 앞 단계 결과(세션 state)는 그대로 둔 채
+    이 stage 만 다음 모델로 다시 돌린다.
+
+    ``on_card`` 가 있으면 토큰 스트리밍으로 받아, 카드 객체가 닫힐 때마다 호출한다.
+    """
+    models = llm_router.plan(stage, input_chars)
+    streaming = on_card is not None and state is not None and get_settings().llm_streaming
+    for attempt, model in enumerate(models, 1):
+        started = time.monotonic()
+        try:
+            if streaming:
+                parser = CardStreamParser()
+                raw = await _stream_agent(
+                    stage, model, state, user_msg,
+                    lambda chunk: [on_card(card) for card in parser.feed(chunk)],
+                )
+            else:
+                runner = Runner(agent=get_agent(stage, model), app_name="app", session_service=service)
+                raw = await _run_agent(runner, user_msg)
+        except Exception:
+            llm_router.record(stage, model, time.monotonic() - started, "error")
+            if attempt == len(models):
+                raise
+            continue
+        try:
+            result = parse(raw)
+        except LLMOutputError as e:
+            llm_router.record(stage, model, time.monotonic() - started, "invalid")
+            print(f"⚠️  {stage} 응답 검증 실패 ({attempt}/{len(models)}, {model}): {e}")
+            if attempt == len(models):
+                raise
+            continue
+        llm_router.record(stage, model, time.monotonic() - started, "ok")
+        return result
+
 # ---------------------------------------------------------------------------
 # 메인 워크플로
 # ---------------------------------------------------------------------------
-async def generate_cardnews(client, keyword: str, date_range: str | None = None) -> str:
+async def generate_cardnews(client, keyword: str, date_range: str | None = None) -> Dict | List[Dict]:
     if date_range == "None":
         date_range = None
 
+    # 이전 시도의 스테이지 결과가 있으면 이어서 실행 (workers/checkpoints.py).
+    # 같은 키워드가 동시에 돌면 lease 를 잡은 쪽만 체크포인트를 쓴다.
+    rid = checkpoints.run_id(keyword, date_range)
+    token = await checkpoints.acquire(rid)
+    try:
+        return await _generate(client, keyword, date_range, rid, token)
+    finally:
+        await asyncio.shield(checkpoints.release(rid, token))
+
+
+async def _generate(client, keyword: str, date_range: str | None, rid: str, token: str | None) -> Dict | List[Dict]:
+    ckpt = await checkpoints.load(rid, token)
+
     # 세션 초기화
     service = InMemorySessionService()
     service.create_session(app_name="app", user_id="user", session_id="sess")
     session = service.get_session(app_name="app", user_id="user", session_id="sess")
 
+    state: Dict = {}
+
+    def _set_state(**delta) -> None:
+        state.update(delta)
+        service.append_event(
+            session,
+            Event(
+                invocation_id="set_state",
+                author="system",
+                actions=EventActions(state_delta=delta),
+            ),
+        )
+
     # keyword 주입
-    service.append_event(
-        session,
-        Event(
-            invocation_id="set_state",
-            author="system",
-            actions=EventActions(state_delta={"keyword": keyword}),
-        ),
-    )
+    _set_state(keyword=keyword)
 
     # 1️⃣ Google 검색
-    try:
-        search_results = await search_google(client, keyword, 15, date_range)
-    except:
-        return json.dumps([{}])
+    search_results = ckpt.get("search_results")
+    if search_results is None:
+        try:
+            search_results = await search_google(client, keyword, 15, date_range)
+        except Exception:   # 취소(CancelledError)는 그대로 전파
+            return [{}]
+        await checkpoints.save(rid, token, "search_results", search_results)
+    # 서킷이 열린(최근 계속 실패한) 도메인은 FILTER_AGENT 후보에서 제외
+    search_results = domains.drop_open(search_results, key=lambda r: r.get("url") or "")
     print("====== search_results ======")
     print("count:", len(search_results))
 
-    service.append_event(
-        session,
-        Event(
-            invocation_id="set_state",
-            author="system",
-            actions=EventActions(state_delta={"search_results": search_results}),
-        ),
-    )
+    _set_state(search_results=search_results)
 
     # 2️⃣ URL 필터링
-    runner_flt = Runner(agent=FILTER_AGENT, app_name="app", session_service=service)
-    selected_json: str = await _run_agent(runner_flt, "filter")
-    selected_url_list = clean_urls(safe_parse_urls(selected_json))
+    selected_url_list = ckpt.get("selected_urls")
+    if selected_url_list is None:
+        try:
+            selected_url_list = clean_urls(await _run_stage(
+                service, "filter", "filter", parse_urls, len(str(search_results))
+            ))
+        except LLMOutputError:
+            return [{}]
+        await checkpoints.save(rid, token, "selected_urls", selected_url_list)
 
     print("===== 선택된 URL =====")
     print(selected_url_list)
 
     if len(selected_url_list)==0:
-        return json.dumps([{}])
+        return [{}]
 
     # 3️⃣ 본문 크롤링
-    page_texts = await parallel_fetch_texts(client, selected_url_list, 5)
-    service.append_event(
-        session,
-        Event(
-            invocation_id="set_state",
-            author="system",
-            actions=EventActions(state_delta={"page_texts": page_texts}),
-        ),
-    )
+    page_texts = ckpt.get("page_texts")
+    if page_texts is None:
+        page_texts = await parallel_fetch_texts(client, selected_url_list)
+        await checkpoints.save(rid, token, "page_texts", page_texts)
+    _set_state(page_texts=page_texts)
 
     # 4️⃣ 카드뉴스 초안 생성
-    runner_txt = Runner(agent=TEXT_MAKER_AGENT, app_name="app", session_service=service)
-    cards_json_str: str = await _run_agent(runner_txt, "generate")
-
-    # cards_json 세션 저장 (img‑keyword 단계에서 사용)
-    service.append_event(
-        session,
-        Event(
-            invocation_id="set_state",
-            author="system",
-            actions=EventActions(state_delta={"cards_json": cards_json_str}),
-        ),
-    )
-
-    # 5️⃣ img_keyword 보강
-    runner_imgkw = Runner(agent=IMG_KEYWORD_AGENT, app_name="app", session_service=service)
-    cards_with_kw_str: str = await _run_agent(runner_imgkw, "add_img_kw")
+    draft_cards = ckpt.get("draft_cards")
+    if draft_cards is None:
+        try:
+            draft_cards = await _run_stage(
+                service, "text_maker", "generate", parse_cards, len(page_texts)
+            )
+        except LLMOutputError:
+            return [{}]
+        await checkpoints.save(rid, token, "draft_cards", draft_cards)
+
+    # cards_json 세션 저장 (img‑keyword 단계에서 사용) – 파싱·정규화된 JSON 으로
+    cards_json = json.dumps({"cards": draft_cards}, ensure_ascii=False)
+    _set_state(cards_json=cards_json)
+
+    # 6️⃣ 이미지 검색 – 키워드별 태스크. img_keyword 응답을 스트리밍으로 받으면
+    #    카드가 하나 완성될 때마다 바로 시작해, 나머지 카드를 쓰는 동안 검색이 진행된다.
+    img_tasks: Dict[str, asyncio.Future] = {}
+
+    async def _images_for(kw: str) -> List[Dict]:
+        img_res = await search_google_images(client, kw, 20)
+        if get_settings().image_probe_enabled:
+            img_res = await filter_images(img_res)
+        return img_res
 
-    try:
-        cards_data = json.loads(cards_with_kw_str)
-        pages: List[Dict] = cards_data["cards"] if isinstance(cards_data, dict) else cards_data
-    except Exception as e:
-        raise ValueError(f"IMG_KEYWORD_AGENT returned invalid JSON: {e}")
+    def _prefetch(card: Dict) -> None:
+        # 스트림에서 온 카드는 검증 전 – 문자열이 아닌 img_keyword 는 무시
+        kw = card.get("img_keyword")
+        if isinstance(kw, str) and kw and kw not in img_tasks:
+            img_tasks[kw] = asyncio.ensure_future(_images_for(kw))
 
-    # 6️⃣ 이미지 URL 크롤링 병합
     async def _enrich_page(page: Dict) -> Dict:
-        if "img_keyword" not in page:
+        if not isinstance(page.get("img_keyword"), str) or not page["img_keyword"]:
             return page
-        kw = page["img_keyword"]
-        img_res = await search_google_images(client, kw, 20)
+        _prefetch(page)
+        img_res = await img_tasks[page["img_keyword"]]
         page["img_urls"] = [r["img_url"] for r in img_res]
         page["ref_urls"] = [r["ref_urls"] for r in img_res]
         page["img_desc"] = [r["img_desc"] for r in img_res]
         return page
 
-    sem = asyncio.Semaphore(5)
-
-    async def _wrap(p):
-        async with sem:
-            return await _enrich_page(p)
     try:
-        pages = await asyncio.gather(*[_wrap(p) for p in pages])
-    except:
-        return json.dumps([{}])
+        # 5️⃣ img_keyword 보강
+        pages: List[Dict] | None = ckpt.get("pages")
+        if pages is None:
+            try:
+                pages = await _run_stage(
+                    service, "img_keyword", "add_img_kw",
+                    lambda raw: parse_cards(raw, require="img_keyword"),
+                    len(cards_json),
+                    state=state,
+                    on_card=_prefetch,
+                )
+                await checkpoints.save(rid, token, "pages", pages)
+            except LLMOutputError:
+                # 초안까지의 작업은 살리고, 소제목/제목을 이미지 검색어로 사용
+                pages = [
+                    {**card, "img_keyword": card.get("sub_title") or card.get("title") or keyword}
+                    for card in draft_cards
+                ]
+
+        # 이미지 URL 병합
+        try:
+            pages = await asyncio.gather(*[_enrich_page(dict(p)) for p in pages])
+        except Exception:   # 취소(CancelledError)는 그대로 전파
+            return [{}]      # 체크포인트는 남겨 두어 재시도 시 이미지 단계만 다시
+    finally:
+        # 최종 카드에 쓰이지 않은(스트리밍 중 바뀐) 키워드의 검색은 중단
+        for t in img_tasks.values():
+            t.cancel()
+            if t.done() and not t.cancelled():
+                t.exception()   # 버려진 선행 검색의 예외는 조용히 소비
+    await checkpoints.clear(rid, token)
 
     # 7️⃣ category 결정
     layout = (
@@ -257,7 +512,7 @@ async def generate_cardnews(client, keyword: str, date_range: str | None = None)
                 print(f"{k}: {card[k]}")
         print("--------------------------------")
 
-    return json.dumps(res_json, ensure_ascii=False)
+    return res_json
 
 # ---------------------------------------------------------------------------
 # CLI
@@ -271,12 +526,10 @@ if __name__ == "__main__":
     date_range_arg = sys.argv[2] if len(sys.argv) > 2 else None  # d, w, m, y, None
 
     proxy_client = ProxyRotationClient()
-    output_json_str = asyncio.run(generate_cardnews(proxy_client, kw, date_range_arg))
+    output_json = asyncio.run(generate_cardnews(proxy_client, kw, date_range_arg))
 
     # Save to file
     with open("json_output.txt", "w", encoding="utf-8") as fp:
-        fp.write(output_json_str)
+        fp.write(json.dumps(output_json, ensure_ascii=False))
 
-    # Pretty‑print to console
-    output_json = json.loads(output_json_str)
     import pdb; pdb.set_trace()
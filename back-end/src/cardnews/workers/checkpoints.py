@@ -0,0 +1,139 @@
+# checkpoints.py
+"""generate_cardnews 스테이지 체크포인트.
+
+각 스테이지 결과(search_results → selected_urls → page_texts → draft_cards
+→ pages)를 ``checkpoints`` 컬렉션에 run id 단위로 저장한다. 같은 요청이
+다시 들어오거나(클라이언트 재시도) 서비스가 내부적으로 재시도하면 마지막으로
+성공한 스테이지 다음부터 이어서 실행한다. 성공하면 지우고, 남은 것은
+``checkpoint_ttl`` 뒤 TTL 인덱스로 정리된다.
+
+run id 는 결과 저장소와 같은 ``(query, date_range)`` 키라서 같은 키워드의
+재시도가 자연히 같은 체크포인트를 본다. 대신 동시에 들어온 같은 키워드 요청이
+서로의 스테이지를 덮어쓰지 않도록, 체크포인트는 ``acquire`` 로 lease 를 잡은
+실행(owner 토큰)만 읽고 쓴다. lease 는 저장할 때마다 ``checkpoint_lease``
+만큼 연장되고, 못 잡은 요청은 체크포인트 없이 처음부터 실행한다. 이어서
+실행할 때는 ``STAGES`` 순서로 끊김 없이 끝난 스테이지까지만 쓴다.
+
+Mongo 가 연결되지 않은 CLI 실행에서는 아무것도 하지 않는다.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from pymongo.errors import DuplicateKeyError
+
+from cardnews.core.db import mongo
+from cardnews.core.settings import get_settings
+from cardnews.services.result_cache import cache_key
+
+STAGES = ("search_results", "selected_urls", "page_texts", "draft_cards", "pages")
+
+
+def run_id(query: str, date_range: str | None) -> str:
+    return cache_key(query, date_range)
+
+
+def _enabled() -> bool:
+    return get_settings().checkpoints_enabled and mongo.checkpoints is not None
+
+
+async def acquire(rid: str) -> str | None:
+    """run id 의 lease 를 잡고 owner 토큰을 돌려준다. 다른 실행이 잡고 있으면 None."""
+    if not _enabled():
+        return None
+    s = get_settings()
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+    free = {"$or": [{"owner": None}, {"lease_until": {"$lt": now}}]}
+    try:
+        # 만료됐지만 TTL 모니터가 아직 안 지운 문서 – 아래에서 expires_at 을 새로
+        # 찍으면 오래된 스테이지가 되살아나므로 먼저 버린다
+        await mongo.checkpoints.delete_one({"_id": rid, "expires_at": {"$lte": now}, **free})
+        await mongo.checkpoints.update_one(
+            {"_id": rid, **free},
+            {"$set": {
+                "owner": token,
+                "lease_until": now + timedelta(seconds=s.checkpoint_lease),
+                "expires_at": now + timedelta(seconds=s.checkpoint_ttl),
+            }},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        print(f"🔒 checkpoint {rid[:12]} 사용 중 – 체크포인트 없이 실행")
+        return None
+    except Exception as e:
+        print(f"⚠️  checkpoint lease 실패: {e}")
+        return None
+    return token
+
+
+async def load(rid: str, token: str | None) -> Dict[str, Any]:
+    if token is None or not _enabled():
+        return {}
+    try:
+        doc = await mongo.checkpoints.find_one(
+            {"_id": rid, "owner": token, "expires_at": {"$gt": datetime.utcnow()}},
+            {"stages": 1},
+        )
+    except Exception as e:
+        print(f"⚠️  checkpoint 조회 실패: {e}")
+        return {}
+    saved = (doc or {}).get("stages") or {}
+    # 앞 스테이지가 빠진 결과는 다른 입력으로 만든 것일 수 있으니 버린다
+    stages: Dict[str, Any] = {}
+    for name in STAGES:
+        if name not in saved:
+            break
+        stages[name] = saved[name]
+    if stages:
+        print(f"♻️  checkpoint resume: {list(stages)}")
+    return stages
+
+
+async def save(rid: str, token: str | None, stage: str, value: Any) -> None:
+    """비어 있는 결과(실패)는 저장하지 않는다 – 재시도 때 다시 계산하도록.
+
+    lease 를 잃었으면(다른 실행이 가져감) 아무것도 쓰지 않는다.
+    """
+    if token is None or not value or not _enabled():
+        return
+    s = get_settings()
+    now = datetime.utcnow()
+    try:
+        res = await mongo.checkpoints.update_one(
+            {"_id": rid, "owner": token},
+            {"$set": {
+                f"stages.{stage}": value,
+                "updated": now,
+                "lease_until": now + timedelta(seconds=s.checkpoint_lease),
+                "expires_at": now + timedelta(seconds=s.checkpoint_ttl),
+            }},
+        )
+        if not res.matched_count:
+            print(f"⚠️  checkpoint lease 만료 – {stage} 저장 안 함")
+    except Exception as e:
+        # 체크포인트는 최적화일 뿐 – 실패해도 파이프라인은 계속
+        print(f"⚠️  checkpoint 저장 실패 ({stage}): {e}")
+
+
+async def release(rid: str, token: str | None) -> None:
+    """lease 만 놓는다 – 저장된 스테이지는 다음 재시도가 이어받는다."""
+    if token is None or not _enabled():
+        return
+    try:
+        await mongo.checkpoints.update_one(
+            {"_id": rid, "owner": token}, {"$set": {"owner": None, "lease_until": None}}
+        )
+    except Exception as e:
+        print(f"⚠️  checkpoint lease 해제 실패: {e}")
+
+
+async def clear(rid: str, token: str | None) -> None:
+    if token is None or not _enabled():
+        return
+    try:
+        await mongo.checkpoints.delete_one({"_id": rid, "owner": token})
+    except Exception as e:
+        print(f"⚠️  checkpoint 삭제 실패: {e}")
@@ -16,9 +16,9 @@ FILTER_INSTRUCTION: str = """
 - search_results 는 list[dict] 형식이며 각 dict 의 키는 desc 와 url 이다.
 - desc 를 읽고 광고나 낚시성 결과를 제외한다.
 - 사용자가 요청한 카드뉴스 주제 '{keyword}' 와 연관성 높은 URL 을 최대 5개까지 고른다.
-- 결과는 URL 만 요소로 갖는 Python list 로 출력한다.
-  예시: ['https://a.com', 'https://b.com']
-- 반드시 리스트 하나만 출력하고, 다른 텍스트는 절대 포함하지 않는다.
+- 결과는 urls 키에 URL 리스트를 담은 JSON 객체로 출력한다.
+  예시: {"urls": ["https://a.com", "https://b.com"]}
+- 반드시 JSON 객체 하나만 출력하고, 다른 텍스트는 절대 포함하지 않는다.
 """
 
 # ---------------------------------------------------------------------------
@@ -36,7 +36,7 @@ TEXT_MAKER_INSTRUCTION: str = """
 3. 전체 카드 수는 2~6장 사이에서 자유롭게 정한다. 흥미로운 정보가 적으면 2~3장만 적어서, 흥미의 밀도를 올리는 것이 중요하다.
 4. body 는 2~4문장, 150자 이내로 작성한다.
 5. 한자 사용을 피하고 한글을 기본으로, 필요하면 영어를 부가적으로 사용한다.
-6. 결과는 JSON 하나만 출력하며, 추가 설명·주석·백틱 등을 포함하지 않는다.
+6. 결과는 {"cards": [카드, ...]} 형태의 JSON 하나만 출력하며, 추가 설명·주석·백틱 등을 포함하지 않는다.
 
 [카드 작성 팁]
 1. title 은 보통의 SNS 포스팅 제목처럼, 쉽고 흥미로운 표현을 써서 클릭을 유도하는 제목을 쓰는것이 좋다.
@@ -0,0 +1,252 @@
+# llm_output.py
+"""LLM 응답 → 파이썬 객체 변환 (structured output 스키마 + 관대한 JSON 복구).
+
+1. 가능하면 모델 쪽에서 JSON-schema 를 강제한다 (``response_format``).
+2. 그래도 깨진 응답(코드펜스, 작은따옴표, 끝 쉼표, Python 리터럴 등 문법상
+   잡음)은 ``repair_json`` 이 한 번의 스캔으로 고쳐서 파싱한다.
+3. 잘린 출력(닫히지 않은 문자열·괄호)은 고치지 않는다 – 반쪽짜리 URL·카드가
+   검증을 통과하지 않도록 ``LLMOutputError`` 로 올려 agent_runner 가 다음
+   모델로 넘어가거나 해당 stage 만 재시도한다.
+"""
+from __future__ import annotations
+
+import ast
+import re
+from typing import Any, Dict, List
+
+import orjson
+
+
+class LLMOutputError(ValueError):
+    """LLM 응답을 기대한 구조로 해석할 수 없음."""
+
+
+# ---------------------------------------------------------------------------
+# 스키마 (OpenAI structured outputs – strict 모드는 루트가 object 여야 함)
+# ---------------------------------------------------------------------------
+def _card_schema(*keys: str, required_str: tuple = ()) -> Dict:
+    props = {k: {"type": "string"} if k in required_str else {"type": ["string", "null"]} for k in keys}
+    return {
+        "type": "object",
+        "properties": {
+            "cards": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": props,
+                    "required": list(keys),
+                    "additionalProperties": False,
+                },
+            }
+        },
+        "required": ["cards"],
+        "additionalProperties": False,
+    }
+
+
+SCHEMAS: Dict[str, Dict] = {
+    "filter": {
+        "type": "object",
+        "properties": {"urls": {"type": "array", "items": {"type": "string"}}},
+        "required": ["urls"],
+        "additionalProperties": False,
+    },
+    "text_maker": _card_schema("title", "sub_title", "body"),
+    "img_keyword": _card_schema("title", "sub_title", "body", "img_keyword", required_str=("img_keyword",)),
+}
+
+
+def response_format(stage: str) -> Dict:
+    """LiteLLM ``response_format`` 인자."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": f"{stage}_output", "schema": SCHEMAS[stage], "strict": True},
+    }
+
+
+# ---------------------------------------------------------------------------
+# JSON 복구
+# ---------------------------------------------------------------------------
+_FENCE = re.compile(r"```[a-zA-Z]*\n?")
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def repair_json(text: str) -> str:
+    """흔한 LLM JSON 오류를 고친 문자열을 돌려준다.
+
+    첫 ``{`` / ``[`` 부터 짝이 맞는 곳까지만 읽고, 작은따옴표 문자열,
+    문자열 안 개행, Python 리터럴, 끝 쉼표를 보정한다. 문자열·괄호가 닫히기
+    전에 끝나면(잘린 출력) ``LLMOutputError``.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise LLMOutputError("no JSON object/array in LLM output")
+
+    out: List[str] = []
+    stack: List[str] = []
+    quote = None          # 현재 열린 문자열의 따옴표 (" 또는 ')
+    i, n = start, len(text)
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == "\\" and i + 1 < n:
+                nxt = text[i + 1]
+                # \' 는 JSON 에 없는 escape
+                out.append("'" if nxt == "'" else ch + nxt)
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':
+                out.append('\\"')            # 작은따옴표 문자열 안의 "
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch in "\r\t":
+                out.append("\\r" if ch == "\r" else "\\t")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                break                        # 뒤따르는 설명문 등은 버림
+        elif ch.isascii() and ch.isalpha():
+            m = re.match(r"[A-Za-z]+", text[i:])
+            word = m.group(0)
+            out.append(_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    if quote or stack:
+        raise LLMOutputError("truncated LLM output (unterminated string or container)")
+    return "".join(out)
+
+
+def _last_index(out: List[str]) -> int:
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    return j
+
+
+def _strip_trailing_comma(out: List[str]) -> None:
+    j = _last_index(out)
+    if j >= 0 and out[j] == ",":
+        del out[j]
+
+
+def parse_json(raw: str) -> Any:
+    """LLM 응답 문자열 → 객체. 정상 JSON 이면 orjson 한 번으로 끝난다."""
+    raw = (raw or "").strip()
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        pass
+    text = _FENCE.sub("", raw).rstrip("`").strip()
+    try:
+        return orjson.loads(repair_json(text))
+    except (orjson.JSONDecodeError, LLMOutputError):
+        pass
+    try:
+        return ast.literal_eval(text)
+    except Exception:
+        raise LLMOutputError("LLM returned unparsable JSON:\n" + raw[:500])
+
+
+# ---------------------------------------------------------------------------
+# stage 별 구조 검증
+# ---------------------------------------------------------------------------
+def parse_urls(raw: str) -> List[str]:
+    obj = parse_json(raw)
+    if isinstance(obj, dict):
+        obj = obj.get("urls")
+    if not isinstance(obj, list):
+        raise LLMOutputError(f"expected URL list, got {type(obj).__name__}")
+    return [u for u in obj if isinstance(u, str)]
+
+
+def parse_cards(raw: str, require: str | None = None) -> List[Dict]:
+    """``{"cards": [...]}`` 또는 ``[...]`` → 카드 리스트 (null 값 키는 제거)."""
+    obj = parse_json(raw)
+    if isinstance(obj, dict):
+        obj = obj.get("cards")
+    if not isinstance(obj, list) or not obj or not all(isinstance(c, dict) for c in obj):
+        raise LLMOutputError("expected a non-empty list of card objects")
+    cards = [{k: v for k, v in c.items() if v is not None} for c in obj]
+    if require and not any(c.get(require) for c in cards):
+        raise LLMOutputError(f"no card has '{require}'")
+    return cards
+
+
+# ---------------------------------------------------------------------------
+# 스트리밍 – 카드 객체가 닫히는 즉시 하나씩
+# ---------------------------------------------------------------------------
+class CardStreamParser:
+    """토큰 스트림을 조금씩 받아, 완성된 카드 dict 를 순서대로 돌려준다.
+
+    ``{"cards": [{...}, {...}]}`` 와 ``[{...}, {...}]`` 두 형태를 모두 지원한다.
+    카드 = 루트 배열 또는 루트 객체 바로 아래 배열의 원소인 객체.
+    """
+
+    def __init__(self):
+        self._buf: List[str] = []
+        self._stack: List[str] = []
+        self._in_str = False
+        self._escape = False
+        self._card_start: int | None = None
+        self._pos = 0
+
+    def feed(self, chunk: str) -> List[Dict]:
+        done: List[Dict] = []
+        for ch in chunk:
+            self._buf.append(ch)
+            pos = self._pos
+            self._pos += 1
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+                continue
+            if ch == '"':
+                self._in_str = True
+            elif ch in "{[":
+                if ch == "{" and self._stack in (["["], ["{", "["]):
+                    self._card_start = pos
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._card_start is not None and self._stack in (["["], ["{", "["]):
+                    card = self._load("".join(self._buf[self._card_start:]))
+                    self._card_start = None
+                    if card is not None:
+                        done.append(card)
+        return done
+
+    @staticmethod
+    def _load(text: str) -> Dict | None:
+        try:
+            obj = parse_json(text)
+        except LLMOutputError:
+            return None
+        if not isinstance(obj, dict):
+            return None
+        return {k: v for k, v in obj.items() if v is not None}
@@ -0,0 +1,65 @@
+# llm_router.py
+"""stage 별 모델 라우팅 & 모델별 지연/품질 지표.
+
+``llm_cascades`` 에 stage 마다 시도할 모델 순서를 적는다. 앞 모델의 응답이
+스키마 검증(``llm_output``)을 통과하지 못하면 다음 모델로 넘어간다.
+입력이 ``llm_large_input_chars`` 보다 크면 ``llm_large_input_skip`` 의
+작은 모델은 건너뛴다 (긴 컨텍스트에서 품질이 떨어지므로).
+
+지표는 Prometheus 와 ``/admin/llm`` 양쪽으로 노출한다.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List
+
+from prometheus_client import Counter, Histogram
+
+from cardnews.core.settings import get_settings
+
+_LATENCY = Histogram(
+    "llm_stage_latency_seconds", "LLM stage call latency", ["stage", "model"],
+    buckets=(0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+_OUTCOMES = Counter(
+    "llm_stage_outcomes", "LLM stage call outcomes", ["stage", "model", "outcome"]
+)
+
+# (stage, model) → {"calls", "ok", "invalid", "error", "seconds"}
+_stats: Dict[tuple, Dict[str, float]] = defaultdict(
+    lambda: {"calls": 0, "ok": 0, "invalid": 0, "error": 0, "seconds": 0.0}
+)
+
+
+def plan(stage: str, input_chars: int = 0) -> List[str]:
+    """이번 요청에서 시도할 모델 순서."""
+    s = get_settings()
+    cascade = list(s.llm_cascades[stage])
+    if input_chars > s.llm_large_input_chars:
+        big = [m for m in cascade if m not in s.llm_large_input_skip]
+        cascade = big or cascade[-1:]
+    return cascade
+
+
+def record(stage: str, model: str, seconds: float, outcome: str) -> None:
+    """outcome: ok / invalid (스키마 검증 실패) / error (호출 예외)"""
+    _LATENCY.labels(stage, model).observe(seconds)
+    _OUTCOMES.labels(stage, model, outcome).inc()
+    st = _stats[(stage, model)]
+    st["calls"] += 1
+    st[outcome] += 1
+    st["seconds"] += seconds
+
+
+def snapshot() -> Dict[str, Dict[str, Dict]]:
+    out: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+    for (stage, model), st in _stats.items():
+        calls = st["calls"] or 1
+        out[stage][model] = {
+            "calls": st["calls"],
+            "ok_rate": round(st["ok"] / calls, 3),
+            "invalid": st["invalid"],
+            "error": st["error"],
+            "avg_seconds": round(st["seconds"] / calls, 2),
+        }
+    return dict(out)
@@ -0,0 +1,137 @@
+# scrape_worker.py
+"""스크래핑 워커 엔트리 포인트 – API 프로세스와 분리된 브라우저 풀.
+
+``scrape_jobs`` 큐에서 fetch/parse 잡을 가져와 자체 ``ProxyRotationClient``
+로 처리하고 파싱 결과만 돌려준다. API 는 ``scrape_backend: mongo`` 로
+설정하면 브라우저를 직접 띄우지 않는다.
+
+Usage::
+
+    python -m cardnews.workers.scrape_worker --concurrency 4 --processes 2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+from typing import Dict
+
+from cardnews.core.db import connect_to_mongo, close_mongo, mongo
+from cardnews.core.settings import get_settings
+from cardnews.scraping.jobs import MongoJobQueue, worker_id
+
+
+_ERROR_BACKOFF_MAX = 30.0
+
+
+async def _loop(queue, client, wid: str) -> None:
+    """claim → 실행 반복. 큐(mongo) 오류로 루프가 죽지 않도록 백오프 후 재시도
+    (complete/fail 을 못 쓴 잡은 lease 가 끝나면 다시 claim 된다)."""
+    s = get_settings()
+    idle = s.scrape_job_poll_interval
+    backoff = s.scrape_job_poll_interval
+    while True:
+        try:
+            job = await queue.claim(wid, s.scrape_job_timeout)
+            if job is None:
+                await asyncio.sleep(idle)
+                idle = min(idle * 1.5, 2.0)
+                continue
+            idle = s.scrape_job_poll_interval
+            await _run_job(queue, client, job)
+            backoff = s.scrape_job_poll_interval
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️  scrape worker {wid} 큐 오류 – {backoff:.1f}s 후 재시도: {type(e).__name__}: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _ERROR_BACKOFF_MAX)
+
+
+async def _run_job(queue, client, job: Dict) -> None:
+    """잡 실행. 도중에 요청자가 취소하면 브라우저 작업을 중단한다."""
+    s = get_settings()
+    task = asyncio.ensure_future(client.fetch_parsed(job["url"], job["parser"]))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=s.scrape_cancel_check_interval)
+            if done:
+                break
+            try:
+                cancelled = await queue.is_cancelled(job["_id"])
+            except Exception as e:
+                # 취소 확인 실패는 다음 주기에 다시 – 브라우저 작업은 그대로 진행
+                print(f"⚠️  job {job['_id']} 취소 확인 실패: {e}")
+                continue
+            if cancelled:
+                task.cancel()
+                print(f"🚫 job {job['_id']} cancelled by requester")
+                return
+    except BaseException:
+        task.cancel()
+        raise
+    try:
+        result = task.result()
+    except Exception as e:
+        print(f"⚠️  job {job['_id']} {job['url']} 실패: {e}")
+        await queue.fail(job["_id"], f"{type(e).__name__}: {e}")
+    else:
+        await queue.complete(job["_id"], result)
+
+
+async def run_worker(queue, client, concurrency: int) -> None:
+    """``concurrency`` 개의 claim 루프(= 동시 브라우저 수)를 돌린다."""
+    wid = worker_id()
+    await asyncio.gather(*[_loop(queue, client, f"{wid}#{i}") for i in range(concurrency)])
+
+
+async def _serve(concurrency: int) -> None:
+    from cardnews.scraping.proxy_client import ProxyRotationClient
+
+    await connect_to_mongo()
+    try:
+        await run_worker(MongoJobQueue(mongo.scrape_jobs), ProxyRotationClient(), concurrency)
+    finally:
+        await close_mongo()
+
+
+def _process_main(concurrency: int, partition: int | None = None, partitions: int = 1) -> None:
+    if partition is not None:
+        # 프로세스별로 프록시 포트를 나눠 가짐 (proxy_leases.partition)
+        s = get_settings()
+        s.proxy_partition_index = partition
+        s.proxy_partition_count = partitions
+    asyncio.run(_serve(concurrency))
+
+
+def main() -> None:
+    s = get_settings()
+    pa = argparse.ArgumentParser("CardNews scraping worker")
+    pa.add_argument("--concurrency", type=int, default=s.scrape_worker_concurrency,
+                    help="프로세스당 동시 브라우저 수")
+    pa.add_argument("--processes", type=int, default=1)
+    pa.add_argument("--partition-proxies", action="store_true",
+                    help="프로세스마다 프록시 포트를 정적으로 나눠 씀")
+    args = pa.parse_args()
+
+    if args.processes <= 1:
+        _process_main(args.concurrency)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    procs = [
+        ctx.Process(
+            target=_process_main,
+            args=(args.concurrency, i if args.partition_proxies else None, args.processes),
+            daemon=False,
+        )
+        for i in range(args.processes)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# test_lazy_imports.py
+"""cardnews.main import 가 무거운 파이프라인 의존성을 끌어오지 않는지 (cold start 가드).
+
+이미 다른 테스트가 모듈을 로드했을 수 있으므로 새 인터프리터에서 확인한다.
+import 시간 예산은 ``scripts/bench_import.py`` 참고.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# cardnews.main import 시점에 로드되면 lazy 로딩이 깨진 것
+FORBIDDEN = ("google.adk", "litellm", "camoufox", "cardnews.workers.agent_runner")
+
+
+def _loaded_after(module: str) -> list:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT / "src"), env.get("PYTHONPATH")]))
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017")
+    env.setdefault("API_HASH_SECRET", "test")
+    code = (
+        f"import sys, {module}\n"
+        f"print('\\n'.join(m for m in {FORBIDDEN!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout.split()
+
+
+@pytest.mark.parametrize("module", ["cardnews.main"])
+def test_main_does_not_import_pipeline(module):
+    assert _loaded_after(module) == []
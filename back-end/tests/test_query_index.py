@@ -0,0 +1,65 @@
+# test_query_index.py
+"""유사 쿼리 매칭 – 표기만 다른 쿼리는 매칭, 숫자·영문만 다른 쿼리는 매칭 안 됨."""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost")
+os.environ.setdefault("API_HASH_SECRET", "test")
+
+from cardnews.core.settings import get_settings  # noqa: E402
+from cardnews.services import query_index  # noqa: E402
+from cardnews.services.query_index import QueryIndex  # noqa: E402
+
+# 백로그 원문의 예시 – 셋 중 무엇이 캐시돼 있어도 나머지가 그 결과를 받아야 함
+HEADLINE = ("잠실 맛집", "잠실맛집", "잠실 맛집 추천")
+
+SAME = [
+    ("잠실 맛집", "잠실맛집"),
+    ("잠실 맛집", "잠실 맛집들"),
+    ("서울 벚꽃 명소", "서울 벚꽃명소"),
+    ("아이폰 15 프로 리뷰", "아이폰15 프로 리뷰"),
+    ("강남역 맛집 추천", "강남역 맛집 추천해줘"),
+    ("성수 카페", "성수 카페 후기"),
+]
+
+# n-gram 유사도는 임계값 근처지만 다른 연도·모델 – 캐시를 공유하면 안 됨
+NEAR_MISS = [
+    ("삼성전자 2024년 실적", "삼성전자 2025년 실적"),
+    ("갤럭시 S24 출시일", "갤럭시 S25 출시일"),
+    ("아이폰15 프로 리뷰", "아이폰16 프로 리뷰"),
+    ("갤럭시 S24 출시일", "갤럭시 S24 울트라 출시일"),
+    ("잠실 맛집", "잠실 맛집 top10"),
+    # 끝말을 떼도 주제가 다르면 다른 쿼리
+    ("잠실 맛집", "잠실 카페 추천"),
+    ("잠실 맛집 추천", "송파 맛집 추천"),
+]
+
+
+def _match(cached: str, query: str):
+    idx = QueryIndex()
+    idx.add(cached, None, datetime.utcnow() + timedelta(hours=1))
+    hit = idx.search(query, None)
+    return hit if hit and hit[1] >= get_settings().similar_query_threshold else None
+
+
+@pytest.mark.parametrize("cached,query", SAME)
+def test_same_query_matches(cached, query):
+    assert _match(cached, query) is not None
+
+
+@pytest.mark.parametrize("cached,query", NEAR_MISS)
+def test_near_miss_does_not_match(cached, query):
+    assert _match(cached, query) is None
+
+
+@pytest.mark.parametrize("cached", HEADLINE)
+@pytest.mark.parametrize("query", HEADLINE)
+def test_find_similar_headline_variants(monkeypatch, cached, query):
+    idx = QueryIndex()
+    idx.add(cached, "w", datetime.utcnow() + timedelta(hours=1))
+    monkeypatch.setattr(query_index, "index", idx)
+    hit = query_index.find_similar(query, "w")
+    assert hit is not None and hit[0] == cached
+    assert query_index.find_similar(query, None) is None     # 기간 필터가 다르면 별개